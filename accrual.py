@@ -0,0 +1,72 @@
+import time
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# --- 真实年化计息模型 ---
+# 页面标称年化按"下单到交割"整段锁仓时间计算才是真实收益。
+# 有的交易所要等到下一个结算整点才开始计息，锁仓却从下单那一刻开始，
+# 真实年化 = 标称年化 × 计息小时数 / 锁仓小时数。
+HOUR_MS = 3_600_000
+DAY_MS = 24 * HOUR_MS
+
+
+class AccrualModel(NamedTuple):
+    cutoff_hour: Optional[int] = None      # 计息起点：下一个该整点（结算时区）；None 表示下单即计息
+    tz_hours: int = 8                      # 结算时区相对 UTC 的小时数
+    max_vip_level: Optional[int] = None    # 只保留不高于该 VIP 门槛的产品；None 表示不过滤
+
+
+ACCRUAL_MODELS = {
+    "OKX": AccrualModel(),
+    "Binance": AccrualModel(),
+    "Bitget": AccrualModel(),
+    # Gate 的计息起点永远是下一个 UTC+8 的 16:00，且页面混有 VIP 专属档位
+    "Gate": AccrualModel(cutoff_hour=16, tz_hours=8, max_vip_level=0),
+}
+
+
+def vip_allowed(platform, level):
+    limit = ACCRUAL_MODELS.get(platform, AccrualModel()).max_vip_level
+    return limit is None or int(level or 0) <= limit
+
+
+def accrual_start_ms(model, now_ms):
+    """该模型下此刻买入时开始计息的毫秒时间戳。"""
+    if model.cutoff_hour is None:
+        return now_ms
+    offset = model.tz_hours * HOUR_MS
+    local = now_ms + offset
+    start = local // DAY_MS * DAY_MS + model.cutoff_hour * HOUR_MS
+    if local >= start:
+        start += DAY_MS
+    return start - offset
+
+
+def real_apy(platform, expiry_ms, raw_apy, now_ms=None):
+    """按各平台计息模型整列计算真实年化，三个参数为等长数组。"""
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    platform = np.asarray(platform)
+    expiry_ms = np.asarray(expiry_ms, dtype="float64")
+    raw_apy = np.asarray(raw_apy, dtype="float64")
+    apy = raw_apy.copy()
+    locked_hours = (expiry_ms - now_ms) / HOUR_MS
+    for name, model in ACCRUAL_MODELS.items():
+        if model.cutoff_hour is None:
+            continue
+        mask = platform == name
+        if not mask.any():
+            continue
+        paid_hours = (expiry_ms[mask] - accrual_start_ms(model, now_ms)) / HOUR_MS
+        locked = locked_hours[mask]
+        scaled = np.where((locked > 0) & (paid_hours > 0) & (paid_hours < locked),
+                          raw_apy[mask] * paid_hours / np.where(locked > 0, locked, 1.0), raw_apy[mask])
+        # 极端情况：交割前几小时买入，一分利息都拿不到
+        apy[mask] = np.where(paid_hours <= 0, 0.0, scaled)
+    return apy
+
+
+def apply_accrual(df, now_ms=None):
+    """用 raw_apy 重算 df["apy"] 并返回 df。"""
+    df["apy"] = real_apy(df["platform"].to_numpy(), df["expiry"].to_numpy(), df["raw_apy"].to_numpy(), now_ms)
+    return df
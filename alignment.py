@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# --- 跨交易所目标价对齐 ---
+# 同一 (币种, 交割日) 下，各家报的目标价可能只差几个 tick（如 64000 vs 64000.5），
+# 按币种相对容差把不高于 簇内最低价 × (1 + 容差) 的档位并成一个标准档位（取该最低价）；容差要远小于该币种的档位间距，
+# 否则不同档位会被误并。
+STRIKE_TOLERANCE = {"BTC": 0.0005, "ETH": 0.0005, "SOL": 0.001, "XAUT": 0.0005}
+DEFAULT_TOLERANCE = 0.0005
+
+
+def _tolerances(coin, tolerance):
+    return pd.Series(coin).astype(object).map(tolerance).fillna(DEFAULT_TOLERANCE).to_numpy(dtype="float64")
+
+
+def align_strikes(coin, expiry, strike, tolerance=None):
+    """返回与输入等长的对齐后目标价数组。
+
+    同组按目标价升序贪心成簇：簇内最低价为锚点，不超过 锚点 × (1 + 容差) 的都并入该簇，
+    第一条超出的另起新簇。簇宽以锚点为界，不会像逐档比较相邻间距那样一路链式漂移。
+    """
+    tolerance = STRIKE_TOLERANCE if tolerance is None else tolerance
+    strike = np.asarray(strike, dtype="float64")
+    n = len(strike)
+    if isinstance(coin, str):
+        coin = np.full(n, coin, dtype=object)
+    coin_codes, _ = pd.factorize(pd.Series(coin).astype(object))
+    exp_codes, _ = pd.factorize(pd.Series(expiry))
+    tol = _tolerances(coin, tolerance)
+
+    order = np.lexsort((strike, exp_codes, coin_codes))
+    s, c, e, t = strike[order], coin_codes[order], exp_codes[order], tol[order]
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (c[1:] != c[:-1]) | (e[1:] != e[:-1])
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], n)
+    # nxt[i]：以第 i 档为锚点时，簇外第一档的位置（组内二分查找）
+    nxt = np.empty(n, dtype="int64")
+    for lo, hi in zip(starts, ends):
+        nxt[lo:hi] = lo + np.searchsorted(s[lo:hi], s[lo:hi] * (1 + t[lo:hi]), side="right")
+    # 各组同时从组首沿 nxt 跳，途经的位置即锚点；迭代次数为单组最多的档位数
+    new_level = np.zeros(n, dtype=bool)
+    frontier, limit = starts, ends
+    while len(frontier):
+        new_level[frontier] = True
+        frontier = nxt[frontier]
+        live = frontier < limit
+        frontier, limit = frontier[live], limit[live]
+    aligned = np.empty(n, dtype="float64")
+    aligned[order] = s[new_level][np.cumsum(new_level) - 1]
+    return aligned
@@ -1,13 +1,22 @@
 import streamlit as st
-import pandas as pd
-import requests
-import time
 import os
-from datetime import datetime, date, timedelta, timezone
-from dotenv import load_dotenv
-from curl_cffi import requests as requests_cffi
-
-load_dotenv()
+import time
+import pandas as pd
+from datetime import datetime
+
+from registry import coin_config, watchlist, ensure_fresh
+from engine import stream_fetch
+from http_client import reuse_totals
+from route_probe import get_prober
+import metrics
+from snapshot_store import load_latest
+from quotes import QuoteBatch
+from price_oracle import PriceBook
+from normalize import normalize, distance_pct
+from alignment import align_strikes
+from radar import scan
+from matrix import build_matrix, split_by_expiry
+from leaderboard import Leaderboard, TENOR_LABELS, to_frame
 
 # --- 1. 强制铺满全屏 CSS 优化 ---
 st.set_page_config(page_title="双币投资看板 Pro", layout="wide")
@@ -25,302 +34,193 @@ st.markdown("""
 LANG_DICT = {
     "zh": {
         "page_title": "双币投资看板 Pro", "sidebar_ctrl": "🎮 控制面板", "mode_toggle": "切换至【高卖】模式",
-        "buy_low": "低买", "sell_high": "高卖", "asset_select": "选择币种:",
-        "proxy_ctrl": "🌐 独立代理控制", "sync_btn": "⚡ 同步数据", "matrix_title": "📊 交易所对齐矩阵 (基于真实到手收益)",
-        "rank_title": "🏆 全网年化收益排行 (Top 30)", "target_price": "目标价", "dist_price": "距离%", "last_update": "⏱️ 最后更新:", "no_data": "⚠️ 未找到数据"
+        "buy_low": "低买", "sell_high": "高卖", "asset_select": "选择币种:", "more_coins": "➕ 更多币种",
+        "proxy_ctrl": "🌐 独立代理控制", "auto_route": "🛰️ 自动选路（按实测延迟）", "sync_btn": "⚡ 同步数据", "matrix_title": "📊 交易所对齐矩阵 (基于真实到手收益)",
+        "rank_title": "🏆 全网年化收益排行 (Top 30)", "rank_all": "🌐 全网", "target_price": "目标价", "dist_price": "距离%", "last_update": "⏱️ 最后更新:", "no_data": "⚠️ 未找到数据"
     },
     "en": {
         "page_title": "Dual Investment Pro", "sidebar_ctrl": "Dashboard Control", "mode_toggle": "Switch to SELL HIGH mode",
-        "buy_low": "Buy Low", "sell_high": "Sell High", "asset_select": "Asset:",
-        "proxy_ctrl": "Proxy Control", "sync_btn": "Sync Data", "matrix_title": "Alignment Matrix (Real APY)",
-        "rank_title": "APY Rankings (Top 30)", "target_price": "Strike", "dist_price": "Dist.%", "last_update": "Last Updated:", "no_data": "No data found."
+        "buy_low": "Buy Low", "sell_high": "Sell High", "asset_select": "Asset:", "more_coins": "More coins",
+        "proxy_ctrl": "Proxy Control", "auto_route": "Auto route (measured latency)", "sync_btn": "Sync Data", "matrix_title": "Alignment Matrix (Real APY)",
+        "rank_title": "APY Rankings (Top 30)", "rank_all": "All", "target_price": "Strike", "dist_price": "Dist.%", "last_update": "Last Updated:", "no_data": "No data found."
     }
 }
 
+# 轮询进程（poller.py）发布的快照在这个时效内直接使用，否则回退到页面内实时抓取
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", 120))
+# 设置 METRICS_PORT 时同时在该端口暴露 Prometheus 文本格式的 /metrics
+if metrics.METRICS_PORT:
+    metrics.serve(metrics.METRICS_PORT)
+
 if "lang" not in st.session_state: st.session_state.lang = "中文"
+# 排行榜跨重跑保留，每次只重算报价有变化的来源（见 leaderboard.py）
+if "leaderboard" not in st.session_state: st.session_state.leaderboard = Leaderboard()
+board = st.session_state.leaderboard
+RANK_SIZE = 30
 L = LANG_DICT["zh"] if st.session_state.lang == "中文" else LANG_DICT["en"]
 
-COIN_CONFIG = {
-    "BTC":  {"okx_id": 0,     "binance_symbol": "BTC",  "bitget_id": 1,   "gate_symbol": "BTC"},
-    "ETH":  {"okx_id": 2,     "binance_symbol": "ETH",  "bitget_id": 3,   "gate_symbol": "ETH"},
-    "SOL":  {"okx_id": 880,   "binance_symbol": "SOL",  "bitget_id": 235, "gate_symbol": "SOL"},
-    "XAUT": {"okx_id": 140,   "binance_symbol": None,   "bitget_id": None, "gate_symbol": None},
-}
-
-env_proxy = os.getenv("DEFAULT_PROXY")
-okx_auth = os.getenv("OKX_AUTH")
-PROXY_SETTING = {"https": env_proxy, "http": env_proxy} if env_proxy else {}
-
-# --- 3. 抓取引擎 ---
-def get_live_prices(coin, use_proxy):
-    proxies = PROXY_SETTING if use_proxy else {}
-    try:
-        r = requests.get(f"https://www.okx.com/api/v5/market/ticker?instId={coin}-USDT", proxies=proxies, timeout=5).json()
-        return float(r['data'][0]['last'])
-    except: return 0
-
-def get_okx(cfg, name, use_proxy, mode):
-    c_id = cfg.get("okx_id")
-    if c_id is None: return []
-    
-    if mode == "Buy Low":
-        opt_type = "PUT"
-        inv_id = c_id  
-        base_id = 7    
-    else:
-        opt_type = "CALL"
-        inv_id = c_id
-        base_id = 7    
-
-    url = f"https://www.okx.com/priapi/v2/sfp/dcd/products?currencyId={inv_id}&altCurrencyId={base_id}&dcdOptionType={opt_type}&t={int(time.time()*1000)}"
-    headers = {
-        "accept": "application/json", 
-        "app-type": "web", 
-        "referer": "https://www.okx.com/zh-hans/earn/dual",
-        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", 
-        "authorization": okx_auth
-    }
-    proxies = PROXY_SETTING if use_proxy else {}
-    try:
-        resp = requests.get(url, headers=headers, timeout=10, proxies=proxies)
-        if resp.status_code == 200:
-            products = resp.json().get("data", {}).get("products", [])
-            if not products and mode == "Sell High":
-                alt_url = f"https://www.okx.com/priapi/v2/sfp/dcd/products?currencyId=7&altCurrencyId={c_id}&dcdOptionType={opt_type}&t={int(time.time()*1000)}"
-                resp = requests.get(alt_url, headers=headers, timeout=10, proxies=proxies)
-                products = resp.json().get("data", {}).get("products", [])
-            
-            res = []
-            for p in products:
-                sk = p.get("strike")
-                ay = p.get("annualYieldPercentage")
-                if sk and ay:
-                    res.append({
-                        "coin": name, 
-                        "strike": float(sk), 
-                        "apy": float(ay), 
-                        "raw_apy": float(ay), # OKX不虚标，真实与页面一致
-                        "expiry": int(p["expiryTime"]), 
-                        "platform": "OKX"
-                    })
-            return res
-    except Exception as e:
-        pass
-    return []
-
-def get_bitget(cfg, name, use_proxy, mode):
-    b_id = cfg.get("bitget_id")
-    if b_id is None: return []
-    url = "https://www.bitget.cloud/v1/finance/dualInvest/ordinary/product/list"
-    direct, t_id = (0, 2) if mode == "Buy Low" else (1, 1)
-    proxies = PROXY_SETTING if use_proxy else {}
-    all_products = []
-    try:
-        r = requests.post(url, json={"productTokenId": b_id, "tradeTokenId": t_id, "direction": direct, "fromCalendar": False}, proxies=proxies, timeout=10).json()
-        if r.get("code") == "200" and r.get("data"):
-            dates = [g.get("settleDate") for g in r["data"] if g.get("settleDate")]
-            for ts in dates:
-                dr = requests.post(url, json={"productTokenId": b_id, "tradeTokenId": t_id, "direction": direct, "settleDate": str(ts), "fromCalendar": False}, proxies=proxies, timeout=10).json()
-                if dr.get("code") == "200" and dr.get("data"):
-                    for group in dr["data"]:
-                        for p in group.get("productList", []):
-                            all_products.append({
-                                "coin": name, "strike": float(p["targetPrice"]), 
-                                "apy": float(p["apy"]), "raw_apy": float(p["apy"]), 
-                                "expiry": int(ts), "platform": "Bitget"
-                            })
-    except: pass
-    return all_products
-
-def get_binance(cfg, name, use_proxy, mode):
-    if not cfg.get("binance_symbol"): return []
-    p_type = "DOWN" if mode == "Buy Low" else "UP"
-    i_asset = "USDT" if mode == "Buy Low" else cfg["binance_symbol"]
-    t_asset = cfg["binance_symbol"] if mode == "Buy Low" else "USDT"
-    url = "https://www.binance.com/bapi/earn/v5/friendly/pos/dc/project/list"
-    params = {"investmentAsset": i_asset, "targetAsset": t_asset, "projectType": p_type, "pageSize": 100}
-    proxies = PROXY_SETTING if use_proxy else {}
-    try:
-        r = requests.get(url, params=params, timeout=10, proxies=proxies).json()
-        return [{
-            "coin": name, "strike": float(i["strikePrice"]), 
-            "apy": float(i["apr"]) * 100, "raw_apy": float(i["apr"]) * 100, 
-            "expiry": int(i["settleTime"]), "platform": "Binance"
-        } for i in r.get("data", {}).get("list", [])]
-    except: return []
-
-def get_gate(cfg, name, use_proxy, mode):
-    symbol = cfg.get("gate_symbol")
-    if not symbol: return []
-    gate_type = "put" if mode == "Buy Low" else "call"
-    url = f"https://www.gate.com/apiw/v2/earn/dual/project-list?coin={symbol}&type={gate_type}"
-    proxies = PROXY_SETTING if use_proxy else {}
-    try:
-        resp = requests_cffi.get(url, impersonate="edge101", proxies=proxies, timeout=10)
-        if resp.status_code == 200:
-            res = []
-            current_ts_ms = int(time.time() * 1000)
-            
-            for i in resp.json().get("data", []):
-                if int(i.get("min_vip_level", 0)) > 0: continue
-                strike = i.get("exercise_price") or i.get("strike_price")
-                apy_display = float(i.get("apy_display") or 0) * 100
-                expiry_val = (i.get("delivery_timest") or i.get("end_timest")) * 1000
-                
-                if strike and apy_display > 0:
-                    # --- 核心黑科技：扣除Gate白嫖占用资金的真实年化计算 ---
-                    tz_utc_8 = timezone(timedelta(hours=8))
-                    now_utc8 = datetime.fromtimestamp(current_ts_ms / 1000.0, tz=tz_utc_8)
-                    
-                    # Gate的计息起点永远是下一个 UTC+8 的 16:00
-                    cutoff_today = now_utc8.replace(hour=16, minute=0, second=0, microsecond=0)
-                    if now_utc8 >= cutoff_today:
-                        next_cutoff = cutoff_today + timedelta(days=1)
-                    else:
-                        next_cutoff = cutoff_today
-                        
-                    next_cutoff_ts = next_cutoff.timestamp() * 1000.0
-                    
-                    # 实际资金锁死的小时数 vs Gate给你发利息的小时数
-                    locked_hours = (expiry_val - current_ts_ms) / 3600000.0
-                    paid_hours = (expiry_val - next_cutoff_ts) / 3600000.0
-                    
-                    real_apy = apy_display
-                    if locked_hours > 0 and paid_hours > 0 and paid_hours < locked_hours:
-                        real_apy = apy_display * (paid_hours / locked_hours)
-                    elif paid_hours <= 0:
-                        real_apy = 0 # 极端情况：如果在交割前几小时买入，利息为0
-                        
-                    res.append({
-                        "coin": name, "strike": float(strike), 
-                        "apy": real_apy,          # 挤掉水分的真实年化（供给雷达和矩阵使用）
-                        "raw_apy": apy_display,   # 页面骗人的高年化（供给排行榜对比用）
-                        "expiry": int(expiry_val), "platform": "Gate"
-                    })
-            return res
-    except: pass
-    return []
-
-# --- 4. 侧边栏 ---
+# --- 3. 侧边栏 ---
 with st.sidebar:
     st.session_state.lang = st.selectbox("🌐 Language", ["中文", "English"], index=0 if st.session_state.lang == "中文" else 1)
     L = LANG_DICT["zh"] if st.session_state.lang == "中文" else LANG_DICT["en"]
     st.header(L["sidebar_ctrl"])
     invest_mode = st.toggle(L["mode_toggle"], value=False)
     mode_key = "Sell High" if invest_mode else "Buy Low"
-    target_coin = st.radio(L["asset_select"], list(COIN_CONFIG.keys()) + ["Hybrid Dashboard"])
+    # 默认只列关注列表（COIN_WATCHLIST），注册表里发现的其他币种按需追加
+    watched = watchlist()
+    registry = coin_config()   # 本次重跑只取这一份；后台刷新只增不减且整体替换，它必含 watched
+    extra_coins = st.multiselect(L["more_coins"], sorted(c for c in registry if c not in watched), key="extra_coins")
+    coins = watched + extra_coins
+    target_coin = st.radio(L["asset_select"], coins + ["Hybrid Dashboard"])
     st.subheader(L["proxy_ctrl"])
-    p_bin, p_okx, p_bit, p_gate = st.checkbox("Binance Proxy", True), st.checkbox("OKX Proxy", True), st.checkbox("Bitget Proxy", True), st.checkbox("Gate Proxy", True)
-    st.button(L["sync_btn"], type="primary", width="stretch")
-
-# --- 5. 数据处理与页面渲染 ---
-all_data, current_prices = [], {}
-items = COIN_CONFIG.items() if "Hybrid" in target_coin else [(target_coin, COIN_CONFIG[target_coin])]
-
-with st.spinner("🚀 同步中..."):
-    for name, cfg in items:
-        price = get_live_prices(name, p_okx)
-        current_prices[name] = price
-        all_data += get_okx(cfg, name, p_okx, mode_key)
-        all_data += get_bitget(cfg, name, p_bit, mode_key)
-        all_data += get_binance(cfg, name, p_bin, mode_key)
-        all_data += get_gate(cfg, name, p_gate, mode_key)
-
-if not all_data:
-    st.warning(L["no_data"])
-else:
-    df = pd.DataFrame(all_data)
-    df['expiry_date'] = df['expiry'].apply(lambda x: date.fromtimestamp(x // 1000))
-    dist_col = L["dist_price"]
-    df[dist_col] = df.apply(lambda r: ((r['strike'] - current_prices.get(r['coin'], 0)) / (current_prices.get(r['coin']) or 1)) * 100, axis=1).round(1)
-    df['display_name'] = df.apply(lambda r: f"{r['coin']}-{r['expiry_date'].strftime('%m%d')}", axis=1)
+    # 自动选路开启时按后台探测的最快线路走（此时才启动探测器），关闭后以下方勾选为准
+    auto_route = st.toggle(L["auto_route"], value=True)
+    prober = get_prober() if auto_route else None
+    p_bin, p_okx, p_bit, p_gate = (st.checkbox(f"{ex} Proxy", True, disabled=auto_route) for ex in ("Binance", "OKX", "Bitget", "Gate"))
+    if auto_route:
+        for ex in ("Binance", "OKX", "Bitget", "Gate"):
+            route, ms = prober.describe(ex)
+            st.caption(f"{ex} → {route}" + (f" · {ms:.0f} ms" if ms is not None else ""))
+    force_sync = st.button(L["sync_btn"], type="primary", width="stretch")
+
+# --- 4. 数据处理与页面渲染 ---
+items = [(c, registry[c]) for c in coins] if "Hybrid" in target_coin else [(target_coin, registry[target_coin])]
+routes = {"OKX": p_okx, "Bitget": p_bit, "Binance": p_bin, "Gate": p_gate}
+if auto_route:
+    routes = {ex: prober.best_route(ex, default=manual) for ex, manual in routes.items()}
+# 注册表过期时在后台刷新，不阻塞本次渲染；新发现的币种下次重跑出现在"更多币种"里
+ensure_fresh(routes)
+
+# 先把页面骨架和占位符铺好，报价逐个交易所返回时只重绘占位符里的内容
+st.title(L["page_title"])
+caption_slot = st.empty()
+status_slot = st.empty()
+metrics_slot = st.empty()
+
+st.markdown("---")
+st.subheader("🕵️‍♂️ 智能监控雷达 (Smart Alerts)")
+col_alert1, col_alert2 = st.columns(2)
+inv_slot, val_slot = col_alert1.empty(), col_alert2.empty()
+st.markdown("---")
+
+col_left, col_right = st.columns([1.35, 0.65])
+col_left.subheader(L["matrix_title"])
+col_right.subheader(L["rank_title"])
+# 排行范围：全网 / 单币种（混合大榜时）/ 单期限，选择框放在占位符外，流式重绘时不重复创建
+rank_scope = col_right.selectbox(L["rank_title"], ["ALL"] + (coins if "Hybrid" in target_coin else []) + list(TENOR_LABELS),
+                                 format_func=lambda s: L["rank_all"] if s == "ALL" else s, label_visibility="collapsed")
+rank_filter = {"coins": (rank_scope,)} if rank_scope in registry else {"tenors": (rank_scope,)} if rank_scope in TENOR_LABELS else {}
+matrix_slot, rank_slot = col_left.empty(), col_right.empty()
+
+dist_col = L["dist_price"]
+STATUS_BADGES = {"pending": "⏳", "ok": "🟢", "failed": "🔴", "stale": "🟡"}
+RENDER_INTERVAL = 0.3   # 抓取过程中两次重绘的最小间隔（秒），最后一次总会重绘
+
+
+def render_status(progress):
+    # 失败 / 用旧数据的交易所附上失败原因（FetchFailed / RateLimited / CircuitOpen）
+    reasons = {}
+    for t in progress.timings:
+        if t.get("error"):
+            reasons.setdefault(t["exchange"], set()).add(t["error"])
+    badges = " · ".join(f"{STATUS_BADGES[state]} {ex} {state}" + (f" ({', '.join(sorted(reasons[ex]))})" if ex in reasons else "")
+                        for ex, state in progress.status.items())
+    status_slot.caption(badges + (f" · {progress.done}/{progress.total} jobs" if progress.done < progress.total else ""))
+
+
+def render_quotes(all_data, current_prices):
+    df = normalize(all_data.to_frame(), current_prices, dist_col)
 
-    st.title(L["page_title"])
-    st.caption(f"{L['last_update']} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
     # --- 智能监控雷达 ---
-    st.markdown("---")
-    st.subheader("🕵️‍♂️ 智能监控雷达 (Smart Alerts)")
-
-    inv_alerts, val_alerts = [], []
-    for (plat, coin, exp), group in df.groupby(['platform', 'coin', 'expiry_date']):
-        g = group.sort_values('strike', ascending=invest_mode).reset_index(drop=True)
-        for i in range(1, len(g)):
-            prev, curr = g.iloc[i-1], g.iloc[i]   
-            
-            apy_diff = prev['apy'] - curr['apy']
-            dist_gain = abs(curr[dist_col] - prev[dist_col]) 
-            
-            if dist_gain == 0: continue
-            asset_lbl = f"{coin}-{exp.strftime('%m%d')}"
-            
-            if apy_diff < 0:
-                inv_alerts.append({
-                    "平台": plat, "标的": asset_lbl,
-                    "档位对比": f"{prev['strike']:g} ({prev['apy']:.1f}%) ➡️ {curr['strike']:g} ({curr['apy']:.1f}%)",
-                    "分析结论": f"安全垫增加 {dist_gain:.1f}%, 真实收益倒挂高出 {abs(apy_diff):.1f}%",
-                    "_sort_diff": abs(apy_diff)
-                })
-            else:
-                cost_effectiveness = 999 if apy_diff == 0 else dist_gain / apy_diff
-                if cost_effectiveness >= 1.5 and dist_gain >= 0.5 and prev['apy'] > 5.0: 
-                    val_alerts.append({
-                        "平台": plat, "标的": asset_lbl,
-                        "档位对比": f"{prev['strike']:g} ({prev['apy']:.1f}%) ➡️ {curr['strike']:g} ({curr['apy']:.1f}%)",
-                        "分析结论": f"牺牲 {apy_diff:.1f}% 真实年化换取 {dist_gain:.1f}% 避险空间",
-                        "_sort_ce": cost_effectiveness
-                    })
-
-    col_alert1, col_alert2 = st.columns(2)
-    with col_alert1:
-        if inv_alerts:
-            inv_df = pd.DataFrame(inv_alerts).sort_values(by="_sort_diff", ascending=False)
+    inv_df, val_df = scan(df, dist_col, ascending=invest_mode)
+    with inv_slot.container():
+        if not inv_df.empty:
             st.error(f"🔴 扫到 {len(inv_df)} 个绝对倒挂机会！(已基于真实收益排雷)")
             st.dataframe(inv_df.drop(columns=["_sort_diff"]), use_container_width=True, hide_index=True)
         else:
             st.info("✅ 暂无绝对倒挂。")
-            
-    with col_alert2:
-        if val_alerts:
-            val_df = pd.DataFrame(val_alerts).sort_values(by="_sort_ce", ascending=False)
+    with val_slot.container():
+        if not val_df.empty:
             st.success(f"🟢 扫到 {len(val_df)} 个高性价比档位！(已剔除注水数据)")
             st.dataframe(val_df.drop(columns=["_sort_ce"]), use_container_width=True, hide_index=True)
         else:
             st.info("✅ 暂无收益衰减异常的高性价比档位。")
 
-    st.markdown("---")
-
     # --- 矩阵与排行 ---
-    col_left, col_right = st.columns([1.35, 0.65])
-    
-    with col_left:
-        st.subheader(L["matrix_title"])
-        for exp_date in sorted(df['expiry_date'].unique()):
+    with matrix_slot.container():
+        # 各家相差几个 tick 的目标价先并到同一标准档位，距离按标准档位重算
+        aligned = df.assign(strike=align_strikes(df['coin'], df['expiry_date'], df['strike']))
+        # 矩阵同一行横跨多家平台，距离统一按参考价计算，避免同一档位因各家现价不同被拆成多行
+        dist = distance_pct(aligned['strike'], aligned['coin'], current_prices.reference)
+        # 缺现价的币种距离为 NaN，作为行索引时 Styler 无法定位，统一转成文本并用占位符
+        aligned[dist_col] = dist.astype(str).where(dist.notna(), "--")
+        matrix = build_matrix(aligned, index=['coin', 'strike', dist_col])
+        for exp_date, pivot in split_by_expiry(matrix):
             st.write(f"📅 **{exp_date.strftime('%m/%d')}**")
-            sub = df[df['expiry_date'] == exp_date].copy()
-            pivot = sub.pivot_table(index=['coin', 'strike', dist_col], columns='platform', values='apy', aggfunc='max').reindex(columns=['Binance', 'OKX', 'Bitget', 'Gate'])
-            pivot['max_val'] = pivot.max(axis=1)
-            pivot = pivot.sort_values('max_val', ascending=False).drop(columns=['max_val'])
             st.dataframe(pivot.style.highlight_max(axis=1, color="#1e4620").format("{:.1f}%", na_rep="--"), width="stretch")
 
-    with col_right:
-        st.subheader(L["rank_title"])
-        # 排行榜基于真实 APY 排序
-        rank_df = df.sort_values("apy", ascending=False).head(30)
-        
-        display_rank = rank_df[['display_name', 'platform', 'apy', 'raw_apy', 'strike']].copy()
-        display_rank.columns = ['Asset', 'Ex', '真实APY', '页面标称', L['target_price']]
-        
-        display_rank['真实APY'] = display_rank['真实APY'].apply(lambda x: f"{x:.1f}%")
-        
+    with rank_slot.container():
+        # 排行榜基于真实 APY：增量同步后只取上榜的 RANK_SIZE 行格式化
+        board.sync(df, mode_key)
+        rank_df = to_frame(board.top(RANK_SIZE, modes=(mode_key,), **rank_filter))
         # 针对虚标数据打上显眼的警告标识
-        def format_raw(row):
-            if row['Ex'] == 'Gate' and abs(row['页面标称'] - float(row['真实APY'].strip('%'))) > 0.1:
-                return f"⚠️ {row['页面标称']:.1f}%"
-            return f"{row['页面标称']:.1f}%"
-            
-        display_rank['页面标称'] = display_rank.apply(format_raw, axis=1)
-        display_rank[L['target_price']] = display_rank[L['target_price']].apply(lambda x: f"{x:g}")
-        
-        display_rank.set_index('Asset', inplace=True)
-        st.table(display_rank)
\ No newline at end of file
+        inflated = (rank_df['platform'] == 'Gate') & ((rank_df['raw_apy'] - rank_df['apy'].round(1)).abs() > 0.1)
+        display_rank = pd.DataFrame({
+            'Asset': rank_df['display_name'],
+            'Ex': rank_df['platform'],
+            '真实APY': [f"{x:.1f}%" for x in rank_df['apy']],
+            '页面标称': [f"{'⚠️ ' if warn else ''}{x:.1f}%" for warn, x in zip(inflated, rank_df['raw_apy'])],
+            L['target_price']: [f"{x:g}" for x in rank_df['strike']],
+        }).set_index('Asset')
+        st.table(display_rank)
+
+
+conn_before = reuse_totals()
+snapshot = None if force_sync else load_latest(max_age=SNAPSHOT_MAX_AGE)
+wanted = {name for name, _ in items}
+# 快照只在覆盖了全部所选币种时才用（轮询器的币种列表可能比看板旧），否则实时抓取
+if snapshot and mode_key in snapshot["modes"] and wanted <= {
+        t["coin"] for t in snapshot["modes"][mode_key]["timings"] if t["exchange"] != "Price"}:
+    all_data = QuoteBatch.from_dict(snapshot["modes"][mode_key]["quotes"]).select(wanted)
+    current_prices = PriceBook.from_dict(snapshot["prices"]).select(wanted)
+    fetch_timings = [dict(t, cache="snapshot") for t in snapshot["modes"][mode_key]["timings"]
+                     if t["coin"] in wanted or t["exchange"] == "Price"]
+    if all_data:
+        render_quotes(all_data, current_prices)
+else:
+    snapshot = None
+    focus = () if "Hybrid" in target_coin else (target_coin,)
+    status_slot.caption("🚀 同步中...")
+    # 每个任务返回就更新状态徽标；报价或现价有变化时重绘（按 RENDER_INTERVAL 节流），首屏只等最快的交易所
+    rendered_at, rendered = 0.0, None
+    for progress in stream_fetch(items, mode_key, routes, force=force_sync, focus=focus):
+        render_status(progress)
+        shown = (len(progress.data), len(progress.prices.exchanges))
+        final = progress.done == progress.total
+        if progress.data and shown != rendered and (final or time.perf_counter() - rendered_at >= RENDER_INTERVAL):
+            render_quotes(progress.data, progress.prices)
+            rendered_at, rendered = time.perf_counter(), shown
+    all_data, current_prices, fetch_timings = progress.data, progress.prices, progress.timings
+conn_after = reuse_totals()
+
+if not all_data:
+    caption_slot.warning(L["no_data"])
+else:
+    updated_at = datetime.fromtimestamp(snapshot["published_at"]) if snapshot else datetime.now()
+    slowest = max(fetch_timings, key=lambda t: t["seconds"])
+    cache_hits = sum(t["cache"] in ("fresh", "stale") for t in fetch_timings)
+    degraded = [f"{t['exchange']}-{t['coin']}" + ("" if t["cache"] == "error" else " (cached)")
+                for t in fetch_timings if t["cache"] in ("error", "fallback")]
+    with caption_slot.container():
+        st.caption(f"{L['last_update']} {updated_at.strftime('%Y-%m-%d %H:%M:%S')}" + (f" · 📦 snapshot v{snapshot['version']}" if snapshot else ""))
+        st.caption(f"🐢 {slowest['exchange']}-{slowest['coin']} {slowest['seconds']:.2f}s / {len(fetch_timings)} jobs"
+                   f" · 🗄️ {cache_hits} cached"
+                   f" · ♻️ {conn_after['reused'] - conn_before['reused']} reused / {conn_after['connections'] - conn_before['connections']} new conns"
+                   + (f" · 🚦 unavailable: {', '.join(degraded)}" if degraded else ""))
+    with metrics_slot.container():
+        with st.expander("📈 抓取指标 (Fetch metrics)"):
+            metric_rows = metrics.summary()
+            if metric_rows:
+                st.dataframe(metric_rows, width="stretch", hide_index=True)
+            else:
+                st.caption("本进程还没有发出过交易所请求（当前数据来自快照）。")
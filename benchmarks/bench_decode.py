@@ -0,0 +1,119 @@
+import glob
+import json
+import os
+import sys
+import time
+
+import decoders
+from exchange_sim import ExchangeSim, OKX_USDT_ID
+
+# 用法: python -m benchmarks.bench_decode [录制目录]
+# 对照"json 全量解析 + 逐字段 float()"（原抓取代码）与 decoders.py 的按 schema 解码。
+# 给了录制目录（HTTP_REPLAY=record 生成）就用真实响应；否则用 exchange_sim 合成，
+# 并给每个产品补上真实接口里常见的无关字段，让负载大小接近线上。
+FILLER = {f"field{i}": "0.0000" for i in range(20)} | {"tags": ["new", "hot"], "desc": {"zh": "双币投资", "en": "Dual"}}
+REPEAT = 20
+
+
+def legacy_okx(content):
+    rows = []
+    for p in json.loads(content).get("data", {}).get("products", []):
+        sk, ay = p.get("strike"), p.get("annualYieldPercentage")
+        if sk and ay:
+            rows.append((float(sk), float(ay), int(p["expiryTime"])))
+    return rows
+
+def legacy_bitget(content):
+    r = json.loads(content)
+    return [(float(p["targetPrice"]), float(p["apy"]), int(g["settleDate"]))
+            for g in r.get("data") or () for p in g.get("productList", [])]
+
+def legacy_binance(content):
+    return [(float(i["strikePrice"]), float(i["apr"]) * 100, int(i["settleTime"]))
+            for i in (json.loads(content).get("data") or {}).get("list") or []]
+
+def legacy_gate(content):
+    rows = []
+    for i in json.loads(content).get("data", []):
+        strike = i.get("exercise_price") or i.get("strike_price")
+        apy = float(i.get("apy_display") or 0) * 100
+        if strike and apy > 0:
+            rows.append((float(strike), apy, int((i.get("delivery_timest") or i.get("end_timest")) * 1000)))
+    return rows
+
+
+CASES = {
+    "OKX": (legacy_okx, decoders.okx_products),
+    "Bitget": (legacy_bitget, lambda c: decoders.bitget_groups(c)[1]),
+    "Binance": (legacy_binance, lambda c: decoders.binance_columns(decoders.binance_page(c)["data"]["list"])),
+    "Gate": (legacy_gate, lambda c: decoders.gate_projects(c, lambda level: True)),
+}
+
+
+def _rows(decoded):
+    # bitget_groups 返回按日期分组的列表，其余为 Columns
+    return sum(len(g[1]) for g in decoded) if isinstance(decoded, list) else len(decoded)
+
+
+def _pad(items):
+    for item in items:
+        item.update(FILLER)
+
+
+def synth_payloads(ladder):
+    sim = ExchangeSim(ladder=ladder)
+    okx = sim.respond("GET", "/priapi/v2/sfp/dcd/products", {"currencyId": "0", "altCurrencyId": str(OKX_USDT_ID), "dcdOptionType": "PUT"}, {})[1]
+    _pad(okx["data"]["products"])
+    bitget = sim.respond("POST", "/v1/finance/dualInvest/ordinary/product/list", {}, {"productTokenId": 1, "direction": 0, "settleDate": sim.expiries[0]})[1]
+    _pad(p for g in bitget["data"] for p in g["productList"])
+    binance = sim.respond("GET", "/bapi/earn/v5/friendly/pos/dc/project/list", {"projectType": "DOWN", "targetAsset": "BTC", "pageSize": str(ladder * sim.n_expiries)}, {})[1]
+    _pad(binance["data"]["list"])
+    gate = sim.respond("GET", "/apiw/v2/earn/dual/project-list", {"coin": "BTC", "type": "put"}, {})[1]
+    _pad(gate["data"])
+    return {ex: [json.dumps(p).encode()] for ex, p in (("OKX", okx), ("Bitget", bitget), ("Binance", binance), ("Gate", gate))}
+
+
+def recorded_payloads(directory):
+    """录制目录里各交易所的成功响应（跳过行情 / 时间等不走解码器的接口）。"""
+    markers = {"OKX": "/sfp/dcd/products", "Bitget": "/product/list", "Binance": "/dc/project/list", "Gate": "/project-list"}
+    out = {}
+    for ex, marker in markers.items():
+        for path in glob.glob(os.path.join(directory, ex, "*.json")):
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+            if record["status"] == 200 and marker in record["key"] and "text" in record:
+                out.setdefault(ex, []).append(record["text"].encode())
+    return out
+
+
+def per_payload_us(fn, payloads):
+    t0 = time.perf_counter()
+    for _ in range(REPEAT):
+        for content in payloads:
+            fn(content)
+    return (time.perf_counter() - t0) / (REPEAT * len(payloads)) * 1e6
+
+
+def report(title, payloads):
+    backend = "msgspec" if decoders.msgspec else "orjson/json"
+    print(f"\n{title}  (decoders backend: {backend})")
+    print(f"{'exchange':>8} | {'payloads':>8} | {'KB/payload':>10} | {'legacy µs':>10} | {'schema µs':>10} | {'speedup':>7}")
+    print("-" * 70)
+    for ex, items in payloads.items():
+        legacy, fast = CASES[ex]
+        assert len(legacy(items[0])) == _rows(fast(items[0])), ex
+        slow_us, fast_us = per_payload_us(legacy, items), per_payload_us(fast, items)
+        kb = sum(map(len, items)) / len(items) / 1024
+        print(f"{ex:>8} | {len(items):>8} | {kb:>10.1f} | {slow_us:>10.0f} | {fast_us:>10.0f} | {slow_us / fast_us:>6.1f}x")
+
+
+def main():
+    if len(sys.argv) > 1:
+        report(f"recorded: {sys.argv[1]}", recorded_payloads(sys.argv[1]))
+        return
+    for ladder in (20, 200):
+        report(f"synthetic ladder={ladder}", synth_payloads(ladder))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import time
+
+from benchmarks.synth import quotes_frame, prices, BASE_EXPIRY_MS, DAY_MS
+from leaderboard import Leaderboard, TENOR_LABELS, tenor_codes
+from normalize import normalize
+from price_oracle import PriceBook
+
+# 用法: python -m benchmarks.bench_leaderboard
+# 对照 app.py 原来的"整表按 apy 排序再 head(30)"，分别计时：首次同步、无变化重同步、
+# 单个来源变化后的增量同步，以及全网 / 单币种 / 单期限三种查询。
+DIST = "距离%"
+NOW_MS = BASE_EXPIRY_MS - 2 * DAY_MS
+MODE = "Buy Low"
+QUERIES = 1_000
+
+
+def frame(n):
+    # 与抓取引擎拼出的表一致：同一 (平台, 币种) 的报价连续排列
+    df = quotes_frame(n).sort_values(["platform", "coin"], kind="stable", ignore_index=True)
+    for col in ("coin", "platform"):
+        df[col] = df[col].astype("category")   # 与 QuoteBatch.to_frame 一致
+    return normalize(df, PriceBook(prices(), {}), DIST, now_ms=NOW_MS)
+
+
+def legacy(df, mask=None):
+    return (df if mask is None else df[mask]).sort_values("apy", ascending=False).head(30)
+
+
+def check(board, df):
+    # 排行对同一产品 (平台, 币种, 交割日, 目标价) 只保留最高年化，对照前先去重
+    ranked = df.sort_values("apy", ascending=False, kind="stable").drop_duplicates(["platform", "coin", "expiry", "strike"])
+    tenors = tenor_codes(ranked["expiry"], NOW_MS)
+    cases = [({}, None)] + [({"coins": (c,)}, ranked["coin"] == c) for c in ranked["coin"].unique()] \
+        + [({"tenors": (t,)}, tenors == i) for i, t in enumerate(TENOR_LABELS)]
+    for query, mask in cases:
+        assert [e.apy for e in board.top(**query)] == legacy(ranked, mask)["apy"].tolist(), query
+    print(f"✅ parity with full sort on {len(df):,} quotes ({len(cases)} scopes)")
+
+
+def ms(fn, *args, repeat=1, **kwargs):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args, **kwargs)
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    check_board = Leaderboard()
+    check_df = frame(20_000)
+    check_board.sync(check_df, MODE, NOW_MS)
+    check(check_board, check_df)
+
+    print(f"{'quotes':>10} | {'sort+head':>9} | {'sync':>8} | {'resync':>8} | {'1 source':>8} | {'top all':>8} | {'top coin':>8} | {'top tenor':>9}")
+    print("-" * 95)
+    for n in (10_000, 100_000, 1_000_000):
+        df = frame(n)
+        board = Leaderboard()
+        first = ms(board.sync, df, MODE, NOW_MS)
+        again = ms(board.sync, df, MODE, NOW_MS)
+        changed = df.copy()
+        changed.loc[(changed["platform"] == "OKX") & (changed["coin"] == "ETH"), "apy"] += 1.0
+        one = ms(board.sync, changed, MODE, NOW_MS)
+        q_all = ms(board.top, repeat=QUERIES)
+        q_coin = ms(board.top, coins=("BTC",), repeat=QUERIES)
+        q_tenor = ms(board.top, tenors=(TENOR_LABELS[2],), repeat=QUERIES)
+        print(f"{n:>10,} | {ms(legacy, df):>7.1f}ms | {first:>6.1f}ms | {again:>6.1f}ms | {one:>6.1f}ms"
+              f" | {q_all * 1000:>6.0f}µs | {q_coin * 1000:>6.0f}µs | {q_tenor * 1000:>7.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
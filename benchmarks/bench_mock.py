@@ -0,0 +1,54 @@
+import os
+import time
+
+# 模拟交易所固定端口；必须在导入抓取模块之前设好 MOCK_EXCHANGE，BASE_URLS 在导入时确定
+PORT = int(os.getenv("BENCH_MOCK_PORT", 18800))
+os.environ["MOCK_EXCHANGE"] = f"http://127.0.0.1:{PORT}"
+
+from exchange_sim import ExchangeSim
+from mock_exchange import MockExchange
+from engine import fetch_all
+from fetchers import SEED_COINS as COIN_CONFIG
+import scheduler
+
+# 用法: python -m benchmarks.bench_mock
+# 对本地模拟交易所跑完整的 fetch_all，观察阶梯规模、单次延迟与限频对总耗时的影响。
+ROUTES = {ex: False for ex in ("OKX", "Bitget", "Binance", "Gate")}
+SCENARIOS = [
+    # (档位数, 延迟秒, 每秒限频)
+    (20, 0.0, None),
+    (20, 0.05, None),
+    (100, 0.05, None),
+    (500, 0.05, None),
+    (20, 0.05, 5),
+]
+
+
+def run(mock, ladder, latency, rate_limit):
+    # 复用同一个服务：重启端口后客户端的长连接仍会落到旧服务的处理线程上
+    mock.sim = ExchangeSim(ladder=ladder)
+    mock.latency, mock.rate_limit = latency, rate_limit
+    mock.counts.clear()
+    scheduler._buckets.clear()   # 每个场景从满桶开始
+    t0 = time.perf_counter()
+    data, _, _ = fetch_all(COIN_CONFIG.items(), "Buy Low", ROUTES, force=True)
+    seconds = time.perf_counter() - t0
+    throttled = sum(n for (_, status), n in mock.counts.items() if status == 429)
+    return seconds, len(data), sum(mock.counts.values()), throttled
+
+
+def main():
+    print(f"{'ladder':>7} | {'latency':>7} | {'limit':>5} | {'seconds':>8} | {'quotes':>7} | {'requests':>8} | {'429':>5}")
+    print("-" * 64)
+    mock = MockExchange(port=PORT)
+    mock.start()
+    try:
+        for ladder, latency, rate_limit in SCENARIOS:
+            seconds, quotes, requests, throttled = run(mock, ladder, latency, rate_limit)
+            print(f"{ladder:>7} | {latency:>7.2f} | {rate_limit or '--':>5} | {seconds:>8.2f} | {quotes:>7,} | {requests:>8} | {throttled:>5}")
+    finally:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import price_feed
+import replay
+import resilience
+import scheduler
+from alignment import align_strikes
+from benchmarks.synth import record_exchange_fixtures, quotes_frame, prices
+from engine import FETCHERS, fetch_all
+from fetchers import SEED_COINS as COIN_CONFIG, _binance_pages, _bitget_dates
+from leaderboard import Leaderboard
+from matrix import build_matrix
+from normalize import normalize, distance_pct
+from price_oracle import PriceBook, TICKER_URLS, fetch_tickers
+from radar import scan
+
+# 用法: python -m pytest benchmarks/bench_pipeline.py   （需要 pip install pytest-benchmark）
+# 默认先用 exchange_sim 合成夹具再离线回放；BENCH_FIXTURES 指向 HTTP_REPLAY=record 录下的目录时回放真实响应，
+# BENCH_LATENCY 为每个请求附加的模拟延迟（秒）。
+DIST = "距离%"
+ROUTES = {ex: False for ex in FETCHERS}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def replayed(tmp_path_factory):
+    directory = os.getenv("BENCH_FIXTURES")
+    if not directory:
+        directory = str(tmp_path_factory.mktemp("fixtures"))
+        record_exchange_fixtures(directory, ladder=40, n_expiries=8)
+    with pytest.MonkeyPatch.context() as mp:
+        # 离线回放：不限频、不对冲、不连现价推送，只量抓取与解析本身
+        mp.setattr(scheduler, "RATE_LIMITS", {ex: (1e9, 1e9) for ex in FETCHERS})
+        mp.setattr(scheduler, "_buckets", {})
+        mp.setattr(resilience, "HEDGE_ENABLED", False)
+        mp.setattr(price_feed, "websocket", None)
+        replay.configure("replay", directory, latency=float(os.getenv("BENCH_LATENCY", 0)))
+        yield directory
+        replay.configure("")
+
+
+def _cold(fetch, cfg, name, mode):
+    # 清掉 Bitget 日期 / Binance 页数缓存，每轮都走完整请求路径
+    _bitget_dates.clear()
+    _binance_pages.clear()
+    return fetch(cfg, name, False, mode)
+
+
+@pytest.mark.parametrize("mode", ["Buy Low", "Sell High"])
+@pytest.mark.parametrize("exchange", list(FETCHERS))
+def test_fetcher(benchmark, exchange, mode):
+    batch = benchmark(_cold, FETCHERS[exchange], COIN_CONFIG["BTC"], "BTC", mode)
+    assert len(batch) > 0
+
+
+def test_price_tickers(benchmark):
+    tickers = benchmark(lambda: {ex: fetch_tickers(ex, False) for ex in TICKER_URLS})
+    assert all(t.get("BTC") for t in tickers.values())
+
+
+def _app_pipeline():
+    # 与 app.py 的数据路径一致：抓取 -> 归一化 -> 雷达 -> 排行 -> 对齐矩阵
+    all_data, book, _ = fetch_all(COIN_CONFIG.items(), "Buy Low", ROUTES, force=True)
+    df = normalize(all_data.to_frame(), book, DIST)
+    inv, val = scan(df, DIST, ascending=False)
+    board = Leaderboard()
+    board.sync(df, "Buy Low")
+    board.top()
+    aligned = df.assign(strike=align_strikes(df["coin"], df["expiry_date"], df["strike"]))
+    aligned[DIST] = distance_pct(aligned["strike"], aligned["coin"], book.reference)
+    return df, build_matrix(aligned, index=["coin", "strike", DIST])
+
+
+def test_fetch_all(benchmark):
+    all_data, book, timings = benchmark(fetch_all, COIN_CONFIG.items(), "Buy Low", ROUTES, force=True)
+    assert len(all_data) > 0 and book.reference["BTC"]
+
+
+def test_app_pipeline(benchmark):
+    df, matrix = benchmark(_app_pipeline)
+    assert len(df) > 0 and len(matrix) > 0
+
+
+# 单独的计算阶段：回放得到的真实规模 + 放大的合成规模
+@pytest.fixture(scope="module", params=["replay", 100_000])
+def frame(request):
+    if request.param == "replay":
+        all_data, book, _ = fetch_all(COIN_CONFIG.items(), "Buy Low", ROUTES, force=True)
+        return all_data.to_frame(), book
+    return quotes_frame(request.param), PriceBook(prices(), {})
+
+
+def test_normalize(benchmark, frame):
+    df, book = frame
+    out = benchmark.pedantic(normalize, setup=lambda: ((df.copy(), book, DIST), {}), rounds=20)
+    assert DIST in out
+
+
+def test_radar(benchmark, frame):
+    df, book = frame
+    df = normalize(df.copy(), book, DIST)
+    benchmark(scan, df, DIST, ascending=False)
+
+
+def test_leaderboard_sync(benchmark, frame):
+    # 同一张表反复同步：只有首轮真正重算，之后测的是"无变化"的增量开销
+    df, book = frame
+    df = normalize(df.copy(), book, DIST)
+    board = Leaderboard()
+    benchmark(board.sync, df, "Buy Low")
+    assert board.top()
+
+
+def test_leaderboard_top(benchmark, frame):
+    df, book = frame
+    board = Leaderboard()
+    board.sync(normalize(df.copy(), book, DIST), "Buy Low")
+    assert len(benchmark(board.top)) == board.k
+
+
+def test_matrix(benchmark, frame):
+    df, book = frame
+    df = normalize(df.copy(), book, DIST)
+    aligned = df.assign(strike=align_strikes(df["coin"], df["expiry_date"], df["strike"]))
+    aligned[DIST] = distance_pct(aligned["strike"], aligned["coin"], book.reference)
+    matrix = benchmark(build_matrix, aligned, index=["coin", "strike", DIST])
+    assert len(matrix) > 0
@@ -0,0 +1,49 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.synth import quotes_frame
+from quotes import QuoteBatch
+
+# 用法: python -m benchmarks.bench_quotes
+N = 200_000
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    obj = build()
+    seconds = time.perf_counter() - t0
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size, seconds
+
+
+def main():
+    rows = list(quotes_frame(N).itertuples(index=False))
+    dicts, dict_bytes, dict_s = measure(lambda: [
+        {"coin": r.coin, "strike": float(r.strike), "apy": float(r.apy), "raw_apy": float(r.raw_apy),
+         "expiry": int(r.expiry), "platform": r.platform} for r in rows])
+
+    def build_batch():
+        b = QuoteBatch()
+        for r in rows:
+            b.append(r.coin, float(r.strike), float(r.apy), float(r.raw_apy), int(r.expiry), r.platform)
+        return b
+    batch, batch_bytes, batch_s = measure(build_batch)
+
+    t0 = time.perf_counter()
+    pd.DataFrame(dicts)
+    dict_frame = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch.to_frame()
+    batch_frame = time.perf_counter() - t0
+
+    print(f"{N:,} quotes")
+    print(f"list[dict]  : {dict_bytes / N:>7.1f} B/quote | build {dict_s * 1000:>7.1f} ms | to DataFrame {dict_frame * 1000:>7.1f} ms")
+    print(f"QuoteBatch  : {batch_bytes / N:>7.1f} B/quote | build {batch_s * 1000:>7.1f} ms | to DataFrame {batch_frame * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import time
+
+import pandas as pd
+
+from benchmarks.synth import quotes_frame, prices
+from normalize import normalize
+from price_oracle import PriceBook
+from radar import detect, scan
+
+# 用法: python -m benchmarks.bench_radar
+DIST = "距离%"
+
+
+def legacy(df, dist_col, invest_mode):
+    # app.py 原来的逐组逐行实现，作为对照
+    inv_alerts, val_alerts = [], []
+    for (plat, coin, exp), group in df.groupby(['platform', 'coin', 'expiry_date']):
+        g = group.sort_values('strike', ascending=invest_mode).reset_index(drop=True)
+        for i in range(1, len(g)):
+            prev, curr = g.iloc[i-1], g.iloc[i]
+            apy_diff = prev['apy'] - curr['apy']
+            dist_gain = abs(curr[dist_col] - prev[dist_col])
+            if dist_gain == 0: continue
+            asset_lbl = f"{coin}-{exp.strftime('%m%d')}"
+            pair = f"{prev['strike']:g} ({prev['apy']:.1f}%) ➡️ {curr['strike']:g} ({curr['apy']:.1f}%)"
+            if apy_diff < 0:
+                inv_alerts.append({"平台": plat, "标的": asset_lbl, "档位对比": pair,
+                                   "分析结论": f"安全垫增加 {dist_gain:.1f}%, 真实收益倒挂高出 {abs(apy_diff):.1f}%",
+                                   "_sort_diff": abs(apy_diff)})
+            else:
+                cost_effectiveness = 999 if apy_diff == 0 else dist_gain / apy_diff
+                if cost_effectiveness >= 1.5 and dist_gain >= 0.5 and prev['apy'] > 5.0:
+                    val_alerts.append({"平台": plat, "标的": asset_lbl, "档位对比": pair,
+                                       "分析结论": f"牺牲 {apy_diff:.1f}% 真实年化换取 {dist_gain:.1f}% 避险空间",
+                                       "_sort_ce": cost_effectiveness})
+    return pd.DataFrame(inv_alerts), pd.DataFrame(val_alerts)
+
+
+def frame(n):
+    # 同组内目标价去重，避免并列档位的排序差异影响对照
+    df = quotes_frame(n).drop_duplicates(["platform", "coin", "expiry", "strike"])
+    return normalize(df.reset_index(drop=True), PriceBook(prices(), {}), DIST)
+
+
+def rows(df, sort_col):
+    # 页面上展示的整行（平台 / 标的 / 档位对比 / 分析结论）加排序键，按多重集合比较
+    if df.empty:
+        return []
+    return sorted(zip(df["平台"].astype(str), df["标的"], df["档位对比"], df["分析结论"], df[sort_col].round(9)))
+
+
+def check(n=5_000):
+    df = frame(n)
+    for mode in (False, True):
+        old_inv, old_val = legacy(df, DIST, mode)
+        new_inv, new_val = scan(df, DIST, ascending=mode)
+        assert rows(old_inv, "_sort_diff") == rows(new_inv, "_sort_diff"), mode
+        assert rows(old_val, "_sort_ce") == rows(new_val, "_sort_ce"), mode
+    print(f"✅ parity with legacy loop on {len(df):,} quotes (full rows)")
+
+
+def main():
+    check()
+    for n in (10_000, 100_000, 1_000_000):
+        df = frame(n)
+        t0 = time.perf_counter()
+        inv, val = detect(df, DIST, ascending=False)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"{len(df):>10,} quotes | {ms:>8.1f} ms | detect: {len(inv):,} inversions, {len(val):,} value picks")
+    df = frame(10_000)
+    t0 = time.perf_counter()
+    legacy(df, DIST, False)
+    print(f"{len(df):>10,} quotes | {(time.perf_counter() - t0) * 1000:>8.1f} ms | legacy loop")
+
+
+if __name__ == "__main__":
+    main()
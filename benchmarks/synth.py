@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# 合成报价：形状与 fetchers 产出的行一致，用于离线基准
+COINS = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "XAUT": 2400.0}
+PLATFORMS = ["Binance", "OKX", "Bitget", "Gate"]
+DAY_MS = 86_400_000
+# 2026-01-01 16:00 UTC+8
+BASE_EXPIRY_MS = 1_767_254_400_000
+
+
+def quotes_frame(n, seed=0, n_expiries=14):
+    rng = np.random.default_rng(seed)
+    coins = np.array(list(COINS), dtype=object)
+    spot = np.array(list(COINS.values()))
+    coin_idx = rng.integers(0, len(coins), n)
+    # 目标价落在现价 ±15% 的整数档位上
+    strike = np.round(spot[coin_idx] * rng.uniform(0.85, 1.15, n), 0)
+    raw_apy = rng.gamma(2.0, 12.0, n).round(2)
+    expiry = BASE_EXPIRY_MS + rng.integers(0, n_expiries, n) * DAY_MS
+    return pd.DataFrame({
+        "coin": coins[coin_idx],
+        "strike": strike,
+        "apy": raw_apy,
+        "raw_apy": raw_apy,
+        "expiry": expiry.astype("int64"),
+        "platform": np.array(PLATFORMS, dtype=object)[rng.integers(0, len(PLATFORMS), n)],
+    })
+
+
+def prices():
+    return dict(COINS)
+
+
+def record_exchange_fixtures(directory, coins=None, modes=("Buy Low", "Sell High"), **sim_kwargs):
+    """用 exchange_sim 合成一份与抓取请求一一对应的回放夹具，写入 directory。"""
+    import replay
+    from engine import FETCHERS
+    from exchange_sim import ExchangeSim
+    from fetchers import SEED_COINS as COIN_CONFIG, _binance_pages, _bitget_dates
+    from price_oracle import TICKER_URLS, fetch_tickers
+
+    replay.configure("record", directory, source=ExchangeSim(**sim_kwargs))
+    try:
+        for ex in TICKER_URLS:
+            fetch_tickers(ex, False)
+        for name in coins or COIN_CONFIG:
+            for mode in modes:
+                _bitget_dates.clear()
+                _binance_pages.clear()
+                for fetch in FETCHERS.values():
+                    fetch(COIN_CONFIG[name], name, False, mode)
+    finally:
+        replay.configure("")
@@ -3,6 +3,7 @@ import json
 import os
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,8 +20,8 @@ COINS = {
 
 def bitget_full_scan(coin_name, p_id):
     """
-    1. 先通过普通请求拿到所有可能的 settleDate
-    2. 针对每个 settleDate 再次发起请求，精准抓取数据
+    1. 先通过普通请求拿到所有可能的 settleDate（顺带复用已返回的产品）
+    2. 只针对缺产品的 settleDate 并发再请求，精准抓取数据
     """
     base_url = "https://www.bitget.cloud/v1/finance/dualInvest/ordinary/product/list"
     headers = {
@@ -45,13 +46,13 @@ def bitget_full_scan(coin_name, p_id):
             print(f"❌ 无法获取日期分组列表")
             return
 
-        # 提取所有 settleDate
+        # 提取所有 settleDate，探测响应中已带产品的日期直接复用
         available_dates = [g.get("settleDate") for g in scan_data["data"] if g.get("settleDate")]
+        found = {str(g["settleDate"]): len(g.get("productList") or []) for g in scan_data["data"] if g.get("settleDate")}
         print(f"📅 探测到 {len(available_dates)} 个潜在到期日: {[datetime.fromtimestamp(int(d)/1000).strftime('%m-%d') for d in available_dates]}")
 
-        # ------------------- 第二步：针对日期暴力抓取 -------------------
-        for ts in available_dates:
-            d_str = datetime.fromtimestamp(int(ts)/1000).strftime('%m-%d')
+        # ------------------- 第二步：并发补齐缺产品的日期 -------------------
+        def fetch_date(ts):
             # 这里的参数 settleDate 是关键，强行指定日期
             payload_detail = {
                 "productTokenId": p_id,
@@ -60,19 +61,19 @@ def bitget_full_scan(coin_name, p_id):
                 "settleDate": str(ts), # 强行传日期参数
                 "fromCalendar": False
             }
-            
-            detail_resp = requests.post(base_url, json=payload_detail, headers=headers, proxies=PROXIES, timeout=10)
-            detail_data = detail_resp.json()
-            
-            # 解析数据
-            found_count = 0
+            detail_data = requests.post(base_url, json=payload_detail, headers=headers, proxies=PROXIES, timeout=10).json()
             if detail_data.get("code") == "200" and detail_data.get("data"):
-                for group in detail_data["data"]:
-                    # 检查是否有 productList
-                    p_list = group.get("productList", [])
-                    if p_list:
-                        found_count += len(p_list)
-            
+                return sum(len(group.get("productList", [])) for group in detail_data["data"])
+            return 0
+
+        missing = [str(ts) for ts in available_dates if not found[str(ts)]]
+        print(f"♻️ 探测响应已含 {len(available_dates) - len(missing)} 个日期的产品，补抓 {len(missing)} 个")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            found.update(zip(missing, pool.map(fetch_date, missing)))
+
+        for ts in available_dates:
+            d_str = datetime.fromtimestamp(int(ts)/1000).strftime('%m-%d')
+            found_count = found[str(ts)]
             if found_count > 0:
                 print(f"✅ 日期 {d_str}: 成功抓取到 {found_count} 条产品!")
             else:
@@ -0,0 +1,171 @@
+import json
+from array import array
+from typing import NamedTuple, Optional, Union
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# --- 按 schema 解码交易所响应 ---
+# 各家产品列表里绝大多数字段抓取代码用不到（OKX / Binance 每个产品几十个字段）。
+# 装了 msgspec 时按声明的 Struct 只解码用到的字段，数字字符串在解码时直接转成 float/int（strict=False），
+# 结果写进紧凑数组；没装或遇到不合 schema 的响应（空字符串、类型变了）时退回 orjson/json 通用解析。
+# 两条路径的过滤条件与必填字段相同，结果逐行一致（tests/test_decoders.py 对照）。
+# 对照基准见 benchmarks/bench_decode.py。
+
+
+class Columns(NamedTuple):
+    """一批报价的数值列；apy 为百分比。"""
+    strike: array
+    apy: array
+    expiry: array
+
+    def __len__(self):
+        return len(self.strike)
+
+
+def _columns(rows):
+    strike, apy, expiry = array("d"), array("d"), array("q")
+    for sk, ay, exp in rows:
+        strike.append(sk)
+        apy.append(ay)
+        expiry.append(exp)
+    return Columns(strike, apy, expiry)
+
+
+def _num(value, cast=float):
+    """通用解析里的数字字段：缺失 / null / 空字符串为 None，其余按 cast 转换（与 msgspec 的 strict=False 对齐）。"""
+    return None if value is None or value == "" else cast(value)
+
+
+def decode(resp, decoder, *args):
+    """用 decoder 解析响应体；经 http_client 发出的响应会把耗时记入 JSON 解码指标。"""
+    timed = getattr(resp, "decode", None)
+    return timed(decoder, *args) if timed else decoder(resp.content, *args)
+
+
+if msgspec is not None:
+    class _OKXProduct(msgspec.Struct):
+        strike: Optional[float] = None
+        annualYieldPercentage: Optional[float] = None
+        expiryTime: Optional[int] = None
+
+    class _OKXData(msgspec.Struct):
+        products: list[_OKXProduct] = []
+
+    class _OKXResp(msgspec.Struct):
+        data: Optional[_OKXData] = None
+
+    class _BitgetProduct(msgspec.Struct):
+        targetPrice: float
+        apy: float
+
+    class _BitgetGroup(msgspec.Struct):
+        settleDate: Optional[int] = None
+        productList: Optional[list[_BitgetProduct]] = None
+
+    class _BitgetResp(msgspec.Struct):
+        code: str = ""
+        data: Optional[list[_BitgetGroup]] = None
+
+    class BinanceItem(msgspec.Struct):
+        id: Union[int, str, None] = None
+        productId: Union[int, str, None] = None
+        strikePrice: float = 0.0
+        apr: float = 0.0
+        settleTime: int = 0
+        duration: Union[int, str, None] = None
+
+        def get(self, key, default=None):
+            # 兼容 binance_project_list 按 dict 取 id 去重
+            return getattr(self, key, default)
+
+    class _BinanceData(msgspec.Struct):
+        total: Optional[int] = None
+        items: list[BinanceItem] = msgspec.field(default=[], name="list")
+
+    class _BinanceResp(msgspec.Struct):
+        data: Optional[_BinanceData] = None
+
+    class _GateProject(msgspec.Struct):
+        exercise_price: Optional[float] = None
+        strike_price: Optional[float] = None
+        apy_display: Optional[float] = None
+        delivery_timest: Optional[int] = None
+        end_timest: Optional[int] = None
+        min_vip_level: Optional[int] = None
+
+    class _GateResp(msgspec.Struct):
+        data: list[_GateProject] = []
+
+    _DECODERS = {name: msgspec.json.Decoder(schema, strict=False) for name, schema in
+                 (("OKX", _OKXResp), ("Bitget", _BitgetResp), ("Binance", _BinanceResp), ("Gate", _GateResp))}
+
+
+def _fast(exchange, content):
+    """按该交易所的 schema 解码；msgspec 不可用或响应不合 schema 时返回 None，由调用方走通用解析。"""
+    if msgspec is None:
+        return None
+    try:
+        return _DECODERS[exchange].decode(content)
+    except (msgspec.ValidationError, msgspec.DecodeError):
+        return None
+
+
+# OKX /priapi/v2/sfp/dcd/products
+def okx_products(content):
+    r = _fast("OKX", content)
+    if r is not None:
+        rows = ((p.strike, p.annualYieldPercentage, p.expiryTime) for p in (r.data.products if r.data else ()))
+    else:
+        rows = ((_num(p.get("strike")), _num(p.get("annualYieldPercentage")), _num(p.get("expiryTime"), int))
+                for p in (_loads(content).get("data") or {}).get("products") or ())
+    # 三个字段都必填，缺失 / null 的产品跳过；值为 0 的照常保留
+    return _columns(row for row in rows if None not in row)
+
+
+# Bitget dualInvest/ordinary/product/list：返回 (code, [(settleDate 或 None, 目标价数组, 年化数组)])
+def bitget_groups(content):
+    r = _fast("Bitget", content)
+    if r is not None:
+        return r.code, [(g.settleDate, array("d", [p.targetPrice for p in g.productList or ()]),
+                         array("d", [p.apy for p in g.productList or ()])) for g in r.data or ()]
+    r = _loads(content)
+    groups = []
+    for g in r.get("data") or ():
+        plist = g.get("productList") or ()
+        groups.append((g.get("settleDate"), array("d", [float(p["targetPrice"]) for p in plist]),
+                       array("d", [float(p["apy"]) for p in plist])))
+    return r.get("code"), groups
+
+
+# Binance /dc/project/list 单页：保持 {"data": {"total", "list"}} 结构供 binance_project_list 翻页
+def binance_page(content):
+    r = _fast("Binance", content)
+    if r is not None:
+        return {"data": r.data and {"total": r.data.total, "list": r.data.items}}
+    return _loads(content)
+
+def binance_columns(items):
+    return _columns((float(i.get("strikePrice")), float(i.get("apr")) * 100, int(i.get("settleTime"))) for i in items)
+
+
+# Gate /apiw/v2/earn/dual/project-list；vip_ok(等级) 决定是否保留
+def gate_projects(content, vip_ok):
+    r = _fast("Gate", content)
+    if r is not None:
+        rows = ((p.exercise_price or p.strike_price, (p.apy_display or 0) * 100, p.delivery_timest or p.end_timest)
+                for p in r.data if vip_ok(p.min_vip_level or 0))
+    else:
+        rows = ((_num(i.get("exercise_price")) or _num(i.get("strike_price")), (_num(i.get("apy_display")) or 0) * 100,
+                 _num(i.get("delivery_timest"), int) or _num(i.get("end_timest"), int))
+                for i in _loads(content).get("data") or () if vip_ok(_num(i.get("min_vip_level"), int) or 0))
+    # 行权价为 0 时取 strike_price；行权价与到期时间都没有、或年化不为正的项目跳过
+    return _columns((sk, ay, exp * 1000) for sk, ay, exp in rows if sk and ay > 0 and exp)
@@ -2,18 +2,17 @@
 import requests
 import time
 from datetime import datetime
-from collections import defaultdict
+import pandas as pd
+
+from matrix import build_matrix, split_by_expiry
+from alignment import align_strikes
+from fetchers import binance_project_list
+from registry import coin_config
 
 # ========== 代理配置 ==========
 PROXIES = {"https": "http://127.0.0.1:7897"}
 
 # ========== OKX 抓取（保持原样）==========
-OKX_CURRENCY_MAP = {
-    "BTC": 0,
-    "ETH": 2,
-    "SOL": 880,
-}
-
 def fetch_okx_products_for_merge(coin, currency_id):
     t = int(time.time() * 1000)
     url = f"https://www.okx.com/priapi/v2/sfp/dcd/products?currencyId={currency_id}&altCurrencyId=7&dcdOptionType=PUT&t={t}"
@@ -47,7 +46,7 @@ def fetch_okx_products_for_merge(coin, currency_id):
         print(f"⚠️ OKX {coin} error: {repr(e)}")
     return []
 
-# ========== Binance 抓取（完全使用你提供的正确接口）==========
+# ========== Binance 抓取（完全使用你提供的正确接口，自动翻页）==========
 def fetch_binance_products_for_merge():
     url = "https://www.binance.com/bapi/earn/v5/friendly/pos/dc/project/list"
     params = {
@@ -55,7 +54,6 @@ def fetch_binance_products_for_merge():
         "targetAsset": "ETH",
         "projectType": "DOWN",
         "sortType": "APY_DESC",
-        "pageIndex": 1,
         "pageSize": 50,
     }
     headers = {
@@ -64,27 +62,27 @@ def fetch_binance_products_for_merge():
         "Accept": "application/json",
     }
     try:
-        resp = requests.get(url, params=params, headers=headers, proxies=PROXIES, timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            products = []
-            for item in data.get("data", {}).get("list", []):
-                strike_price = item.get("strikePrice")
-                settle_time = item.get("settleTime")
-                apr = item.get("apr")
-                if strike_price and settle_time and apr:
-                    try:
-                        products.append({
-                            "strike": float(strike_price),
-                            "apy": float(apr) * 100,
-                            "expiry_time": int(settle_time),
-                            "platform": "binance"
-                        })
-                    except (ValueError, TypeError):
-                        continue
-            return products
-        else:
-            print(f"❌ Binance HTTP {resp.status_code}")
+        def get_page(page_params):
+            resp = requests.get(url, params=page_params, headers=headers, proxies=PROXIES, timeout=10)
+            resp.raise_for_status()
+            return resp.json()
+
+        products = []
+        for item in binance_project_list(get_page, params):
+            strike_price = item.get("strikePrice")
+            settle_time = item.get("settleTime")
+            apr = item.get("apr")
+            if strike_price and settle_time and apr:
+                try:
+                    products.append({
+                        "strike": float(strike_price),
+                        "apy": float(apr) * 100,
+                        "expiry_time": int(settle_time),
+                        "platform": "binance"
+                    })
+                except (ValueError, TypeError):
+                    continue
+        return products
     except Exception as e:
         print(f"⚠️ Binance error: {e}")
     return []
@@ -162,9 +160,6 @@ def fetch_bitget_products_for_merge():
     return []
 
 # ========== 辅助函数（仅用于格式化输出）==========
-def align_strike(strike):
-    return round(strike / 25) * 25
-
 def fmt_ts(ts_ms):
     dt = datetime.fromtimestamp(ts_ms // 1000)
     return dt.strftime("%m/%d %H:%M")
@@ -181,7 +176,7 @@ def main():
     print("🔍 正在抓取三平台 ETH 低买产品...\n")
     time.sleep(0.3)
 
-    okx_products = fetch_okx_products_for_merge("ETH", OKX_CURRENCY_MAP["ETH"])
+    okx_products = fetch_okx_products_for_merge("ETH", coin_config()["ETH"]["okx_id"])
     binance_products = fetch_binance_products_for_merge()
     bitget_products = fetch_bitget_products_for_merge()
 
@@ -191,37 +186,22 @@ def main():
         print("❌ 所有平台均无数据")
         return
 
-    grouped = defaultdict(lambda: defaultdict(dict))
-    for item in all_products:
-        strike = align_strike(item["strike"])
-        platform = item["platform"]
-        apy = item["apy"]
-        expiry = item["expiry_time"]
-        grouped[expiry][strike][platform] = apy
+    df = pd.DataFrame(all_products)
+    df["strike"] = align_strikes("ETH", df["expiry_time"], df["strike"])
+    matrix = build_matrix(df, index=["strike"], expiry_col="expiry_time", platforms=["okx", "binance", "bitget"])
 
     print("\n============================================================")
-    print("📊 三平台 ETH 低买产品对比（目标价已对齐到 25 的倍数）")
+    print("📊 三平台 ETH 低买产品对比（目标价已按容差对齐）")
     print("============================================================")
 
-    for expiry in sorted(grouped.keys()):
-        products = grouped[expiry]
+    for expiry, products in split_by_expiry(matrix):
         print(f"\n📅 到期时间: {fmt_ts(expiry)}")
         print("-" * 62)
         print(f"{'目标价':>8} | {'OKX':>10} | {'Binance':>10} | {'Bitget':>10}")
         print("-" * 62)
 
-        items = list(products.items())
-        def sort_key(item):
-            strike, apys = item
-            max_apy = max(
-                apys.get("okx", -1),
-                apys.get("binance", -1),
-                apys.get("bitget", -1)
-            )
-            return (-max_apy, -strike)
-        sorted_items = sorted(items, key=sort_key)
-
-        for strike, apys in sorted_items:
+        for strike, row in products.iterrows():
+            apys = {k: (None if pd.isna(v) else v) for k, v in row.items()}
             okx_apy = apys.get("okx")
             binance_apy = apys.get("binance")
             bitget_apy = apys.get("bitget")
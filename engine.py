@@ -0,0 +1,178 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+from fetchers import get_okx, get_bitget, get_binance, get_gate
+from price_oracle import TICKER_URLS, PRICE_ORACLE_TTL, PriceBook, fetch_tickers, build_book
+from quote_cache import cached_fetch, last_good
+from quotes import QuoteBatch
+import metrics
+from resilience import UNAVAILABLE_ERRORS
+from scheduler import priority, PRIORITY_PRICE, PRIORITY_FOCUS, PRIORITY_NORMAL
+
+# --- 并发抓取引擎 ---
+# 每个 (交易所, 币种) 是一个独立任务；每家交易所一个常驻线程池，池大小即该平台同时在途的请求上限。
+# 排队的任务留在各自池的队列里、不占线程，慢交易所排长队时不会拖住其他交易所。
+FETCHERS = {
+    "OKX": get_okx,
+    "Bitget": get_bitget,
+    "Binance": get_binance,
+    "Gate": get_gate,
+}
+
+# 每家交易所同时在途的请求上限（"Price" 为各家批量 tickers 接口）
+# （后台刷新走 quote_cache 自己的小线程池，速率仍受各家令牌桶约束）
+EXCHANGE_LIMITS = {"Price": 4, "OKX": 4, "Bitget": 3, "Binance": 4, "Gate": 2}
+
+_POOLS = {ex: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"dual-fetch-{ex.lower()}")
+          for ex, n in EXCHANGE_LIMITS.items()}
+
+
+def build_jobs(items, routes, exchanges=None):
+    """items: [(coin, cfg), ...]；routes: {交易所: 是否走代理}；exchanges 为 None 时抓全部交易所。
+
+    现价每家交易所只有一个任务 ("Price", 交易所, None, 代理)，与币种数无关，也不受 exchanges 限制
+    （参考价取各家中位数）。
+    """
+    jobs = [("Price", ex, None, routes.get(ex, True)) for ex in TICKER_URLS]
+    for name, cfg in items:
+        for ex in exchanges or FETCHERS:
+            jobs.append((ex, name, cfg, routes.get(ex, True)))
+    return jobs
+
+
+def _call(job, mode):
+    ex, name, cfg, use_proxy = job
+    # 后台刷新也走这里，币种标签在此附加
+    with metrics.tagged(coin="" if ex == "Price" else name):
+        if ex == "Price":
+            return fetch_tickers(name, use_proxy)
+        return FETCHERS[ex](cfg, name, use_proxy, mode)
+
+
+def _run_job(job, mode, force, level):
+    ex, name, _, use_proxy = job
+    t0 = time.perf_counter()
+    key = (ex, name, None if ex == "Price" else mode, bool(use_proxy))
+    ttl = PRICE_ORACLE_TTL if ex == "Price" else None
+    error = None
+    # 后台刷新不经过这里，落在调度器的最低优先级
+    with priority(level):
+        try:
+            result, state = cached_fetch(key, lambda: _call(job, mode), force=force, ttl=ttl)
+        except UNAVAILABLE_ERRORS as e:
+            error = type(e).__name__
+            # 请求失败、限频重试用尽或线路熔断：改用最近一次成功的数据，没有才记为失败
+            result = last_good(key)
+            state = "fallback" if result is not None else "error"
+            if result is None:
+                result = {} if ex == "Price" else QuoteBatch()
+    seconds = time.perf_counter() - t0
+    route = "proxy" if use_proxy else "direct"
+    # 现价任务按其交易所记、币种留空
+    exchange, coin = (name, "") if ex == "Price" else (ex, name)
+    metrics.FETCH_SECONDS.observe(seconds, exchange=exchange, coin=coin, route=route, cache=state)
+    metrics.FETCH_PRODUCTS.set(len(result), exchange=exchange, coin=coin, route=route)
+    return result, state, seconds, error
+
+
+def _job_priority(job, focus):
+    if job[0] == "Price":
+        return PRIORITY_PRICE
+    return PRIORITY_FOCUS if job[1] in focus else PRIORITY_NORMAL
+
+
+class FetchProgress(NamedTuple):
+    """stream_fetch 每完成一个任务产出一次的累计结果。"""
+    data: QuoteBatch      # 已返回的报价，按提交顺序合并
+    prices: PriceBook     # 已返回的现价
+    timings: list
+    status: dict          # 交易所（含 "Price"）-> "pending" | "ok" | "failed" | "stale"
+    done: int
+    total: int
+
+
+def _exchange_status(jobs, timings):
+    """按交易所汇总任务状态：有未完成的为 pending；完成后有失败的为 failed，用了旧数据的为 stale。"""
+    states = {}
+    for t in timings:
+        states.setdefault(t["exchange"], []).append(t["cache"])
+    status = {}
+    for ex in dict.fromkeys(job[0] for job in jobs):
+        got = states.get(ex, [])
+        if len(got) < sum(job[0] == ex for job in jobs):
+            status[ex] = "pending"
+        elif "error" in got:
+            status[ex] = "failed"
+        elif "fallback" in got or "stale" in got:
+            status[ex] = "stale"
+        else:
+            status[ex] = "ok"
+    return status
+
+
+def _completed(jobs, mode, force, focus):
+    """提交全部任务，按完成先后产出 (任务序号, 结果, 耗时记录)。
+
+    各交易所池按提交顺序执行，所以按优先级提交：现价、选中币种先排进队列。
+    """
+    levels = [_job_priority(job, focus) for job in jobs]
+    futures = {_POOLS[jobs[idx][0]].submit(_run_job, jobs[idx], mode, force, levels[idx]): idx
+               for idx in sorted(range(len(jobs)), key=levels.__getitem__)}
+    for fut in as_completed(futures):
+        idx = futures[fut]
+        ex, name, _, _ = jobs[idx]
+        result, state, seconds, error = fut.result()
+        yield idx, result, {
+            "exchange": ex, "coin": name, "seconds": round(seconds, 3),
+            "count": len(result), "cache": state, "error": error,
+        }
+
+
+def _merge(jobs, results, coins, okx_route):
+    # 按提交顺序合并，保证与串行版本输出顺序一致；未完成的任务（None）跳过
+    all_data, tickers, prices_done = QuoteBatch(), {}, True
+    for (ex, name, _, _), result in zip(jobs, results):
+        if result is None:
+            prices_done &= ex != "Price"
+            continue
+        if ex == "Price":
+            tickers[name] = result
+        else:
+            all_data += result
+    # 批量现价都返回后，仍缺价的币种才走推送价 / REST 兜底（按现价优先级排队）
+    with priority(PRIORITY_PRICE):
+        return all_data, build_book(coins, tickers, okx_route, fallback=prices_done)
+
+
+def stream_fetch(items, mode, routes, force=False, focus=(), exchanges=None):
+    """与 fetch_all 相同的并发抓取，但每完成一个任务就产出一次 FetchProgress，供页面渐进渲染；
+    最后一次产出即完整结果（与 fetch_all 返回值一致）。"""
+    jobs = build_jobs(items, routes, exchanges)
+    coins = [name for name, _ in items]
+    results, timings = [None] * len(jobs), []
+    for done, (idx, result, timing) in enumerate(_completed(jobs, mode, force, focus), 1):
+        results[idx] = result
+        timings.append(timing)
+        all_data, book = _merge(jobs, results, coins, routes.get("OKX", True))
+        yield FetchProgress(all_data, book, list(timings), _exchange_status(jobs, timings), done, len(jobs))
+
+
+def fetch_all(items, mode, routes, force=False, focus=(), exchanges=None):
+    """并发执行全部任务，返回 (all_data, current_prices, timings)。
+
+    all_data 为合并后的 QuoteBatch，current_prices 为 PriceBook（参考价 + 各家现价）；
+    timings 为每个任务一条 {"exchange", "coin", "seconds", "count", "cache", "error"}，
+    cache 为 "fallback" 表示抓取失败（请求出错/限频/熔断）时用了上次成功的数据，"error" 表示连旧数据也没有；
+    这两种情况下 error 为失败的异常类名（FetchFailed / RateLimited / CircuitOpen），否则为 None。
+    命中缓存的任务不发网络请求，force=True 时全部穿透缓存重抓。
+    focus 中的币种（当前选中的币种）在限频排队时优先于其他币种，现价任务始终最先。
+    exchanges 只抓指定交易所的产品。
+    """
+    jobs = build_jobs(items, routes, exchanges)
+    results, timings = [None] * len(jobs), []
+    for idx, result, timing in _completed(jobs, mode, force, focus):
+        results[idx] = result
+        timings.append(timing)
+    all_data, book = _merge(jobs, results, [name for name, _ in items], routes.get("OKX", True))
+    return all_data, book, timings
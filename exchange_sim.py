@@ -0,0 +1,165 @@
+import json
+import random
+import time
+from urllib.parse import urlparse, parse_qsl
+
+from fetchers import SEED_COINS
+from replay import ReplayResponse
+
+# --- 合成交易所响应 ---
+# 按抓取代码实际访问的接口路径，生成与各交易所同构的 JSON：
+# OKX priapi / 行情、Binance bapi 分页、Bitget 按 settleDate 查询、Gate 列表。
+# 供录制离线基准夹具（replay.configure(source=...)）和本地模拟交易所使用。
+SPOT = {"BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "XAUT": 2400.0, "DOGE": 0.15}
+# 不在种子配置里、只能靠 registry.py 发现的币种
+EXTRA_IDS = {"DOGE": {"okx_id": 16, "bitget_id": 40}}
+OKX_USDT_ID = 7
+BITGET_USDT_ID = 2
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+
+
+# 路径前缀 -> 交易所，用于按交易所限频 / 统计
+PATH_EXCHANGE = (
+    ("/priapi/", "OKX"), ("/api/v5/", "OKX"),
+    ("/bapi/", "Binance"), ("/api/v3/", "Binance"),
+    ("/v1/finance/dualInvest/", "Bitget"), ("/api/v2/", "Bitget"),
+    ("/apiw/", "Gate"), ("/api/v4/", "Gate"),
+)
+# 各交易所限频时的响应体
+RATE_LIMIT_BODIES = {
+    "OKX": {"code": "50011", "msg": "Too Many Requests", "data": []},
+    "Binance": {"code": -1003, "msg": "Too many requests."},
+    "Bitget": {"code": "429", "msg": "Request too frequent"},
+    "Gate": {"label": "TOO_MANY_REQUESTS", "message": "Request Rate limit Exceeded"},
+}
+
+
+def exchange_of(path):
+    for prefix, exchange in PATH_EXCHANGE:
+        if path.startswith(prefix):
+            return exchange
+    return "unknown"
+
+
+class ExchangeSim:
+    def __init__(self, ladder=20, n_expiries=6, seed=0, spot=None, now_ms=None):
+        self.ladder = ladder
+        self.n_expiries = n_expiries
+        self.spot = dict(SPOT if spot is None else spot)
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        # 交割日：从明天起每天 UTC 08:00（UTC+8 16:00）
+        first = (now_ms // DAY_MS + 1) * DAY_MS + 8 * HOUR_MS
+        self.expiries = [first + i * DAY_MS for i in range(n_expiries)]
+        ids = {c: {**SEED_COINS.get(c, {}), **EXTRA_IDS.get(c, {})} for c in self.spot}
+        self._okx_coin = {cfg["okx_id"]: c for c, cfg in ids.items() if cfg.get("okx_id") is not None}
+        self._bitget_coin = {cfg["bitget_id"]: c for c, cfg in ids.items() if cfg.get("bitget_id") is not None}
+        self._ladders = {}
+        self._seed = seed
+
+    # 报价阶梯
+    def ladder_for(self, coin, buy_low):
+        """[(交割日毫秒, 目标价, 年化小数)]，离现价越远年化越低，夹带少量倒挂。"""
+        key = (coin, buy_low)
+        if key not in self._ladders:
+            rng = random.Random(f"{self._seed}-{coin}-{buy_low}")
+            spot = self.spot.get(coin, 100.0)
+            step = spot * min(0.005, 0.5 / self.ladder)   # 阶梯最多铺到现价 ±50%
+            rows = []
+            for d, expiry in enumerate(self.expiries):
+                for i in range(1, self.ladder + 1):
+                    strike = round(spot - i * step if buy_low else spot + i * step, 2)
+                    apr = max(0.6 / (1 + 0.25 * i) * (1 + 0.05 * d) * rng.uniform(0.85, 1.15), 0.01)
+                    rows.append((expiry, strike, round(apr, 4)))
+            self._ladders[key] = rows
+        return self._ladders[key]
+
+    # 请求分发
+    def request(self, method, url, params=None, json=None, **kwargs):
+        u = urlparse(url)
+        query = dict(parse_qsl(u.query))
+        query.update({k: str(v) for k, v in (params or {}).items()})
+        status, payload = self.respond(method.upper(), u.path, query, json or {})
+        return ReplayResponse(status, _dumps(payload))
+
+    def respond(self, method, path, query, body):
+        """返回 (HTTP 状态码, JSON 对象)。"""
+        if path.endswith("/sfp/dcd/products"):
+            return 200, self._okx_products(query)
+        if path == "/api/v5/market/ticker":
+            coin = query.get("instId", "").split("-")[0]
+            return 200, {"code": "0", "data": [{"instId": f"{coin}-USDT", "last": str(self.spot[coin])}] if coin in self.spot else []}
+        if path == "/api/v5/market/tickers":
+            return 200, {"code": "0", "data": [{"instId": f"{c}-USDT", "last": str(p)} for c, p in self.spot.items()]}
+        if path == "/api/v3/ticker/price":
+            return 200, [{"symbol": f"{c}USDT", "price": str(p)} for c, p in self.spot.items()]
+        if path == "/api/v2/spot/market/tickers":
+            return 200, {"code": "00000", "data": [{"symbol": f"{c}USDT", "lastPr": str(p)} for c, p in self.spot.items()]}
+        if path.endswith("/dc/project/list"):
+            return 200, self._binance_list(query)
+        if path.endswith("/dualInvest/ordinary/product/list"):
+            return 200, self._bitget_list(body)
+        if path.endswith("/earn/dual/project-list"):
+            return 200, self._gate_list(query)
+        # 币种 / ID 发现接口（registry.py）
+        if path.endswith("/sfp/dcd/currency-pair"):
+            pairs = [{"currency": c, "currencyId": i} for i, c in self._okx_coin.items()] + [{"currency": "USDT", "currencyId": OKX_USDT_ID}]
+            return 200, {"code": 0, "data": {"currencyPairs": [{"quote": "USDT", "currencyPairs": pairs}]}}
+        if path == "/api/v2/spot/public/coins":
+            coins = [{"coinId": str(i), "coin": c} for i, c in self._bitget_coin.items()] + [{"coinId": str(BITGET_USDT_ID), "coin": "USDT"}]
+            return 200, {"code": "00000", "data": coins}
+        if path == "/api/v4/earn/dual/investment_plan":
+            return 200, [{"id": i, "instrument_name": f"{c}-PUT", "invest_currency": "USDT", "exercise_currency": c, "status": "ONGOING"}
+                         for i, c in enumerate(self.spot, 1)]
+        if path in ("/api/v5/public/time", "/api/v3/time", "/api/v2/public/time"):
+            return 200, {"code": "0", "data": [{"ts": str(int(time.time() * 1000))}], "serverTime": int(time.time() * 1000)}
+        return 404, {"code": "404", "msg": f"unknown path {path}"}
+
+    def _okx_products(self, query):
+        cur, alt = int(query.get("currencyId", -1)), int(query.get("altCurrencyId", -1))
+        coin = self._okx_coin.get(cur) if cur != OKX_USDT_ID else self._okx_coin.get(alt)
+        if coin is None:
+            return {"code": 0, "data": {"products": []}}
+        rows = self.ladder_for(coin, query.get("dcdOptionType") == "PUT")
+        return {"code": 0, "data": {"products": [
+            {"strike": str(sk), "annualYieldPercentage": str(round(apr * 100, 2)), "expiryTime": str(exp)}
+            for exp, sk, apr in rows]}}
+
+    def _binance_list(self, query):
+        up = query.get("projectType") == "UP"
+        coin = query.get("investmentAsset") if up else query.get("targetAsset")
+        # 不指定币种时返回全部币种（registry.py 据此发现 Binance 支持的币种）
+        coins = [coin] if coin else list(self.spot)
+        rows = [(c, *row) for c in coins if c in self.spot for row in self.ladder_for(c, not up)]
+        size, page = int(query.get("pageSize", 100)), int(query.get("pageIndex", 1))
+        chunk = rows[(page - 1) * size: page * size]
+        return {"code": "000000", "data": {"total": len(rows), "list": [
+            {"id": f"{c}-{exp}-{sk}", "investmentAsset": c if up else "USDT", "targetAsset": "USDT" if up else c,
+             "strikePrice": str(sk), "apr": str(apr), "settleTime": exp, "duration": 1}
+            for c, exp, sk, apr in chunk]}}
+
+    def _bitget_list(self, body):
+        coin = self._bitget_coin.get(body.get("productTokenId"))
+        if coin is None:
+            return {"code": "200", "data": []}
+        rows = self.ladder_for(coin, body.get("direction") == 0)
+        by_date = {}
+        for exp, sk, apr in rows:
+            by_date.setdefault(exp, []).append({"targetPrice": str(sk), "apy": str(round(apr * 100, 2))})
+        wanted = body.get("settleDate")
+        if wanted is not None:
+            return {"code": "200", "data": [{"settleDate": int(wanted), "productList": by_date.get(int(wanted), [])}]}
+        # 探测请求：返回全部日期，只有最近一天带产品，其余需按 settleDate 再查
+        return {"code": "200", "data": [{"settleDate": exp, "productList": plist if i == 0 else []}
+                                        for i, (exp, plist) in enumerate(by_date.items())]}
+
+    def _gate_list(self, query):
+        coin = query.get("coin")
+        rows = self.ladder_for(coin, query.get("type") == "put") if coin in self.spot else []
+        return {"code": 0, "data": [
+            {"exercise_price": str(sk), "apy_display": str(apr), "delivery_timest": exp // 1000, "min_vip_level": 0}
+            for exp, sk, apr in rows]}
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(",", ":")).encode()
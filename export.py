@@ -0,0 +1,127 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from registry import coin_config, watchlist
+from engine import fetch_all, FETCHERS
+from normalize import normalize
+from route_probe import get_prober
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# --- 命令行导出 ---
+# 不启动 Streamlit，复用看板的抓取引擎与派生列计算，把任意 币种 × 模式 × 交易所 的报价
+# 以 NDJSON / CSV / Parquet 流式写到标准输出或文件，供 cron 与其他工具消费。
+# 各模式并发抓取，哪个模式先抓完先写出。
+# 用法: python export.py --coins BTC ETH --modes "Buy Low" --format csv --output quotes.csv
+MODES = ["Buy Low", "Sell High"]
+FORMATS = ["ndjson", "csv", "parquet"]
+COLUMNS = ["mode", "coin", "platform", "strike", "apy", "raw_apy", "expiry", "expiry_date", "distance_pct", "fetched_at"]
+
+
+def quotes_frame(items, mode, routes, exchanges):
+    """抓取并规范化一个模式，返回按 COLUMNS 排列的 DataFrame 与各任务耗时。"""
+    fetched_at = int(time.time() * 1000)
+    all_data, prices, timings = fetch_all(items, mode, routes, force=True, exchanges=exchanges)
+    df = normalize(all_data.to_frame(), prices, "distance_pct")
+    df["mode"] = mode
+    df["expiry_date"] = df["expiry_date"].dt.strftime("%Y-%m-%d")
+    df["fetched_at"] = fetched_at
+    for col in ("coin", "platform"):
+        df[col] = df[col].astype(str)
+    return df[COLUMNS], timings
+
+
+class Writer:
+    """按格式把一批批 DataFrame 追加写出；CSV 只写一次表头，Parquet 每批一个 row group。"""
+
+    def __init__(self, fmt, out):
+        self.fmt = fmt
+        self.out = out
+        self.rows = 0
+        self._header_written = False   # 不能用 rows == 0 判断：空批次之后的下一批会再写一遍表头
+        self._parquet = None
+
+    def write(self, df):
+        if self.fmt == "ndjson":
+            if len(df):
+                self.out.write(df.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n") + "\n")
+        elif self.fmt == "csv":
+            df.to_csv(self.out, index=False, header=not self._header_written, lineterminator="\n")
+            self._header_written = True
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.out, table.schema)
+            self._parquet.write_table(table)
+        self.rows += len(df)
+        self.out.flush()
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="双币投资报价导出")
+    parser.add_argument("--coins", nargs="+", default=watchlist(), choices=list(coin_config()),
+                        help="默认 COIN_WATCHLIST；可选范围来自注册表（python registry.py 刷新）")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--exchanges", nargs="+", default=list(FETCHERS), choices=list(FETCHERS))
+    parser.add_argument("--format", default="ndjson", choices=FORMATS)
+    parser.add_argument("--output", default="-", help="输出文件，默认 - 为标准输出")
+    parser.add_argument("--direct", nargs="*", default=[], choices=list(FETCHERS),
+                        help="这些交易所不走 DEFAULT_PROXY")
+    parser.add_argument("--auto-route", action="store_true", help="按探测的延迟自动选择直连/代理，--direct 作为默认值")
+    args = parser.parse_args()
+    if args.format == "parquet" and pa is None:
+        parser.error("parquet 输出需要 pyarrow：pip install pyarrow")
+
+    routes = {ex: ex not in args.direct for ex in FETCHERS}
+    if args.auto_route:
+        prober = get_prober()
+        prober.probe_all()   # 一次性任务，等首轮探测结果再选路
+        routes = {ex: prober.best_route(ex, default=routes[ex]) for ex in FETCHERS}
+    items = [(name, coin_config()[name]) for name in args.coins]
+
+    binary = args.format == "parquet"
+    if args.output == "-":
+        out = sys.stdout.buffer if binary else sys.stdout
+    else:
+        out = open(args.output, "wb" if binary else "w", encoding=None if binary else "utf-8", newline=None if binary else "")
+    writer = Writer(args.format, out)
+    started = time.time()
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(args.modes), thread_name_prefix="export") as pool:
+            futures = {pool.submit(quotes_frame, items, mode, routes, args.exchanges): mode for mode in args.modes}
+            for fut in as_completed(futures):
+                df, timings = fut.result()
+                writer.write(df)
+                failed += [(futures[fut], t) for t in timings if t["cache"] in ("error", "fallback")]
+    finally:
+        writer.close()
+        if out not in (sys.stdout, sys.stdout.buffer):
+            out.close()
+    # 进度信息走 stderr，不混进导出数据；任何任务失败都逐条列出并以非零退出，cron 才能发现缺数据
+    for mode, t in failed:
+        fallback = " · exported last good data" if t["cache"] == "fallback" else ""
+        print(f"🚦 failed: {mode} {t['exchange']}-{t['coin'] or '*'} ({t.get('error') or 'unknown'}){fallback}", file=sys.stderr)
+    print(f"{'⚠️' if failed else '✅'} {writer.rows} quotes in {time.time() - started:.2f}s"
+          + (f" · {len(failed)} failed jobs" if failed else ""), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        # 下游（如 head）提前关闭了管道，属正常结束；把 stdout 指向空设备，避免退出时再报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(0)
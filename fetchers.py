@@ -0,0 +1,229 @@
+import math
+from array import array
+import time
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+from http_client import get_client
+from accrual import vip_allowed
+from quotes import QuoteBatch
+from decoders import decode, okx_products, bitget_groups, binance_page, binance_columns, gate_projects
+from resilience import UNAVAILABLE_ERRORS, FetchFailed, fetch_failed, require_ok
+from scheduler import inherit
+from metrics import fetch_error
+
+load_dotenv()
+
+# 已核实的种子 ID；运行时用的完整币种表见 registry.coin_config()（种子 + 自动发现）
+SEED_COINS = {
+    "BTC":  {"okx_id": 0,     "binance_symbol": "BTC",  "bitget_id": 1,   "gate_symbol": "BTC"},
+    "ETH":  {"okx_id": 2,     "binance_symbol": "ETH",  "bitget_id": 3,   "gate_symbol": "ETH"},
+    "SOL":  {"okx_id": 880,   "binance_symbol": "SOL",  "bitget_id": 235, "gate_symbol": "SOL"},
+    "XAUT": {"okx_id": 140,   "binance_symbol": None,   "bitget_id": None, "gate_symbol": None},
+}
+
+okx_auth = os.getenv("OKX_AUTH")
+
+# 各交易所接口根地址；MOCK_EXCHANGE=http://127.0.0.1:8800 时全部指向本地模拟交易所（mock_exchange.py）
+BASE_URLS = {
+    "OKX": "https://www.okx.com",
+    "Binance": "https://www.binance.com",
+    "BinanceAPI": "https://api.binance.com",
+    "Bitget": "https://www.bitget.cloud",
+    "BitgetAPI": "https://api.bitget.com",
+    "Gate": "https://www.gate.com",
+    "GateAPI": "https://api.gateio.ws",
+}
+MOCK_EXCHANGE = os.getenv("MOCK_EXCHANGE")
+if MOCK_EXCHANGE:
+    BASE_URLS = {k: MOCK_EXCHANGE.rstrip("/") for k in BASE_URLS}
+
+# --- 3. 抓取引擎 ---
+def get_live_prices(coin, use_proxy):
+    """REST 单次查询现价，失败返回 None（调用方据此把距离列置空，而不是按 0 价计算）。"""
+    try:
+        r = get_client("OKX", use_proxy).get(f"{BASE_URLS['OKX']}/api/v5/market/ticker?instId={coin}-USDT", timeout=5).json()
+        return float(r['data'][0]['last'])
+    except UNAVAILABLE_ERRORS: raise
+    except Exception as e:
+        fetch_error("Price", e)
+        return None
+
+def get_okx(cfg, name, use_proxy, mode):
+    c_id = cfg.get("okx_id")
+    if c_id is None: return QuoteBatch()
+    
+    if mode == "Buy Low":
+        opt_type = "PUT"
+        inv_id = c_id  
+        base_id = 7    
+    else:
+        opt_type = "CALL"
+        inv_id = c_id
+        base_id = 7    
+
+    url = f"{BASE_URLS['OKX']}/priapi/v2/sfp/dcd/products?currencyId={inv_id}&altCurrencyId={base_id}&dcdOptionType={opt_type}&t={int(time.time()*1000)}"
+    headers = {
+        "accept": "application/json", 
+        "app-type": "web", 
+        "referer": "https://www.okx.com/zh-hans/earn/dual",
+        "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", 
+        "authorization": okx_auth
+    }
+    client = get_client("OKX", use_proxy)
+    try:
+        cols = decode(require_ok("OKX", client.get(url, headers=headers, timeout=10)), okx_products)
+        if not len(cols) and mode == "Sell High":
+            alt_url = f"{BASE_URLS['OKX']}/priapi/v2/sfp/dcd/products?currencyId=7&altCurrencyId={c_id}&dcdOptionType={opt_type}&t={int(time.time()*1000)}"
+            cols = decode(require_ok("OKX", client.get(alt_url, headers=headers, timeout=10)), okx_products)
+        # OKX不虚标，真实与页面一致
+        return QuoteBatch().extend_columns(name, "OKX", cols.strike, cols.apy, cols.apy, cols.expiry)
+    except UNAVAILABLE_ERRORS: raise
+    except Exception as e: raise fetch_failed("OKX", e) from e
+
+# Bitget 的到期日列表变化很慢，短 TTL 缓存后可跳过"探测"这一轮请求
+BITGET_DATES_TTL = 60
+_bitget_dates = {}  # (productTokenId, direction, use_proxy) -> (缓存时间, [settleDate])
+_SUB_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="dual-sub")
+_NO_PRODUCTS = (array("d"), array("d"))
+
+def _bitget_date_products(post, ts):
+    """某个 settleDate 下的 (目标价数组, 年化数组)；请求失败时抛出，整个任务改用旧数据。"""
+    groups = post({"settleDate": ts})
+    if not groups:
+        return _NO_PRODUCTS
+    strikes, apys = array("d"), array("d")
+    for _, sk, ay in groups:
+        strikes.extend(sk)
+        apys.extend(ay)
+    return strikes, apys
+
+def get_bitget(cfg, name, use_proxy, mode):
+    b_id = cfg.get("bitget_id")
+    if b_id is None: return QuoteBatch()
+    url = f"{BASE_URLS['Bitget']}/v1/finance/dualInvest/ordinary/product/list"
+    direct, t_id = (0, 2) if mode == "Buy Low" else (1, 1)
+    client = get_client("Bitget", use_proxy)
+    payload = {"productTokenId": b_id, "tradeTokenId": t_id, "direction": direct, "fromCalendar": False}
+    key = (b_id, direct, use_proxy)
+
+    def post(extra):
+        code, groups = decode(require_ok("Bitget", client.post(url, json={**payload, **extra}, timeout=10)), bitget_groups)
+        if code != "200":
+            raise fetch_failed("Bitget", FetchFailed(f"Bitget code {code}"))
+        return groups
+
+    by_date = {}
+    try:
+        cached = _bitget_dates.get(key)
+        from_cache = bool(cached) and time.time() - cached[0] < BITGET_DATES_TTL
+        if from_cache:
+            dates = cached[1]
+        else:
+            groups = post({})
+            if not groups: return QuoteBatch()
+            dates = [str(ts) for ts, _, _ in groups if ts]
+            # 探测响应里已经带了部分日期的产品，直接复用
+            for ts, sk, ay in groups:
+                if ts and len(sk):
+                    by_date[str(ts)] = (sk, ay)
+            _bitget_dates[key] = (time.time(), dates)
+        missing = [ts for ts in dates if ts not in by_date]
+        for ts, plist in zip(missing, _SUB_POOL.map(inherit(lambda ts: _bitget_date_products(post, ts)), missing)):
+            by_date[ts] = plist
+        # 缓存的日期拿不到产品，说明日历变了，下次重新探测
+        if from_cache and any(not len(by_date[ts][0]) for ts in dates):
+            _bitget_dates.pop(key, None)
+        res = QuoteBatch()
+        for ts in dates:
+            strikes, apys = by_date[ts]
+            res.extend_columns(name, "Bitget", strikes, apys, apys, array("q", [int(ts)]) * len(strikes))
+        return res
+    except UNAVAILABLE_ERRORS: raise
+    except Exception as e: raise fetch_failed("Bitget", e) from e
+
+# Binance 双币列表分页返回；记住每个资产组合上次的页数，下次第一轮就并发请求全部页
+BINANCE_PAGE_SIZE = 100
+_binance_pages = {}  # (investmentAsset, targetAsset, projectType) -> 页数
+
+def binance_project_list(get_page, params, key=None):
+    """拉全 /dc/project/list 的所有页并按产品去重。get_page(params) 返回解析后的 json。
+
+    第 1 页失败、任一页请求失败（限频 / 熔断 / FetchFailed）直接抛出，由调用方处理；后续页的其他异常只丢该页。
+    """
+    page_size = params.get("pageSize", BINANCE_PAGE_SIZE)
+    pages, last = {}, None
+
+    def fetch(i):
+        return (get_page({**params, "pageIndex": i, "pageSize": page_size}).get("data") or {})
+
+    wave, tried = list(range(1, _binance_pages.get(key, 1) + 1)), set()
+    while wave:
+        tried.update(wave)
+        futures = {_SUB_POOL.submit(inherit(fetch), i): i for i in wave}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            if fut.cancelled(): continue
+            try:
+                data = fut.result()
+            except Exception as e:
+                if i == 1 or isinstance(e, UNAVAILABLE_ERRORS): raise
+                fetch_error("Binance", e)
+                continue
+            pages[i] = data.get("list") or []
+            if data.get("total") is not None:
+                last = min(last or math.inf, max(math.ceil(int(data["total"]) / page_size), 1))
+            if len(pages[i]) < page_size:
+                last = min(last or math.inf, i)
+            # 已知末页后，尚未开始的更靠后的页直接取消
+            if last is not None:
+                for f, j in futures.items():
+                    if j > last: f.cancel()
+        if last is None:
+            # 没有 total 且页页都满：继续往后探一轮
+            if not any(pages.get(i) for i in wave): break
+            nxt = max(pages) + 1
+            wave = list(range(nxt, nxt + len(wave)))
+        else:
+            wave = [i for i in range(1, last + 1) if i not in tried]
+    if key is not None and pages:
+        _binance_pages[key] = last or max(pages)
+
+    seen, products = set(), []
+    for i in sorted(pages):
+        if last is not None and i > last: break
+        for item in pages[i]:
+            pid = item.get("id") or item.get("productId") or (item.get("strikePrice"), item.get("settleTime"), item.get("duration"))
+            if pid in seen: continue
+            seen.add(pid)
+            products.append(item)
+    return products
+
+def get_binance(cfg, name, use_proxy, mode):
+    if not cfg.get("binance_symbol"): return QuoteBatch()
+    p_type = "DOWN" if mode == "Buy Low" else "UP"
+    i_asset = "USDT" if mode == "Buy Low" else cfg["binance_symbol"]
+    t_asset = cfg["binance_symbol"] if mode == "Buy Low" else "USDT"
+    url = f"{BASE_URLS['Binance']}/bapi/earn/v5/friendly/pos/dc/project/list"
+    params = {"investmentAsset": i_asset, "targetAsset": t_asset, "projectType": p_type, "pageSize": BINANCE_PAGE_SIZE}
+    client = get_client("Binance", use_proxy)
+    try:
+        items = binance_project_list(lambda p: decode(require_ok("Binance", client.get(url, params=p, timeout=10)), binance_page), params, key=(i_asset, t_asset, p_type))
+        cols = binance_columns(items)
+        return QuoteBatch().extend_columns(name, "Binance", cols.strike, cols.apy, cols.apy, cols.expiry)
+    except UNAVAILABLE_ERRORS: raise
+    except Exception as e: raise fetch_failed("Binance", e) from e
+
+def get_gate(cfg, name, use_proxy, mode):
+    symbol = cfg.get("gate_symbol")
+    if not symbol: return QuoteBatch()
+    gate_type = "put" if mode == "Buy Low" else "call"
+    url = f"{BASE_URLS['Gate']}/apiw/v2/earn/dual/project-list?coin={symbol}&type={gate_type}"
+    try:
+        resp = require_ok("Gate", get_client("Gate", use_proxy).get(url, timeout=10))
+        cols = decode(resp, gate_projects, lambda level: vip_allowed("Gate", level))
+        # 真实年化（扣除未计息的占用时间）由 accrual.apply_accrual 整列统一计算
+        return QuoteBatch().extend_columns(name, "Gate", cols.strike, cols.apy, cols.apy, cols.expiry)
+    except UNAVAILABLE_ERRORS: raise
+    except Exception as e: raise fetch_failed("Gate", e) from e
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from curl_cffi import requests as requests_cffi, CurlInfo, CurlOpt
+from dotenv import load_dotenv
+
+import metrics
+import replay
+import resilience
+import scheduler
+
+load_dotenv()
+
+env_proxy = os.getenv("DEFAULT_PROXY")
+PROXY_SETTING = {"https": env_proxy, "http": env_proxy} if env_proxy else {}
+
+# --- 长连接客户端层 ---
+# 每个 (交易所, 是否代理) 一个常驻会话，复用 TCP/TLS 连接（Gate 额外复用浏览器指纹与 HTTP/2）。
+# 池大小可通过 HTTP_POOL_SIZE 统一覆盖，需不小于该交易所的并发上限。
+DEFAULT_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+POOL_SIZES = {"OKX": DEFAULT_POOL_SIZE, "Binance": DEFAULT_POOL_SIZE, "Bitget": DEFAULT_POOL_SIZE, "Gate": DEFAULT_POOL_SIZE}
+# 需要浏览器 TLS 指纹的交易所
+IMPERSONATE = {"Gate": "edge101"}
+
+
+class PooledClient:
+    def __init__(self, exchange, use_proxy):
+        self.exchange = exchange
+        self.route = "proxy" if use_proxy else "direct"
+        self.proxies = PROXY_SETTING if use_proxy else {}
+        self.pool_size = POOL_SIZES.get(exchange, DEFAULT_POOL_SIZE)
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method, url, hedge=True, **kwargs):
+        """配置了代理时，本线路迟迟不返回的请求会在另一条线路（直连/代理）上对冲。"""
+        if not (hedge and resilience.HEDGE_ENABLED and PROXY_SETTING):
+            return self.send(method, url, **kwargs)
+        alternate = get_client(self.exchange, self.route == "direct")
+        delay = resilience.latency(self.exchange, self.route).hedge_delay()
+        return resilience.hedge(self.exchange, lambda: self.send(method, url, **kwargs),
+                                lambda: alternate.send(method, url, **kwargs), delay)
+
+    def send(self, method, url, **kwargs):
+        """只走本线路：熔断检查 -> 限频调度 -> 发请求；被限频时按退避重试，重试用尽抛 RateLimited。"""
+        labels = {"exchange": self.exchange, "endpoint": metrics.endpoint_of(url), "route": self.route}
+        breaker = resilience.breaker(self.exchange, self.route)
+        if not breaker.allow():
+            metrics.HTTP_ERRORS.inc(error="CircuitOpen", **labels)
+            raise resilience.CircuitOpen(f"{self.exchange} via {self.route}")
+        bucket = scheduler.limiter(self.exchange)
+        weight, level = scheduler.endpoint_weight(self.exchange, url), scheduler.current_priority()
+        for _ in range(scheduler.MAX_RETRIES + 1):
+            bucket.acquire(weight, level)
+            t0 = time.perf_counter()
+            try:
+                resp = replay.send(self.exchange, self.session, method, url, **kwargs)
+            except Exception as e:
+                breaker.record(False)
+                metrics.HTTP_ERRORS.inc(error=type(e).__name__, **labels)
+                raise
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.requests += 1
+            self._on_response(resp)
+            metrics.HTTP_SECONDS.observe(elapsed, **labels)
+            metrics.HTTP_REQUESTS.inc(status=resp.status_code, **labels)
+            metrics.HTTP_BYTES.inc(len(resp.content), **labels)
+            if resp.status_code >= 500:
+                metrics.HTTP_ERRORS.inc(error=f"HTTP{resp.status_code}", **labels)
+            breaker.record(resp.status_code < 500)
+            hint = scheduler.throttle_hint(self.exchange, resp)
+            if hint is None:
+                bucket.on_success()
+                resilience.latency(self.exchange, self.route).record(elapsed)
+                return metrics.instrument_json(resp, **labels)
+            metrics.HTTP_RETRIES.inc(**labels)
+            bucket.on_throttle(hint)
+        metrics.HTTP_ERRORS.inc(error="RateLimited", **labels)
+        raise scheduler.RateLimited(f"{self.exchange} {method} {url} -> {resp.status_code}")
+
+    def probe(self, method, url, **kwargs):
+        """选路探测专用：同一会话直接发出，不经熔断和限频，不占令牌也不计入熔断失败。"""
+        resp = self.session.request(method, url, **kwargs)
+        with self._lock:
+            self.requests += 1
+        self._on_response(resp)
+        return resp
+
+    def _on_response(self, resp):
+        pass
+
+    def stats(self):
+        connections = self.connections()
+        return {"requests": self.requests, "connections": connections, "reused": max(self.requests - connections, 0)}
+
+
+class RequestsClient(PooledClient):
+    def __init__(self, exchange, use_proxy):
+        super().__init__(exchange, use_proxy)
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.proxies.update(self.proxies)
+
+    def connections(self):
+        # urllib3 每个连接池自带新建连接计数；代理连接在 proxy_manager 下
+        managers = [self.adapter.poolmanager, *self.adapter.proxy_manager.values()]
+        return sum(m.pools[k].num_connections for m in managers for k in m.pools.keys())
+
+
+class CurlClient(PooledClient):
+    def __init__(self, exchange, use_proxy):
+        super().__init__(exchange, use_proxy)
+        self._connects = 0
+        # curl_cffi 的 Session 每个线程一个 curl 句柄，线程池内可安全共享；
+        # 伪装浏览器时 curl 会经 ALPN 协商 HTTP/2，同一连接上多路复用
+        self.session = requests_cffi.Session(
+            impersonate=IMPERSONATE[exchange], proxies=self.proxies,
+            curl_options={CurlOpt.MAXCONNECTS: self.pool_size},
+            curl_infos=[CurlInfo.NUM_CONNECTS],
+        )
+
+    def _on_response(self, resp):
+        n = resp.infos.get(CurlInfo.NUM_CONNECTS, 1)
+        with self._lock:
+            self._connects += n
+
+    def connections(self):
+        return self._connects
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(exchange, use_proxy):
+    key = (exchange, bool(use_proxy))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                cls = CurlClient if exchange in IMPERSONATE else RequestsClient
+                client = _clients[key] = cls(exchange, use_proxy)
+    return client
+
+def reuse_stats():
+    """{(交易所, 线路): {"requests", "connections", "reused"}}，reused 即省掉的握手次数。"""
+    return {(c.exchange, c.route): c.stats() for c in list(_clients.values())}
+
+def reuse_totals():
+    stats = reuse_stats().values()
+    return {k: sum(s[k] for s in stats) for k in ("requests", "connections", "reused")}
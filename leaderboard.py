@@ -0,0 +1,158 @@
+import heapq
+from datetime import datetime
+from itertools import islice
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from normalize import SETTLE_TZ, expiry_dates
+
+# --- 增量 Top-K 收益排行 ---
+# 不再每次重跑都对整张报价表按 apy 全量排序再 head(30)：
+# 报价按来源 (模式, 平台, 币种) 整批更新，每个来源只在各期限档内用 argpartition 部分排序留下前 K 条；
+# 排行分区为 (币种, 期限档, 模式)，分区的 Top-K 由所含来源的有序列表堆归并得到并缓存，
+# 只有来源数据变了才失效。查询"全网 / 单币种 / 单期限"的前 K 名只需再归并命中的分区，与报价总量无关。
+# 对照基准见 benchmarks/bench_leaderboard.py。
+TOP_K = 30
+DAY_MS = 86_400_000
+# 期限档：按结算时区的自然日计算距交割的天数，<= 上限归入该档
+TENORS = ((1, "≤1D"), (3, "≤3D"), (7, "≤1W"), (30, "≤1M"), (None, ">1M"))
+TENOR_LABELS = tuple(label for _, label in TENORS)
+_TENOR_LIMITS = np.array([limit for limit, _ in TENORS if limit is not None])
+
+
+class Entry(NamedTuple):
+    apy: float
+    raw_apy: float
+    strike: float
+    expiry: int
+    coin: str
+    platform: str
+    mode: str
+    tenor: str
+
+
+def _rank(entry):
+    return -entry.apy
+
+
+def _calendar(now_ms=None, tz=SETTLE_TZ):
+    """(结算时区下今天的日序号, 时区偏移毫秒)；期限档只随这两个值变化。"""
+    now = datetime.now(ZoneInfo(tz)) if now_ms is None else datetime.fromtimestamp(now_ms / 1000, ZoneInfo(tz))
+    offset_ms = int(now.utcoffset().total_seconds() * 1000)
+    return (int(now.timestamp() * 1000) + offset_ms) // DAY_MS, offset_ms
+
+
+def tenor_codes(expiry_ms, now_ms=None, tz=SETTLE_TZ, calendar=None):
+    """交割时间戳数组 -> 期限档下标（对应 TENOR_LABELS）。"""
+    today, offset_ms = calendar or _calendar(now_ms, tz)
+    days = (np.asarray(expiry_ms, dtype="int64") + offset_ms) // DAY_MS - today
+    return np.searchsorted(_TENOR_LIMITS, days, side="left")
+
+
+class Leaderboard:
+    """按 (币种, 期限档, 模式) 分区增量维护真实年化 Top-K。"""
+
+    def __init__(self, k=TOP_K):
+        self.k = k
+        self._sources = {}      # (币种, 模式) -> {平台: (数据指纹, {期限档: [Entry] 降序})}
+        self._partitions = {}   # (币种, 期限档, 模式) -> [Entry] 降序，缓存
+
+    def update(self, mode, platform, coin, strike, apy, raw_apy, expiry, now_ms=None):
+        """整批替换一个来源的报价，返回是否有变化；同一 (交割日, 目标价) 只保留年化最高的一条。"""
+        strike, apy, raw_apy = (np.asarray(a, dtype="float64") for a in (strike, apy, raw_apy))
+        expiry = np.asarray(expiry, dtype="int64")
+        calendar = _calendar(now_ms)
+        fingerprint = hash((calendar, strike.tobytes(), apy.tobytes(), raw_apy.tobytes(), expiry.tobytes()))
+        platforms = self._sources.setdefault((coin, mode), {})
+        if platform in platforms and platforms[platform][0] == fingerprint:
+            return False
+
+        by_tenor = {}
+        if len(apy):
+            tenor = tenor_codes(expiry, calendar=calendar)
+            order = np.lexsort((-apy, strike, expiry))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = (expiry[order][1:] != expiry[order][:-1]) | (strike[order][1:] != strike[order][:-1])
+            keep = order[first]
+            for code in np.unique(tenor[keep]):
+                idx = keep[tenor[keep] == code]
+                if len(idx) > self.k:
+                    idx = idx[np.argpartition(-apy[idx], self.k - 1)[:self.k]]
+                idx = idx[np.argsort(-apy[idx], kind="stable")]
+                label = TENOR_LABELS[code]
+                by_tenor[label] = [Entry(a, r, s, e, coin, platform, mode, label) for a, r, s, e in
+                                   zip(apy[idx].tolist(), raw_apy[idx].tolist(), strike[idx].tolist(), expiry[idx].tolist())]
+        platforms[platform] = (fingerprint, by_tenor)
+        self._invalidate(coin, mode)
+        return True
+
+    def discard(self, mode, platform, coin):
+        platforms = self._sources.get((coin, mode), {})
+        if platforms.pop(platform, None) is not None:
+            self._invalidate(coin, mode)
+        if not platforms:
+            self._sources.pop((coin, mode), None)
+
+    def sync(self, df, mode, now_ms=None):
+        """让该模式的排行与 df（已 normalize 的报价表）一致：变化的来源重算，df 里没有的来源移除。返回变化的来源数。"""
+        cols = [df[c].to_numpy() for c in ("strike", "apy", "raw_apy", "expiry")]
+        platform_codes, platforms = pd.factorize(df["platform"])
+        coin_codes, coins = pd.factorize(df["coin"])
+        source = platform_codes.astype("int64") * max(len(coins), 1) + coin_codes
+        # 抓取引擎按任务整批拼接，同一来源本就是连续的一段，直接切片（视图，不拷贝）；
+        # 不连续时（如外部拼出来的表）先按来源稳定排序
+        bounds = _runs(source)
+        starts = source[bounds[:-1]]
+        if len(starts) > len(np.unique(starts)):
+            order = np.argsort(source, kind="stable")
+            source, cols = source[order], [c[order] for c in cols]
+            bounds = _runs(source)
+        seen, changed = set(), 0
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            p, c = divmod(int(source[lo]), max(len(coins), 1))
+            platform, coin = str(platforms[p]), str(coins[c])
+            seen.add((platform, coin))
+            changed += self.update(mode, platform, coin, *(col[lo:hi] for col in cols), now_ms=now_ms)
+        for coin, m in [key for key in self._sources if key[1] == mode]:
+            for platform in [p for p in self._sources[(coin, m)] if (p, coin) not in seen]:
+                self.discard(mode, platform, coin)
+                changed += 1
+        return changed
+
+    def top(self, k=None, coins=None, tenors=None, modes=None):
+        """前 k 名（k 不超过构造时的 K），按真实年化降序；coins / tenors / modes 为 None 表示不限。"""
+        k = self.k if k is None else min(k, self.k)
+        lists = [self._partition(coin, tenor, mode) for coin, mode in self._sources
+                 if (coins is None or coin in coins) and (modes is None or mode in modes)
+                 for tenor in (TENOR_LABELS if tenors is None else tenors)]
+        return list(islice(heapq.merge(*lists, key=_rank), k))
+
+    def _partition(self, coin, tenor, mode):
+        key = (coin, tenor, mode)
+        merged = self._partitions.get(key)
+        if merged is None:
+            lists = [by_tenor.get(tenor, ()) for _, by_tenor in self._sources.get((coin, mode), {}).values()]
+            merged = self._partitions[key] = list(islice(heapq.merge(*lists, key=_rank), self.k))
+        return merged
+
+    def _invalidate(self, coin, mode):
+        for tenor in TENOR_LABELS:
+            self._partitions.pop((coin, tenor, mode), None)
+
+
+def _runs(codes):
+    """连续相同取值的分段边界 [0, ..., len]。"""
+    if not len(codes):
+        return np.zeros(1, dtype="int64")
+    return np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1, [len(codes)]))
+
+
+def to_frame(entries, tz=SETTLE_TZ):
+    """上榜条目转成 DataFrame，并补上与看板一致的 "BTC-0328" 形式 display_name。"""
+    df = pd.DataFrame(entries, columns=Entry._fields)
+    dates = expiry_dates(df["expiry"].astype("int64"), tz)
+    df["display_name"] = [f"{coin}-{date:%m%d}" for coin, date in zip(df["coin"], dates)]
+    return df
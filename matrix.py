@@ -0,0 +1,32 @@
+import numpy as np
+
+# --- 交易所对齐矩阵 ---
+# 一次 groupby 得到 (交割日, 行键..., 平台) -> 最高年化，展开成宽表后整体排一次序：
+# 交割日升序、行内最高年化降序。按交割日切片得到的是同一张宽表上的视图，不再逐日过滤拷贝。
+PLATFORMS = ["Binance", "OKX", "Bitget", "Gate"]
+
+
+def build_matrix(df, index, expiry_col="expiry_date", platform_col="platform", value_col="apy", platforms=PLATFORMS):
+    """返回以 (交割日, *index) 为行、平台为列的宽表，已按交割日、行最高值排好序。"""
+    wide = (df.groupby([expiry_col, *index, platform_col], observed=True, sort=False, dropna=False)[value_col].max()
+              .unstack(platform_col))
+    wide.columns = wide.columns.astype(object)
+    if platforms is not None:
+        wide = wide.reindex(columns=platforms)
+    row_max = wide.max(axis=1).to_numpy(dtype="float64")
+    expiry = wide.index.get_level_values(0).to_numpy()
+    # NaN 取负仍是 NaN，lexsort 会把它排在末尾
+    order = np.lexsort((-row_max, expiry))
+    return wide.iloc[order]
+
+
+def split_by_expiry(matrix):
+    """逐个交割日产出 (交割日, 子表)；子表是 matrix 的连续切片，并去掉交割日这一层索引。"""
+    expiry = matrix.index.get_level_values(0)
+    if len(expiry) == 0:
+        return
+    bounds = np.flatnonzero(expiry[1:] != expiry[:-1]) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(expiry)]))
+    for a, b in zip(starts, ends):
+        yield expiry[a], matrix.iloc[a:b].droplevel(0)
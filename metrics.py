@@ -0,0 +1,245 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- 抓取指标 ---
+# 进程内的轻量指标注册表（计数器 / 仪表 / 直方图），按 Prometheus 文本格式导出。
+# 每次交易所调用记录延迟、字节数、JSON 解码耗时、错误类别与限频重试；
+# 标签里的 coin 来自线程局部上下文（引擎按任务设置，子线程池经 scheduler.inherit 继承）。
+METRICS_PORT = os.getenv("METRICS_PORT")
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DECODE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+
+REGISTRY = []
+_local = threading.local()
+
+
+def current_labels():
+    return getattr(_local, "labels", {})
+
+@contextmanager
+def tagged(**labels):
+    """在当前线程上附加默认标签，如 coin。"""
+    prev = current_labels()
+    _local.labels = {**prev, **labels}
+    try:
+        yield
+    finally:
+        _local.labels = prev
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        ctx = current_labels()
+        return tuple(str(labels.get(n, ctx.get(n, ""))) for n in self.labelnames)
+
+    def _label_text(self, key, extra=()):
+        pairs = [*zip(self.labelnames, key), *extra]
+        return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}" if pairs else ""
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.samples().items()):
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{self._label_text(key)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # 各桶计数（非累计）+ 溢出桶，最后两位为 sum / count
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._values.items()}
+
+    def _render_sample(self, key, counts):
+        lines, cumulative = [], 0
+        for bound, n in zip((*self.buckets, "+Inf"), counts):
+            cumulative += n
+            lines.append(f"{self.name}_bucket{self._label_text(key, [('le', bound)])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {counts[-2]}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {counts[-1]}")
+        return lines
+
+    def quantile(self, counts, q):
+        """按桶线性插值估算分位数；落在溢出桶时返回最大有限边界。"""
+        total = counts[-1]
+        if not total:
+            return None
+        target, cumulative, lower = q * total, 0, 0.0
+        for bound, n in zip(self.buckets, counts):
+            if n and cumulative + n >= target:
+                return lower + (bound - lower) * (target - cumulative) / n
+            cumulative += n
+            lower = bound
+        return self.buckets[-1]
+
+
+HTTP_LABELS = ("exchange", "endpoint", "coin", "route")
+HTTP_REQUESTS = Counter("dual_http_requests_total", "Exchange HTTP responses by status.", (*HTTP_LABELS, "status"))
+HTTP_SECONDS = Histogram("dual_http_request_seconds", "Exchange HTTP request latency.", HTTP_LABELS)
+HTTP_BYTES = Counter("dual_http_response_bytes_total", "Bytes received from exchanges.", HTTP_LABELS)
+HTTP_ERRORS = Counter("dual_http_errors_total", "Failed exchange calls by error class.", (*HTTP_LABELS, "error"))
+HTTP_RETRIES = Counter("dual_http_retries_total", "Requests retried after a rate-limit response.", HTTP_LABELS)
+JSON_SECONDS = Histogram("dual_json_decode_seconds", "Time spent decoding exchange JSON.", HTTP_LABELS, DECODE_BUCKETS)
+FETCH_SECONDS = Histogram("dual_fetch_seconds", "End-to-end fetch job duration.", ("exchange", "coin", "route", "cache"))
+FETCH_PRODUCTS = Gauge("dual_fetch_products", "Products returned by the last fetch job.", ("exchange", "coin", "route"))
+FETCH_ERRORS = Counter("dual_fetch_errors_total", "Exceptions swallowed inside fetchers.", ("exchange", "coin", "error"))
+HEDGE_REQUESTS = Counter("dual_hedge_requests_total", "Slow requests re-sent on the alternate route.", ("exchange",))
+HEDGE_WINS = Counter("dual_hedge_alternate_wins_total", "Hedged requests answered first by the alternate route.", ("exchange",))
+BREAKER_STATE = Gauge("dual_circuit_breaker_state", "Circuit breaker state: 0 closed, 1 half open, 2 open.", ("exchange", "route"))
+
+
+def endpoint_of(url):
+    """URL 路径作为 endpoint 标签（查询参数里的币种 / 时间戳不进标签）。"""
+    return urlparse(url).path or "/"
+
+def instrument_json(resp, **labels):
+    """让 resp.json() 与 resp.decode(decoder)（decoders.py 的按 schema 解码）的耗时记入 JSON_SECONDS。"""
+    def timed(fn):
+        def run(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                JSON_SECONDS.observe(time.perf_counter() - t0, **labels)
+        return run
+    resp.json = timed(resp.json)
+    resp.decode = timed(lambda decoder, *args: decoder(resp.content, *args))
+    return resp
+
+def fetch_error(exchange, exc):
+    """抓取函数内部吞掉的异常也计数，不再无声无息。"""
+    FETCH_ERRORS.inc(exchange=exchange, error=type(exc).__name__)
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary():
+    """按 (交易所, 接口) 汇总成表格行，供页面折叠面板展示。"""
+    rows = {}
+    def row(key):
+        return rows.setdefault((key[0], key[1]), {"exchange": key[0], "endpoint": key[1], "requests": 0,
+                                                  "errors": 0, "retries": 0, "MB": 0.0, "_lat": None, "_json": None})
+    for key, n in HTTP_REQUESTS.samples().items():
+        row(key)["requests"] += n
+    for key, n in HTTP_ERRORS.samples().items():
+        row(key)["errors"] += n
+    for key, n in HTTP_RETRIES.samples().items():
+        row(key)["retries"] += n
+    for key, n in HTTP_BYTES.samples().items():
+        row(key)["MB"] += n / 1e6
+    # 同一 (交易所, 接口) 下不同 coin / route 的直方图逐桶相加
+    for hist, field in ((HTTP_SECONDS, "_lat"), (JSON_SECONDS, "_json")):
+        for key, counts in hist.samples().items():
+            r = row(key)
+            r[field] = counts if r[field] is None else [a + b for a, b in zip(r[field], counts)]
+    out = []
+    for r in rows.values():
+        lat, dec = r.pop("_lat"), r.pop("_json")
+        p50 = HTTP_SECONDS.quantile(lat, 0.5) if lat else None
+        p95 = HTTP_SECONDS.quantile(lat, 0.95) if lat else None
+        r["p50 ms"] = None if p50 is None else round(p50 * 1000)
+        r["p95 ms"] = None if p95 is None else round(p95 * 1000)
+        r["json ms"] = round(dec[-2] / dec[-1] * 1000, 2) if dec and dec[-1] else None
+        r["MB"] = round(r["MB"], 3)
+        out.append(r)
+    return sorted(out, key=lambda r: (r["exchange"], r["endpoint"]))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+def serve(port, host="0.0.0.0"):
+    """在后台线程启动 /metrics 端点；同一端口重复调用（如 Streamlit 重跑）直接复用。"""
+    port = int(port)
+    with _servers_lock:
+        server = _servers.get(port)
+        if server is None:
+            server = _servers[port] = ThreadingHTTPServer((host, port), _Handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
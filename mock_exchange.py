@@ -0,0 +1,142 @@
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque, Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
+
+from exchange_sim import ExchangeSim, RATE_LIMIT_BODIES, exchange_of
+
+# --- 本地模拟交易所 ---
+# 在一个端口上模拟 app 用到的全部接口（路径与真实交易所一致），可配置延迟、错误率、限频与阶梯规模，
+# 用于压测并发 / 缓存 / 限频策略。启动后设置 MOCK_EXCHANGE=http://127.0.0.1:<端口> 即可让看板和轮询器指向它。
+# 用法: python mock_exchange.py --port 8800 --latency 0.05 --error-rate 0.02 --rate-limit 20 --ladder 50
+# GET /__stats 返回各交易所的请求与状态码计数。
+
+
+class MockExchange:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 rate_limit=None, ladder=20, n_expiries=6, seed=0):
+        self.sim = ExchangeSim(ladder=ladder, n_expiries=n_expiries, seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit          # 每家交易所每秒请求上限，None 不限
+        self.counts = Counter()               # (交易所, 状态码) -> 次数
+        self._windows = {}                    # 交易所 -> 最近 1 秒内的请求时间
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _limited(self, exchange):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.setdefault(exchange, deque())
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+            if len(window) >= self.rate_limit:
+                return True
+            window.append(now)
+            return False
+
+    def handle(self, method, raw_path, body):
+        """返回 (状态码, 额外响应头, JSON 对象)。"""
+        u = urlparse(raw_path)
+        if u.path == "/__stats":
+            return 200, {}, {f"{ex} {status}": n for (ex, status), n in sorted(self.counts.items())}
+        exchange = exchange_of(u.path)
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if self._limited(exchange):
+            status, headers, payload = 429, {"Retry-After": "1"}, RATE_LIMIT_BODIES.get(exchange, {"msg": "rate limited"})
+        elif self.error_rate and self._rng.random() < self.error_rate:
+            status, headers, payload = 500, {}, {"code": "500", "msg": "injected error"}
+        else:
+            status, payload = self.sim.respond(method, u.path, dict(parse_qsl(u.query)), body)
+            headers = {}
+        with self._lock:
+            self.counts[(exchange, status)] += 1
+        return status, headers, payload
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # 保持长连接，与真实交易所一致
+
+            def _reply(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                status, headers, payload = mock.handle(method, self.path, body)
+                data = json.dumps(payload, separators=(",", ":")).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """后台线程启动，返回根地址（供测试 / 基准在进程内使用）。"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.server.serve_forever, name="mock-exchange", daemon=True)
+            self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟交易所")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="在固定延迟上叠加 0~jitter 秒的随机延迟")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 500 的比例")
+    parser.add_argument("--rate-limit", type=int, default=None, help="每家交易所每秒请求上限，超出返回 429")
+    parser.add_argument("--ladder", type=int, default=20, help="每个交割日的档位数")
+    parser.add_argument("--expiries", type=int, default=6, help="交割日个数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockExchange(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                        args.rate_limit, args.ladder, args.expiries, args.seed)
+    print(f"🧪 mock exchange on {mock.url}  (MOCK_EXCHANGE={mock.url})")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
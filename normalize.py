@@ -0,0 +1,55 @@
+import os
+import numpy as np
+import pandas as pd
+
+from accrual import apply_accrual
+
+# --- 派生列向量化构建 ---
+# 交割日按显式结算时区换算（各交易所均以 UTC+8 16:00 结算），不再依赖运行机器的本地时区。
+SETTLE_TZ = os.getenv("SETTLE_TZ", "Asia/Shanghai")
+
+
+def expiry_dates(expiry_ms, tz=SETTLE_TZ):
+    """毫秒时间戳 -> 结算时区下的交割日（tz-naive 的当日零点 datetime64）。"""
+    local = pd.to_datetime(expiry_ms, unit="ms", utc=True).dt.tz_convert(tz)
+    return local.dt.tz_localize(None).dt.normalize()
+
+
+def distance_pct(strike, coin, prices, platform=None, platform_prices=None):
+    """(目标价 - 现价) / 现价 * 100，现价按币种映射成 Series 后整列计算；缺价的币种得到 NaN。
+
+    给出 platform 与 platform_prices ({交易所: {币种: 价格}}) 时，每行优先用所在交易所自己的现价，
+    该交易所没有报价的再回退到 prices（参考价）。
+    """
+    px = coin.map(prices).astype("float64")
+    if platform is not None and platform_prices:
+        for ex, ex_prices in platform_prices.items():
+            mask = (platform == ex).to_numpy()
+            if mask.any():
+                own = coin[mask].map(ex_prices).astype("float64")
+                px[mask] = own.fillna(px[mask])
+    return ((strike - px) / px.where(px > 0) * 100).round(1)
+
+
+def display_labels(coin, expiry_date):
+    """"BTC-0328" 形式的分类标签，只对去重后的 (币种, 交割日) 组合做字符串格式化。"""
+    coin_codes, coin_uniques = pd.factorize(coin)
+    exp_codes, exp_uniques = pd.factorize(expiry_date)
+    n_exp = max(len(exp_uniques), 1)
+    pair_codes, pair_uniques = pd.factorize(coin_codes.astype("int64") * n_exp + exp_codes)
+    labels = np.array([f"{coin_uniques[p // n_exp]}-{exp_uniques[p % n_exp]:%m%d}" for p in pair_uniques], dtype=object)
+    # 跨年同月日会得到相同标签，再去一次重保证类别唯一
+    label_codes, categories = pd.factorize(labels)
+    return pd.Categorical.from_codes(label_codes[pair_codes], categories=categories)
+
+
+def normalize(df, prices, dist_col, tz=SETTLE_TZ, now_ms=None):
+    """在 df 上原地按计息模型重算 apy，并补齐 expiry_date / 距离% / display_name 三列后返回 df。
+
+    prices 为 price_oracle.PriceBook，距离按各平台自家现价计算。
+    """
+    apply_accrual(df, now_ms)
+    df["expiry_date"] = expiry_dates(df["expiry"], tz)
+    df[dist_col] = distance_pct(df["strike"], df["coin"], prices.reference, df["platform"], prices.exchanges)
+    df["display_name"] = display_labels(df["coin"], df["expiry_date"])
+    return df
@@ -2,12 +2,7 @@ import requests
 import time
 from datetime import datetime
 
-# OKX 币种映射
-OKX_CURRENCY_MAP = {
-    "BTC": 0,
-    "ETH": 2,
-    "XAUT": 16789,
-}
+from registry import coin_config
 
 def fetch_okx_products(coin, currency_id):
     t = int(time.time() * 1000)
@@ -64,4 +59,4 @@ def fetch_okx_products(coin, currency_id):
 
 if __name__ == "__main__":
     for coin in ["BTC", "ETH", "XAUT"]:
-        fetch_okx_products(coin, OKX_CURRENCY_MAP[coin])
\ No newline at end of file
+        fetch_okx_products(coin, coin_config()[coin]["okx_id"])
\ No newline at end of file
@@ -3,6 +3,10 @@ import time
 from datetime import datetime
 from collections import defaultdict
 
+from alignment import align_strikes
+from fetchers import binance_project_list
+from registry import coin_config
+
 # ===== 代理设置（根据你的环境）=====
 USE_PROXY = True
 PROXIES = {"http": "http://127.0.0.1:7897", "https": "http://127.0.0.1:7897"} if USE_PROXY else None
@@ -10,10 +14,9 @@ PROXIES = {"http": "http://127.0.0.1:7897", "https": "http://127.0.0.1:7897"} if
 # ========================
 # 1. OKX - 完全使用你提供的代码
 # ========================
-OKX_CURRENCY_MAP = {"BTC": 0, "ETH": 2, "SOL": 880}
-
 def fetch_okx_products(coin="ETH"):
-    currency_id = OKX_CURRENCY_MAP.get(coin)
+    # OKX currencyId 来自币种注册表（种子 + 自动发现）
+    currency_id = coin_config().get(coin, {}).get("okx_id")
     if currency_id is None:
         return []
     t = int(time.time() * 1000)
@@ -54,7 +57,6 @@ def fetch_binance_dcd(coin="ETH"):
         "targetAsset": coin,
         "projectType": "DOWN",
         "sortType": "APY_DESC",
-        "pageIndex": 1,
         "pageSize": 50,
     }
     headers = {
@@ -63,31 +65,34 @@ def fetch_binance_dcd(coin="ETH"):
         "Accept": "application/json",
     }
     try:
-        response = requests.get(url, params=params, headers=headers, proxies=PROXIES, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            projects = data.get("data", {}).get("list", [])
-            result = []
-            for p in projects:
-                strike_price = p.get("strikePrice")
-                settle_time = p.get("settleTime")  # 字符串，毫秒
-                apr = p.get("apr")  # 小数字符串，如 "1.8216"
-
-                if not strike_price or not settle_time or not apr:
-                    continue
-
-                try:
-                    strike = float(strike_price)
-                    apy = float(apr) * 100  # 转为百分比
-                    settle_ts = int(settle_time)
-                    result.append({
-                        "strike": strike,
-                        "apy": apy,
-                        "expiry_time": settle_ts
-                    })
-                except (ValueError, TypeError):
-                    continue
-            return result
+        def get_page(page_params):
+            response = requests.get(url, params=page_params, headers=headers, proxies=PROXIES, timeout=10)
+            response.raise_for_status()
+            return response.json()
+
+        # 自动翻页拉全，并按产品去重
+        projects = binance_project_list(get_page, params)
+        result = []
+        for p in projects:
+            strike_price = p.get("strikePrice")
+            settle_time = p.get("settleTime")  # 字符串，毫秒
+            apr = p.get("apr")  # 小数字符串，如 "1.8216"
+
+            if not strike_price or not settle_time or not apr:
+                continue
+
+            try:
+                strike = float(strike_price)
+                apy = float(apr) * 100  # 转为百分比
+                settle_ts = int(settle_time)
+                result.append({
+                    "strike": strike,
+                    "apy": apy,
+                    "expiry_time": settle_ts
+                })
+            except (ValueError, TypeError):
+                continue
+        return result
     except Exception as e:
         print(f"⚠️ Binance {coin} error: {e}")
     return []
@@ -109,16 +114,11 @@ def main():
     all_expiry = set(p["expiry_time"] for p in (okx_data + binance_data))
     grouped = defaultdict(lambda: defaultdict(dict))
 
-    # 填入 OKX
-    for p in okx_data:
-        # 四舍五入到最近的 25 美元（对齐报价）
-        strike_rounded = round(p["strike"] / 25) * 25
-        grouped[p["expiry_time"]][strike_rounded]["okx"] = p["apy"]
-
-    # 填入 Binance
-    for p in binance_data:
-        strike_rounded = round(p["strike"] / 25) * 25
-        grouped[p["expiry_time"]][strike_rounded]["binance"] = p["apy"]
+    # 按 ETH 相对容差把两家目标价对齐到同一档位
+    rows = [(p, "okx") for p in okx_data] + [(p, "binance") for p in binance_data]
+    aligned = align_strikes("ETH", [p["expiry_time"] for p, _ in rows], [p["strike"] for p, _ in rows])
+    for (p, platform), strike in zip(rows, aligned):
+        grouped[p["expiry_time"]][strike][platform] = p["apy"]
 
     def fmt_ts(ts_ms):
         return datetime.fromtimestamp(ts_ms // 1000).strftime("%m/%d %H:%M")
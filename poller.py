@@ -0,0 +1,63 @@
+import argparse
+import time
+from datetime import datetime
+
+from registry import coin_config, watchlist, ensure_fresh
+from engine import fetch_all, FETCHERS
+from snapshot_store import publish
+from route_probe import get_prober
+import metrics
+
+# --- 后台轮询进程 ---
+# 与 Streamlit 脱钩：按固定节奏刷新全部 交易所/币种/模式，并发布到本地快照仓库。
+# 用法: python poller.py --interval 20
+MODES = ["Buy Low", "Sell High"]
+
+
+def poll_once(coins, modes, routes):
+    items = [(name, coin_config()[name]) for name in coins]
+    snapshot_modes, prices = {}, None
+    for mode in modes:
+        all_data, current_prices, timings = fetch_all(items, mode, routes, force=True)
+        snapshot_modes[mode] = {"quotes": all_data.to_dict(), "timings": timings}
+        # 同一轮两种模式各取一次价格，取参考价更全的那一份
+        if prices is None or sum(p is not None for p in current_prices.reference.values()) >= sum(p is not None for p in prices.reference.values()):
+            prices = current_prices
+    return publish(snapshot_modes, prices._asdict())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="双币投资报价轮询器")
+    parser.add_argument("--interval", type=float, default=20, help="两轮抓取之间的间隔秒数")
+    parser.add_argument("--coins", nargs="+", default=watchlist(), choices=list(coin_config()))
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--direct", nargs="*", default=[], choices=list(FETCHERS),
+                        help="这些交易所不走 DEFAULT_PROXY")
+    parser.add_argument("--auto-route", action="store_true", help="按后台探测的延迟自动选择直连/代理，--direct 作为默认值")
+    parser.add_argument("--metrics-port", type=int, default=metrics.METRICS_PORT,
+                        help="在该端口暴露 Prometheus /metrics（默认读 METRICS_PORT）")
+    parser.add_argument("--once", action="store_true", help="只抓一轮后退出")
+    args = parser.parse_args()
+
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    routes = {ex: ex not in args.direct for ex in FETCHERS}
+    prober = get_prober() if args.auto_route else None
+    while True:
+        started = time.time()
+        if prober is not None:
+            routes = {ex: prober.best_route(ex, default=ex not in args.direct) for ex in FETCHERS}
+        # 注册表过期时在后台刷新，不拖慢本轮抓取
+        ensure_fresh(routes)
+        try:
+            version = poll_once(args.coins, args.modes, routes)
+            print(f"[{datetime.now():%H:%M:%S}] 📦 snapshot v{version} ({time.time() - started:.2f}s)")
+        except Exception as e:
+            print(f"[{datetime.now():%H:%M:%S}] ⚠️ poll failed: {e!r}")
+        if args.once:
+            break
+        time.sleep(max(args.interval - (time.time() - started), 0))
+
+
+if __name__ == "__main__":
+    main()
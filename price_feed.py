@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+from fetchers import get_live_prices
+from http_client import env_proxy
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+load_dotenv()
+
+# --- 实时现价推送 ---
+# 订阅 OKX 公共 WebSocket 的 tickers 频道，常驻内存保存 {币种: (现价, 收到时间)}，
+# 页面重跑时直接读内存；socket 断开或价格过旧时退回 REST 单次查询。
+# OKX_WS_URL 可指向本地替身服务，便于离线测试；指向模拟交易所（MOCK_EXCHANGE）时默认不连推送，只走 REST。
+OKX_WS_URL = os.getenv("OKX_WS_URL", "" if os.getenv("MOCK_EXCHANGE") else "wss://ws.okx.com:8443/ws/v5/public")
+PRICE_MAX_AGE = float(os.getenv("PRICE_MAX_AGE", 10))   # 超过该秒数的推送价视为过期
+RECONNECT_DELAY = 3
+PING_INTERVAL = 20   # OKX 30 秒无数据会断开，定时发文本 "ping" 保活
+
+
+def _proxy_options(proxy):
+    if not proxy:
+        return {}
+    u = urlparse(proxy)
+    proxy_type = u.scheme if u.scheme in ("socks4", "socks4a", "socks5", "socks5h") else "http"
+    opts = {"http_proxy_host": u.hostname, "http_proxy_port": u.port, "proxy_type": proxy_type}
+    if u.username:
+        opts["http_proxy_auth"] = (u.username, u.password or "")
+    return opts
+
+
+class PriceFeed:
+    def __init__(self, url=OKX_WS_URL, proxy=None, rest_fallback=None, max_age=PRICE_MAX_AGE):
+        self.url = url
+        self.proxy = proxy
+        self.rest_fallback = rest_fallback   # coin -> 价格或 None
+        self.max_age = max_age
+        self.connected = False
+        self._prices = {}                    # coin -> (价格, 时间戳, "ws"|"rest")
+        self._misses = {}                    # coin -> REST 兜底失败的时间，max_age 内不再重试
+        self._coins = set()
+        self._lock = threading.Lock()
+        self._ws = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # 连接管理
+    def start(self):
+        if websocket is None or not self.url or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._ws is not None:
+            self._ws.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._ws = websocket.WebSocketApp(self.url, on_open=self._on_open, on_message=self._on_message,
+                                              on_close=self._on_close, on_error=lambda ws, e: None)
+            try:
+                self._ws.run_forever(**_proxy_options(self.proxy))
+            except Exception:
+                pass
+            self.connected = False
+            self._stop.wait(RECONNECT_DELAY)
+
+    def _on_open(self, ws):
+        self.connected = True
+        with self._lock:
+            coins = list(self._coins)
+        self._send_subscribe(coins)
+        threading.Thread(target=self._keepalive, args=(ws,), daemon=True).start()
+
+    def _on_close(self, ws, *args):
+        self.connected = False
+
+    def _keepalive(self, ws):
+        while self._ws is ws and self.connected and not self._stop.wait(PING_INTERVAL):
+            try:
+                ws.send("ping")
+            except Exception:
+                return
+
+    def _send_subscribe(self, coins):
+        if not coins or not self.connected:
+            return
+        args = [{"channel": "tickers", "instId": f"{c}-USDT"} for c in coins]
+        try:
+            self._ws.send(json.dumps({"op": "subscribe", "args": args}))
+        except Exception:
+            pass
+
+    def _on_message(self, ws, message):
+        if message == "pong":
+            return
+        try:
+            msg = json.loads(message)
+            if msg.get("arg", {}).get("channel") != "tickers":
+                return
+            now = time.time()
+            for t in msg.get("data", []):
+                coin = t["instId"].split("-")[0]
+                self._prices[coin] = (float(t["last"]), now, "ws")
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    # 读取
+    def subscribe(self, coins):
+        with self._lock:
+            new = [c for c in coins if c not in self._coins]
+            self._coins.update(new)
+        self._send_subscribe(new)
+
+    def latest(self, coin, max_age=None):
+        """内存中的 (价格, 时间戳, 来源)；没有或已过期返回 None。"""
+        entry = self._prices.get(coin)
+        max_age = self.max_age if max_age is None else max_age
+        if entry is None or time.time() - entry[1] > max_age:
+            return None
+        return entry
+
+    def get(self, coin, max_age=None):
+        """现价；推送价缺失/过期时走 REST 兜底，仍失败返回 None（不再返回 0）。"""
+        self.subscribe([coin])
+        entry = self.latest(coin, max_age)
+        if entry is not None:
+            return entry[0]
+        max_age = self.max_age if max_age is None else max_age
+        if self.rest_fallback is None or time.time() - self._misses.get(coin, 0) < max_age:
+            return None
+        try:
+            price = self.rest_fallback(coin)
+        except Exception:   # 限频 / 熔断等已在请求层计数
+            price = None
+        if price:
+            self._prices[coin] = (price, time.time(), "rest")
+        else:
+            self._misses[coin] = time.time()
+        return price or None
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+def get_feed(use_proxy=True):
+    """每条线路一个常驻推送连接，首次调用时启动。"""
+    key = bool(use_proxy)
+    feed = _feeds.get(key)
+    if feed is None:
+        with _feeds_lock:
+            feed = _feeds.get(key)
+            if feed is None:
+                feed = _feeds[key] = PriceFeed(
+                    proxy=env_proxy if use_proxy else None,
+                    rest_fallback=lambda coin: get_live_prices(coin, use_proxy),
+                ).start()
+    return feed
@@ -0,0 +1,82 @@
+import os
+import statistics
+from typing import NamedTuple
+
+from fetchers import BASE_URLS
+from http_client import get_client
+from price_feed import get_feed
+from resilience import UNAVAILABLE_ERRORS, fetch_failed, require_ok
+
+# --- 多交易所现价预言机 ---
+# 每家交易所一次批量 tickers 请求拿到全部现货交易对，再只挑出关心的币种：
+# Hybrid 同步只需 3 次价格请求，而不是每个币种一次。
+# 参考价取各家中位数；距离列按报价所在交易所自己的现价计算，没有自家现价的平台（如 Gate）用参考价。
+PRICE_ORACLE_TTL = float(os.getenv("PRICE_ORACLE_TTL", 5))
+
+TICKER_URLS = {
+    "Binance": f"{BASE_URLS['BinanceAPI']}/api/v3/ticker/price",
+    "OKX": f"{BASE_URLS['OKX']}/api/v5/market/tickers?instType=SPOT",
+    "Bitget": f"{BASE_URLS['BitgetAPI']}/api/v2/spot/market/tickers",
+}
+
+
+def _parse_binance(body):
+    return {t["symbol"][:-4]: float(t["price"]) for t in body if t["symbol"].endswith("USDT")}
+
+def _parse_okx(body):
+    return {t["instId"][:-5]: float(t["last"]) for t in body.get("data", []) if t["instId"].endswith("-USDT") and t.get("last")}
+
+def _parse_bitget(body):
+    return {t["symbol"][:-4]: float(t["lastPr"]) for t in body.get("data", []) if t["symbol"].endswith("USDT") and t.get("lastPr")}
+
+PARSERS = {"Binance": _parse_binance, "OKX": _parse_okx, "Bitget": _parse_bitget}
+
+
+def fetch_tickers(exchange, use_proxy):
+    """一次请求拉取该交易所全部 USDT 现货价，返回 {币种: 价格}；失败抛 FetchFailed 等，由引擎改用上次的价格。"""
+    try:
+        resp = require_ok(exchange, get_client(exchange, use_proxy).get(TICKER_URLS[exchange], timeout=5))
+        return PARSERS[exchange](resp.json())
+    except UNAVAILABLE_ERRORS:
+        raise
+    except Exception as e:
+        raise fetch_failed(exchange, e) from e
+
+
+class PriceBook(NamedTuple):
+    reference: dict    # {币种: 各家中位数}
+    exchanges: dict    # {交易所: {币种: 价格}}
+
+    def select(self, coins):
+        coins = set(coins)
+        return PriceBook({c: p for c, p in self.reference.items() if c in coins},
+                         {ex: {c: p for c, p in ps.items() if c in coins} for ex, ps in self.exchanges.items()})
+
+    @classmethod
+    def from_dict(cls, data):
+        # 兼容旧快照里的 {币种: 价格}
+        if "reference" not in data:
+            return cls(dict(data), {})
+        return cls(data["reference"], data["exchanges"])
+
+
+def build_book(coins, tickers, okx_route=True, fallback=False):
+    """tickers: {交易所: {币种: 价格}}（批量接口结果）；OKX 推送价更新时覆盖 OKX 的批量价。
+
+    fallback=True（各家批量任务都已返回）时，哪家批量价里都没有的币种改用 OKX 推送价 / REST 单次查询作参考价。
+    """
+    feed = get_feed(okx_route)
+    feed.subscribe(coins)
+    exchanges = {}
+    for ex, table in tickers.items():
+        exchanges[ex] = {c: table[c] for c in coins if table.get(c)}
+    if "OKX" in exchanges:
+        for c in coins:
+            live = feed.latest(c)
+            if live is not None:
+                exchanges["OKX"][c] = live[0]
+    reference = {}
+    for c in coins:
+        quotes = [ps[c] for ps in exchanges.values() if c in ps]
+        reference[c] = statistics.median(quotes) if quotes else (feed.get(c) if fallback else None)
+    return PriceBook(reference, exchanges)
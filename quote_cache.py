@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- 跨重跑报价缓存 ---
+# Streamlit 每次交互都会重跑脚本，但已导入的模块常驻内存，缓存放在这里即可跨重跑存活。
+# 过期数据先直接返回，同时在后台刷新（stale-while-revalidate）；只有点"同步"才强制穿透。
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", 30))
+
+_entries = {}        # key -> (抓取时间, 结果)
+_refreshing = set()  # 正在后台刷新的 key，避免重复提交
+_lock = threading.Lock()
+_REFRESH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dual-refresh")
+
+
+def _store(key, fn):
+    # fn 失败时直接抛出、不写缓存：last_good 永远是最近一次成功的结果
+    value = fn()
+    with _lock:
+        _entries[key] = (time.time(), value)
+    return value
+
+
+def _refresh(key, fn):
+    try:
+        _store(key, fn)
+    finally:
+        with _lock:
+            _refreshing.discard(key)
+
+
+def cached_fetch(key, fn, force=False, ttl=None):
+    """按 key 取缓存，返回 (结果, 状态)。状态为 "miss" / "fresh" / "stale"。
+
+    key 约定为 (交易所, 币种, 模式, 是否代理)；force=True 时忽略缓存同步重抓。
+    """
+    ttl = QUOTE_CACHE_TTL if ttl is None else ttl
+    entry = _entries.get(key)
+    if force or entry is None:
+        return _store(key, fn), "miss"
+    fetched_at, value = entry
+    if time.time() - fetched_at < ttl:
+        return value, "fresh"
+    with _lock:
+        submit = key not in _refreshing
+        _refreshing.add(key)
+    if submit:
+        _REFRESH_POOL.submit(_refresh, key, fn)
+    return value, "stale"
+
+
+def last_good(key):
+    """最近一次成功抓取的结果（无论是否过期），没有则为 None。"""
+    entry = _entries.get(key)
+    return None if entry is None else entry[1]
+
+
+def clear():
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,110 @@
+import threading
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# --- 紧凑列式报价容器 ---
+# 替代 [{"coin":..., "strike":..., ...}, ...]：每条报价只占 2+2+8+8+8+8 = 36 字节，
+# 而一个 6 键 dict 连同其中的 float/int 对象实测约 280 字节（见 benchmarks/bench_quotes.py）。
+# 币种/平台存成全局共享的分类编码，批次之间拼接无需重新映射。
+FIELDS = ("coin", "strike", "apy", "raw_apy", "expiry", "platform")
+
+_categories = {"coin": [], "platform": []}
+_codes = {"coin": {}, "platform": {}}
+_categories_lock = threading.Lock()
+
+
+def _code(kind, value):
+    code = _codes[kind].get(value)
+    if code is None:
+        with _categories_lock:
+            code = _codes[kind].get(value)
+            if code is None:
+                code = _codes[kind][value] = len(_categories[kind])
+                _categories[kind].append(value)
+    return code
+
+
+class QuoteBatch:
+    __slots__ = ("coin", "platform", "strike", "apy", "raw_apy", "expiry")
+
+    def __init__(self):
+        self.coin = array("H")
+        self.platform = array("H")
+        self.strike = array("d")
+        self.apy = array("d")
+        self.raw_apy = array("d")
+        self.expiry = array("q")
+
+    def append(self, coin, strike, apy, raw_apy, expiry, platform):
+        self.coin.append(_code("coin", coin))
+        self.platform.append(_code("platform", platform))
+        self.strike.append(strike)
+        self.apy.append(apy)
+        self.raw_apy.append(raw_apy)
+        self.expiry.append(expiry)
+
+    def extend_columns(self, coin, platform, strike, apy, raw_apy, expiry):
+        """整列追加同一币种 / 平台的报价（数值列为等长的 array 或序列）。"""
+        n = len(strike)
+        self.coin.extend(array("H", [_code("coin", coin)]) * n)
+        self.platform.extend(array("H", [_code("platform", platform)]) * n)
+        self.strike.extend(strike)
+        self.apy.extend(apy)
+        self.raw_apy.extend(raw_apy)
+        self.expiry.extend(expiry)
+        return self
+
+    def extend(self, other):
+        for name in self.__slots__:
+            getattr(self, name).extend(getattr(other, name))
+        return self
+
+    __iadd__ = extend
+
+    def __len__(self):
+        return len(self.strike)
+
+    def __iter__(self):
+        """兼容旧代码：逐条还原成 dict。"""
+        coins, platforms = _categories["coin"], _categories["platform"]
+        for c, sk, ay, raw, exp, p in zip(self.coin, self.strike, self.apy, self.raw_apy, self.expiry, self.platform):
+            yield {"coin": coins[c], "strike": sk, "apy": ay, "raw_apy": raw, "expiry": exp, "platform": platforms[p]}
+
+    def select(self, coins):
+        """只保留指定币种，返回新批次。"""
+        wanted = [_codes["coin"][c] for c in coins if c in _codes["coin"]]
+        mask = np.isin(np.frombuffer(self.coin, dtype=np.uint16), wanted)
+        out = QuoteBatch()
+        for name in self.__slots__:
+            src = getattr(self, name)
+            getattr(out, name).frombytes(np.frombuffer(src, dtype=src.typecode)[mask].tobytes())
+        return out
+
+    def to_frame(self):
+        """转成 DataFrame；数值列直接引用本批次内存（不拷贝），之后不要再向本批次追加。"""
+        cols = {}
+        for name in FIELDS:
+            src = getattr(self, name)
+            values = np.frombuffer(src, dtype=src.typecode)
+            if name in _categories:
+                values = pd.Categorical.from_codes(values.astype("int16"), categories=list(_categories[name]))
+            cols[name] = values
+        return pd.DataFrame(cols, copy=False)
+
+    def to_dict(self):
+        """列式 JSON 友好结构，用于快照。"""
+        out = {name: getattr(self, name).tolist() for name in ("strike", "apy", "raw_apy", "expiry")}
+        for name in _categories:
+            out[name] = [_categories[name][c] for c in getattr(self, name)]
+        return out
+
+    @classmethod
+    def from_dict(cls, data):
+        batch = cls()
+        for name in ("strike", "apy", "raw_apy", "expiry"):
+            getattr(batch, name).extend(data[name])
+        for name in _categories:
+            getattr(batch, name).extend(_code(name, v) for v in data[name])
+        return batch
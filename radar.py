@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+# --- 智能监控雷达 ---
+# 同一 (平台, 币种, 交割日) 内按目标价排序后，比较相邻两档：
+#   倒挂：离现价更远（更安全）的一档，真实年化反而更高；
+#   高性价比：少拿一点年化，换来不成比例的更大安全垫。
+# 一次全局排序 + 错位比较相邻行，不再逐组逐行 iloc。
+MIN_COST_EFFECTIVENESS = 1.5  # 每牺牲 1% 年化至少换回的安全垫 %
+MIN_DIST_GAIN = 0.5           # 相邻两档距离至少拉开的 %
+MIN_APY = 5.0                 # 上一档真实年化下限 %
+
+GROUP_KEYS = ["platform", "coin", "expiry_date"]
+INV_COLUMNS = ["平台", "标的", "档位对比", "分析结论", "_sort_diff"]
+VAL_COLUMNS = ["平台", "标的", "档位对比", "分析结论", "_sort_ce"]
+
+
+def _pair_text(prev_strike, prev_apy, strike, apy):
+    return f"{prev_strike:g} ({prev_apy:.1f}%) ➡️ {strike:g} ({apy:.1f}%)"
+
+
+def _label(df, idx):
+    if "display_name" in df:
+        return df["display_name"].iloc[idx].astype(str).to_numpy()
+    sub = df.iloc[idx]
+    return (sub["coin"].astype(str) + "-" + sub["expiry_date"].dt.strftime("%m%d")).to_numpy()
+
+
+def detect(df, dist_col, ascending, min_ce=MIN_COST_EFFECTIVENESS, min_dist_gain=MIN_DIST_GAIN, min_apy=MIN_APY):
+    """纯数值扫描，返回 (inv, val) 两张相邻档位对比表，已分别按倒挂幅度 / 性价比降序排好。
+
+    列: platform, label, prev_strike, prev_apy, strike, apy, dist_gain, apy_diff, ce。
+    ascending 与原逻辑一致：低买按目标价降序扫，高卖按升序扫。
+    """
+    # 只对 (组号, 目标价) 两列整数/浮点做一次稳定 lexsort，不搬动整张表
+    group = df.groupby(GROUP_KEYS, sort=True, observed=True).ngroup().to_numpy()
+    strike = df["strike"].to_numpy(dtype="float64")
+    order = np.lexsort((strike if ascending else -strike, group))
+    group, strike = group[order], strike[order]
+    apy = df["apy"].to_numpy(dtype="float64")[order]
+    dist = df[dist_col].to_numpy(dtype="float64")[order]
+
+    # 第 i 行与第 i-1 行属于同一组时才构成一对 (prev, curr)
+    same = np.zeros(len(df), dtype=bool)
+    same[1:] = group[1:] == group[:-1]
+    prev_strike, prev_apy, prev_dist = (np.roll(a, 1) for a in (strike, apy, dist))
+
+    apy_diff = prev_apy - apy
+    dist_gain = np.abs(dist - prev_dist)
+    # 缺现价时距离为 NaN，无法比较安全垫，直接跳过
+    pair = same & (dist_gain != 0) & ~np.isnan(dist_gain)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ce = np.where(apy_diff == 0, 999.0, dist_gain / apy_diff)
+
+    inv = pair & (apy_diff < 0)
+    val = pair & ~(apy_diff < 0) & (ce >= min_ce) & (dist_gain >= min_dist_gain) & (prev_apy > min_apy)
+
+    platform = df["platform"].to_numpy()[order]
+    frames = []
+    for mask, rank in ((inv, -np.abs(apy_diff)), (val, -ce)):
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(rank[idx], kind="stable")]
+        frames.append(pd.DataFrame({
+            "platform": platform[idx], "label": _label(df, order[idx]),
+            "prev_strike": prev_strike[idx], "prev_apy": prev_apy[idx],
+            "strike": strike[idx], "apy": apy[idx],
+            "dist_gain": dist_gain[idx], "apy_diff": apy_diff[idx], "ce": ce[idx],
+        }))
+    return frames[0], frames[1]
+
+
+def scan(df, dist_col, ascending, **thresholds):
+    """detect() 之后再格式化成页面展示用的两张表 (inv_df, val_df)，只对命中的档位拼字符串。"""
+    inv, val = detect(df, dist_col, ascending, **thresholds)
+    pairs = lambda a: [_pair_text(*v) for v in zip(a["prev_strike"], a["prev_apy"], a["strike"], a["apy"])]
+    inv_df = pd.DataFrame({
+        "平台": inv["platform"], "标的": inv["label"], "档位对比": pairs(inv),
+        "分析结论": [f"安全垫增加 {g:.1f}%, 真实收益倒挂高出 {abs(d):.1f}%" for g, d in zip(inv["dist_gain"], inv["apy_diff"])],
+        "_sort_diff": inv["apy_diff"].abs(),
+    }, columns=INV_COLUMNS)
+    val_df = pd.DataFrame({
+        "平台": val["platform"], "标的": val["label"], "档位对比": pairs(val),
+        "分析结论": [f"牺牲 {d:.1f}% 真实年化换取 {g:.1f}% 避险空间" for g, d in zip(val["dist_gain"], val["apy_diff"])],
+        "_sort_ce": val["ce"],
+    }, columns=VAL_COLUMNS)
+    return inv_df, val_df
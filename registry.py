@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from fetchers import SEED_COINS, BASE_URLS, binance_project_list
+from http_client import get_client
+from metrics import fetch_error
+
+load_dotenv()
+
+# --- 币种 / ID 注册表 ---
+# 各交易所的币种 ID（OKX currencyId、Bitget coinId）与支持的币种不再写死：
+# 后台并发请求各家的发现接口，结果落盘（带时间戳，超过 COIN_REGISTRY_TTL 再刷新），
+# 启动时只读盘，抓取路径上从不触发发现请求。
+# 合并规则只增不减：发现到的非空 ID 覆盖旧值，某家发现失败或没列出时保留已有 / 种子里的值。
+# 用法: python registry.py            # 立即刷新并打印
+REGISTRY_PATH = os.getenv("COIN_REGISTRY", "coin_registry.json")
+REGISTRY_TTL = float(os.getenv("COIN_REGISTRY_TTL", 86400))
+RETRY_AFTER = 300   # 各家发现全部失败时，隔这么久再试，而不是每次页面重跑都重试
+# 看板 / 轮询默认展示的币种（逗号分隔），其余已发现的币种可在侧边栏追加
+WATCHLIST = [c.strip().upper() for c in os.getenv("COIN_WATCHLIST", "").split(",") if c.strip()] or list(SEED_COINS)
+QUOTE_CURRENCIES = {"USDT", "USDC"}
+FIELDS = ("okx_id", "binance_symbol", "bitget_id", "gate_symbol")
+
+
+# 发现接口：OKX / Bitget 返回 {币种: ID}，Binance / Gate 按币种名下单，返回支持的币种集合
+def discover_okx(use_proxy):
+    url = f"{BASE_URLS['OKX']}/priapi/v2/sfp/dcd/currency-pair?containQuote=true&t={int(time.time() * 1000)}"
+    r = get_client("OKX", use_proxy).get(url, timeout=10).json()
+    return {p["currency"]: int(p["currencyId"])
+            for group in (r.get("data") or {}).get("currencyPairs", [])
+            for p in group.get("currencyPairs", [])
+            if p.get("currency") and p.get("currencyId") is not None}
+
+def discover_bitget(use_proxy):
+    r = get_client("Bitget", use_proxy).get(f"{BASE_URLS['BitgetAPI']}/api/v2/spot/public/coins", timeout=10).json()
+    return {c["coin"]: int(c["coinId"]) for c in r.get("data") or [] if c.get("coin") and c.get("coinId")}
+
+def discover_binance(use_proxy):
+    url = f"{BASE_URLS['Binance']}/bapi/earn/v5/friendly/pos/dc/project/list"
+    client = get_client("Binance", use_proxy)
+    items = binance_project_list(lambda p: client.get(url, params=p, timeout=10).json(),
+                                 {"investmentAsset": "USDT", "projectType": "DOWN", "pageSize": 100})
+    return {i.get("targetAsset") for i in items if i.get("targetAsset")}
+
+def discover_gate(use_proxy):
+    plans = get_client("Gate", use_proxy).get(f"{BASE_URLS['GateAPI']}/api/v4/earn/dual/investment_plan", timeout=10).json()
+    return {p.get("exercise_currency") if p.get("invest_currency") in QUOTE_CURRENCIES else p.get("invest_currency")
+            for p in plans if p.get("invest_currency")} - {None}
+
+DISCOVERERS = {"OKX": discover_okx, "Bitget": discover_bitget, "Binance": discover_binance, "Gate": discover_gate}
+
+
+def merge(previous, found):
+    """previous: {币种: 配置}；found: {交易所: 发现结果或 None（失败）}。返回合并后的新表。"""
+    okx, bitget = found.get("OKX") or {}, found.get("Bitget") or {}
+    binance, gate = found.get("Binance") or set(), found.get("Gate") or set()
+    # 有双币产品的币种：OKX / Binance / Gate 列出的（Bitget 的币种表是全部现货，不用来扩充）
+    universe = (set(okx) | binance | gate) - QUOTE_CURRENCIES
+    coins = {c: dict(cfg) for c, cfg in previous.items()}
+    for c in sorted(universe - set(coins)):
+        coins[c] = dict.fromkeys(FIELDS)
+    for c, cfg in coins.items():
+        discovered = {"okx_id": okx.get(c), "binance_symbol": c if c in binance else None,
+                      "bitget_id": bitget.get(c), "gate_symbol": c if c in gate else None}
+        for field, value in discovered.items():
+            if value is not None:
+                cfg[field] = value
+    return coins
+
+
+def load(path=None):
+    """读盘返回 (更新时间, {币种: 配置})；文件不存在或损坏时返回 (0, {})。"""
+    try:
+        with open(path or REGISTRY_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return float(data["updated_at"]), data["coins"]
+    except (OSError, ValueError, KeyError):
+        return 0.0, {}
+
+
+def _save(coins, path=None):
+    path = path or REGISTRY_PATH
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": time.time(), "coins": coins}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _with_seeds(coins):
+    # 种子 ID 打底，盘上的非空值优先
+    return {c: {**SEED_COINS.get(c, dict.fromkeys(FIELDS)), **{k: v for k, v in cfg.items() if v is not None}}
+            for c, cfg in {**{c: {} for c in SEED_COINS}, **coins}.items()}
+
+
+# 运行时的币种表；后台刷新在新字典上合并好后整体替换，已发布的表不再修改，
+# 读者用 coin_config() 取一次引用即可放心遍历（不会 "dictionary changed size during iteration"）
+updated_at, _stored = load()
+COIN_CONFIG = _with_seeds(_stored)
+
+_refresh_lock = threading.Lock()
+_refreshing = False
+_retry_at = 0.0
+
+
+def refresh(routes=None, path=None):
+    """并发跑各家发现接口，合并、落盘并更新 COIN_CONFIG，返回 {交易所: 是否成功}。"""
+    global COIN_CONFIG, updated_at, _retry_at
+    routes = routes or {}
+    with ThreadPoolExecutor(max_workers=len(DISCOVERERS), thread_name_prefix="registry") as pool:
+        futures = {ex: pool.submit(fn, routes.get(ex, True)) for ex, fn in DISCOVERERS.items()}
+    found = {}
+    for ex, fut in futures.items():
+        try:
+            found[ex] = fut.result()
+        except Exception as e:
+            fetch_error(ex, e)
+            found[ex] = None
+    if all(result is None for result in found.values()):
+        _retry_at = time.time() + RETRY_AFTER
+        return dict.fromkeys(found, False)
+    _, stored = load(path)
+    coins = merge(_with_seeds(stored), found)
+    _save(coins, path)
+    COIN_CONFIG = {**COIN_CONFIG, **coins}
+    updated_at = time.time()
+    return {ex: result is not None for ex, result in found.items()}
+
+
+def coin_config():
+    """当前的币种表（只读快照）；不要 from registry import COIN_CONFIG，刷新后那个名字仍指向旧表。"""
+    return COIN_CONFIG
+
+
+def watchlist():
+    """COIN_WATCHLIST 中注册表里已有的币种（未发现的先跳过，刷新后自动出现）。"""
+    coins = COIN_CONFIG
+    return [c for c in WATCHLIST if c in coins]
+
+
+def is_stale(ttl=REGISTRY_TTL):
+    now = time.time()
+    return now - updated_at > ttl and now >= _retry_at
+
+
+def ensure_fresh(routes=None, ttl=REGISTRY_TTL):
+    """过期时在后台线程刷新，立即返回（是否启动了刷新）；同一时间最多一个刷新在跑。"""
+    global _refreshing
+    if not is_stale(ttl):
+        return False
+    with _refresh_lock:
+        if _refreshing:
+            return False
+        _refreshing = True
+
+    def run():
+        global _refreshing
+        try:
+            refresh(routes)
+        except Exception as e:
+            fetch_error("Registry", e)
+        finally:
+            _refreshing = False
+
+    threading.Thread(target=run, name="registry-refresh", daemon=True).start()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="刷新币种 / ID 注册表")
+    parser.add_argument("--direct", nargs="*", default=[], choices=list(DISCOVERERS),
+                        help="这些交易所不走 DEFAULT_PROXY")
+    args = parser.parse_args()
+    ok = refresh({ex: ex not in args.direct for ex in DISCOVERERS})
+    print(" · ".join(f"{'✅' if v else '❌'} {ex}" for ex, v in ok.items()))
+    print(f"{'coin':<8} " + " ".join(f"{f:>15}" for f in FIELDS))
+    for coin, cfg in sorted(COIN_CONFIG.items()):
+        print(f"{coin:<8} " + " ".join(f"{str(cfg.get(f) if cfg.get(f) is not None else '--'):>15}" for f in FIELDS))
+    print(f"📁 {REGISTRY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- 请求录制 / 回放 ---
+# HTTP_REPLAY=record：照常访问交易所，同时把每个响应落盘到 HTTP_FIXTURES 目录；
+# HTTP_REPLAY=replay：不联网，按 (方法, URL, 参数, 请求体) 从目录里取回响应，
+# 可用 HTTP_REPLAY_LATENCY 模拟每次请求的网络延迟（秒）。
+# 挂在 http_client 的发送层，抓取函数、限频、指标等上层逻辑都原样运行。
+MODE = os.getenv("HTTP_REPLAY", "")
+FIXTURE_DIR = os.getenv("HTTP_FIXTURES", "fixtures")
+LATENCY = float(os.getenv("HTTP_REPLAY_LATENCY", 0))
+# 每次请求都会变的参数（如 OKX 的 t=时间戳），不参与匹配
+VOLATILE_PARAMS = {"t"}
+
+_lock = threading.Lock()
+_loaded = {}     # 回放时已读入内存的录制，避免每次请求都读盘
+_source = None   # 录制时的替代数据源（带 request(method, url, **kwargs) 的对象），None 为真实交易所
+
+
+def configure(mode, directory=None, latency=None, source=None):
+    """运行时切换模式（基准测试里用）；mode 为 "" / "record" / "replay"。
+
+    source 用于从本地替身（如 exchange_sim.ExchangeSim）而非真实交易所录制。
+    """
+    global MODE, FIXTURE_DIR, LATENCY, _source
+    MODE = mode
+    if directory is not None:
+        FIXTURE_DIR = directory
+    if latency is not None:
+        LATENCY = latency
+    _source = source
+    _loaded.clear()
+
+
+def request_key(method, url, params=None, json_body=None):
+    u = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(u.query) if k not in VOLATILE_PARAMS]
+    query += [(k, str(v)) for k, v in (params or {}).items() if k not in VOLATILE_PARAMS]
+    canonical = f"{method.upper()} {u.netloc}{u.path}?{urlencode(sorted(query))}"
+    if json_body is not None:
+        canonical += " " + json.dumps(json_body, sort_keys=True, separators=(",", ":"))
+    return canonical
+
+
+def _path(exchange, key, directory=None):
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(directory or FIXTURE_DIR, exchange, f"{digest}.json")
+
+
+def store(exchange, key, status, content, headers=None, directory=None):
+    """写一条录制结果；content 为 bytes，或可 JSON 序列化的对象。"""
+    if not isinstance(content, bytes):
+        content = json.dumps(content, separators=(",", ":")).encode()
+    try:
+        body = {"text": content.decode()}
+    except UnicodeDecodeError:
+        body = {"base64": base64.b64encode(content).decode()}
+    record = {"key": key, "status": status, "headers": dict(headers or {}), **body}
+    path = _path(exchange, key, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _lock:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+
+
+class ReplayResponse:
+    """回放出的响应，提供抓取代码用到的 requests/curl_cffi 响应接口子集。"""
+
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.infos = {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self, **kwargs):
+        return json.loads(self.content, **kwargs)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise OSError(f"{self.status_code} replayed error")
+
+
+def load(exchange, key, directory=None):
+    path = _path(exchange, key, directory)
+    cached = _loaded.get(path)
+    if cached is None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return ReplayResponse(404, b'{"msg": "no fixture"}')
+        content = record["text"].encode() if "text" in record else base64.b64decode(record["base64"])
+        cached = _loaded[path] = (record["status"], content, record.get("headers"))
+    return ReplayResponse(*cached)
+
+
+def send(exchange, session, method, url, **kwargs):
+    """http_client 的发送入口：按当前模式直连、录制或回放。"""
+    if not MODE:
+        return session.request(method, url, **kwargs)
+    key = request_key(method, url, kwargs.get("params"), kwargs.get("json"))
+    if MODE == "replay":
+        if LATENCY:
+            time.sleep(LATENCY)
+        return load(exchange, key)
+    resp = (_source or session).request(method, url, **kwargs)
+    # 只保留限频退避会读的响应头
+    retry_after = resp.headers.get("Retry-After")
+    store(exchange, key, resp.status_code, resp.content, {"Retry-After": retry_after} if retry_after else None)
+    return resp
@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+
+from metrics import fetch_error, HEDGE_REQUESTS, HEDGE_WINS, BREAKER_STATE
+from scheduler import RateLimited, inherit
+
+load_dotenv()
+
+# --- 对冲请求与熔断 ---
+# 对冲：某条线路（代理/直连）上的请求超过该线路近期延迟的分位数还没返回，
+# 就在另一条线路上补发一次，谁先成功用谁，慢线路不再拖住整轮同步的尾延迟。
+# 熔断：同一 (交易所, 线路) 连续失败达到阈值后打开，冷却期内直接失败不再等超时；
+# 冷却结束放行一个探测请求，成功即闭合。上层据此改用缓存里最近一次成功的数据。
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1") == "1"
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_DELAY = 0.3       # 分位数下限，避免正常抖动也触发对冲
+HEDGE_MAX_DELAY = 5.0
+HEDGE_DEFAULT_DELAY = 2.0   # 样本不足时的对冲等待
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+BREAKER_THRESHOLD = 5       # 连续失败次数
+BREAKER_COOLDOWN = 30.0     # 打开后多少秒放行探测请求
+BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}   # 导出到 BREAKER_STATE 指标的取值
+
+
+class CircuitOpen(Exception):
+    """线路熔断中，请求未发出。"""
+
+
+class FetchFailed(Exception):
+    """请求失败（网络错误、非 200、错误码、响应无法解析），区别于交易所确实"没有产品"。"""
+
+
+# 不能被抓取函数当作"没有产品"吞掉的错误，交给引擎改用缓存
+UNAVAILABLE_ERRORS = (RateLimited, CircuitOpen, FetchFailed)
+
+
+def fetch_failed(exchange, error):
+    """记一次抓取错误并转成 FetchFailed，供抓取函数 raise：失败不能返回空批次，否则会被当成正常结果缓存。"""
+    fetch_error(exchange, error)
+    return error if isinstance(error, FetchFailed) else FetchFailed(f"{exchange}: {error!r}")
+
+def require_ok(exchange, resp):
+    """非 200 的响应按失败处理，返回原响应。"""
+    if resp.status_code != 200:
+        raise fetch_failed(exchange, FetchFailed(f"{exchange} HTTP {resp.status_code}"))
+    return resp
+
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="dual-hedge")
+
+
+class LatencyTracker:
+    def __init__(self, window=LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def hedge_delay(self):
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(max(self.percentile(HEDGE_PERCENTILE), HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, labels=None):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.labels = labels       # {"exchange", "route"}；有标签时状态同步到 BREAKER_STATE
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._set_state("closed")  # closed / open / half_open
+
+    def _set_state(self, state):
+        # 除构造时外由调用方持有 self._lock，状态与指标一起变化
+        self.state = state
+        if self.labels:
+            BREAKER_STATE.set(BREAKER_STATES[state], **self.labels)
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self._set_state("half_open")
+            if self.state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, ok):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.failures = 0
+                if self.state != "closed":
+                    self._set_state("closed")
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.threshold:
+                self._set_state("open")
+                self.opened_at = time.monotonic()
+
+
+_latency, _breakers = {}, {}
+_registry_lock = threading.Lock()
+
+def _get(table, key, factory):
+    item = table.get(key)
+    if item is None:
+        with _registry_lock:
+            item = table.get(key)
+            if item is None:
+                item = table[key] = factory()
+    return item
+
+def latency(exchange, route):
+    return _get(_latency, (exchange, route), LatencyTracker)
+
+def breaker(exchange, route):
+    return _get(_breakers, (exchange, route), lambda: CircuitBreaker(labels={"exchange": exchange, "route": route}))
+
+
+def hedge(exchange, primary, alternate, delay):
+    """先跑 primary；delay 秒内没成功（超时或已失败）就补发 alternate，返回先成功的结果。
+
+    两者都失败时抛出 primary 的异常。落败的请求在后台跑完后丢弃。
+    """
+    first = _HEDGE_POOL.submit(inherit(primary))
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    except Exception:
+        pass
+    HEDGE_REQUESTS.inc(exchange=exchange)
+    second = _HEDGE_POOL.submit(inherit(alternate))
+    pending = {first, second}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None:
+                if fut is second:
+                    HEDGE_WINS.inc(exchange=exchange)
+                return fut.result()
+    raise first.exception()
@@ -0,0 +1,142 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from fetchers import BASE_URLS
+from http_client import get_client, env_proxy
+
+# --- 自动选路 ---
+# 后台定时对每家交易所的 直连 / 代理 两条线路各发一次轻量请求，
+# 记录首跳 TCP 建连时间与完整响应延迟，用指数滑动平均（EWMA）平滑，
+# 抓取时选当前最快且可用的线路。新线路需快出一定比例才切换，避免来回抖动。
+PROBE_INTERVAL = float(os.getenv("ROUTE_PROBE_INTERVAL", 30))
+PROBE_TIMEOUT = 5
+EWMA_ALPHA = 0.3
+SWITCH_MARGIN = 0.8     # 备选线路延迟低于当前线路的 80% 才切换
+
+# 交易所: (方法, URL, JSON 请求体)；必须与抓取接口同域名，测的才是抓取走的那条线路。
+# Bitget / Gate 的抓取域名上没有 time 接口，就用抓取接口本身查 USDT（没有双币产品，响应只有几十字节）
+PROBES = {
+    "OKX": ("GET", f"{BASE_URLS['OKX']}/api/v5/public/time", None),
+    "Binance": ("GET", f"{BASE_URLS['Binance']}/api/v3/time", None),
+    "Bitget": ("POST", f"{BASE_URLS['Bitget']}/v1/finance/dualInvest/ordinary/product/list",
+               {"productTokenId": 2, "tradeTokenId": 2, "direction": 0, "fromCalendar": False}),
+    "Gate": ("GET", f"{BASE_URLS['Gate']}/apiw/v2/earn/dual/project-list?coin=USDT&type=put", None),
+}
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = None     # 响应延迟 EWMA（秒）
+        self.connect = None     # 首跳建连 EWMA（秒）
+        self.ok = False
+        self.failures = 0
+        self.probed_at = 0.0
+
+    def update(self, ok, latency=None, connect=None):
+        self.probed_at = time.time()
+        self.ok = ok
+        if not ok:
+            self.failures += 1
+            return
+        self.failures = 0
+        self.latency = latency if self.latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+        if connect is not None:
+            self.connect = connect if self.connect is None else EWMA_ALPHA * connect + (1 - EWMA_ALPHA) * self.connect
+
+
+def _first_hop(url, use_proxy):
+    target = urlparse(env_proxy) if use_proxy and env_proxy else urlparse(url)
+    return target.hostname, target.port or (443 if target.scheme == "https" else 80)
+
+
+def _connect_time(url, use_proxy):
+    try:
+        t0 = time.perf_counter()
+        socket.create_connection(_first_hop(url, use_proxy), timeout=PROBE_TIMEOUT).close()
+        return time.perf_counter() - t0
+    except OSError:
+        return None
+
+
+class RouteProber:
+    def __init__(self, probes=PROBES, interval=PROBE_INTERVAL):
+        self.probes = probes
+        self.interval = interval
+        # 没配代理时两条线路等价，只测直连
+        self.routes = (False, True) if env_proxy else (False,)
+        self.stats = {(ex, r): RouteStats() for ex in probes for r in self.routes}
+        self.chosen = {}        # 交易所 -> 是否走代理
+        self._pool = ThreadPoolExecutor(max_workers=len(self.stats), thread_name_prefix="route-probe")
+        self._thread = None
+        self._stop = threading.Event()
+
+    def probe(self, exchange, use_proxy):
+        method, url, body = self.probes[exchange]
+        connect = _connect_time(url, use_proxy)
+        t0 = time.perf_counter()
+        try:
+            # 只走本线路，不触发对冲，也不经限频和熔断；403 / 404 等说明这条线路拿不到数据，同样算不可用
+            resp = get_client(exchange, use_proxy).probe(method, url, json=body, timeout=PROBE_TIMEOUT)
+            ok = 200 <= resp.status_code < 300
+        except Exception:
+            ok = False
+        self.stats[(exchange, use_proxy)].update(ok, time.perf_counter() - t0, connect)
+
+    def probe_all(self):
+        list(self._pool.map(lambda key: self.probe(*key), list(self.stats)))
+        for ex in self.probes:
+            self.chosen[ex] = self._choose(ex)
+
+    def _choose(self, exchange):
+        current = self.chosen.get(exchange)
+        alive = {r: self.stats[(exchange, r)].latency for r in self.routes if self.stats[(exchange, r)].ok}
+        if not alive:
+            return current
+        best = min(alive, key=alive.get)
+        if current in alive and best != current and alive[best] > SWITCH_MARGIN * alive[current]:
+            return current
+        return best
+
+    def best_route(self, exchange, default=True):
+        """当前选中的线路（True 为代理）；还没有探测结果时返回 default。"""
+        route = self.chosen.get(exchange)
+        return default if route is None else route
+
+    def describe(self, exchange):
+        """(线路名, 延迟毫秒或 None)，供侧边栏展示。"""
+        route = self.chosen.get(exchange)
+        if route is None:
+            return "probing", None
+        s = self.stats[(exchange, route)]
+        return ("proxy" if route else "direct"), (None if s.latency is None else s.latency * 1000)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="route-prober", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_all()
+            self._stop.wait(self.interval)
+
+
+_prober = None
+_prober_lock = threading.Lock()
+
+def get_prober():
+    """进程内唯一的后台探测器，首次调用时启动。"""
+    global _prober
+    if _prober is None:
+        with _prober_lock:
+            if _prober is None:
+                _prober = RouteProber().start()
+    return _prober
@@ -0,0 +1,183 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# --- 限频调度 ---
+# 每家交易所一个令牌桶，请求按接口权重扣令牌；拿不到令牌的请求按优先级排队
+# （现价 > 当前选中币种 > 其他 > 后台刷新）。遇到 429/418 或交易所限频错误码时
+# 暂停该桶一段指数退避 + 抖动的时间，同时把速率减半，之后每次成功再逐步恢复（AIMD），
+# 在不触发限频的前提下尽量跑满吞吐。
+PRIORITY_PRICE, PRIORITY_FOCUS, PRIORITY_NORMAL, PRIORITY_BACKGROUND = 0, 1, 2, 3
+
+# 交易所: (每秒令牌数, 桶容量)；可用环境变量 RATE_LIMIT_OKX=10/20 覆盖
+RATE_LIMITS = {"OKX": (10, 20), "Binance": (20, 40), "Bitget": (10, 10), "Gate": (5, 10)}
+DEFAULT_RATE_LIMIT = (10, 10)
+# 按 URL 片段匹配的接口权重，未列出的为 1
+ENDPOINT_WEIGHTS = {
+    "Binance": {"/api/v3/ticker/price": 4},
+    "OKX": {"/api/v5/market/tickers": 2},
+}
+# 各家在响应体里表示限频的错误码 / 标签
+RATE_LIMIT_CODES = {
+    "OKX": {"50011", "50061"},
+    "Binance": {"-1003", "-1015"},
+    "Bitget": {"429", "40757"},
+    "Gate": {"TOO_MANY_REQUESTS"},
+}
+RATE_LIMIT_STATUS = (429, 418)
+MAX_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", 3))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+MIN_RATE_FRACTION = 0.1    # 降速下限：基准速率的 10%
+RATE_RECOVERY = 0.05       # 每次成功恢复基准速率的 5%
+
+
+class RateLimited(Exception):
+    """重试用尽后仍被限频。与普通网络错误区分开，不能被当成"没有产品"吞掉。"""
+
+
+def _configured(exchange):
+    raw = os.getenv(f"RATE_LIMIT_{exchange.upper()}")
+    if raw:
+        rate, _, burst = raw.partition("/")
+        return float(rate), float(burst or rate)
+    return RATE_LIMITS.get(exchange, DEFAULT_RATE_LIMIT)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.base_rate = self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.strikes = 0
+        self.throttled = 0
+        self._cond = threading.Condition()
+        self._waiters = []    # 堆: (优先级, 序号)
+        self._seq = itertools.count()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, weight=1, priority=PRIORITY_NORMAL):
+        """阻塞到轮到本请求且令牌足够；同优先级先到先得。"""
+        weight = min(weight, self.burst)
+        entry = (priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._cond.notify_all()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = None
+                    if self._waiters[0] == entry:
+                        wait = max(self.paused_until - now, (weight - self.tokens) / self.rate, 0)
+                        if wait <= 0:
+                            self.tokens -= weight
+                            return
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def on_throttle(self, retry_after=None):
+        """被限频：暂停并减速，返回本次暂停秒数。"""
+        with self._cond:
+            self.strikes += 1
+            self.throttled += 1
+            self.rate = max(self.base_rate * MIN_RATE_FRACTION, self.rate / 2)
+            if retry_after:
+                delay = retry_after * random.uniform(1.0, 1.5)
+            else:
+                delay = min(BACKOFF_BASE * 2 ** (self.strikes - 1), BACKOFF_MAX) * random.uniform(0.5, 1.5)
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, now + delay)
+            self._cond.notify_all()
+        return delay
+
+    def on_success(self):
+        if self.strikes or self.rate < self.base_rate:
+            with self._cond:
+                self.strikes = max(self.strikes - 1, 0)
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RATE_RECOVERY)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+def limiter(exchange):
+    bucket = _buckets.get(exchange)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(exchange)
+            if bucket is None:
+                bucket = _buckets[exchange] = TokenBucket(*_configured(exchange))
+    return bucket
+
+def endpoint_weight(exchange, url):
+    for fragment, weight in ENDPOINT_WEIGHTS.get(exchange, {}).items():
+        if fragment in url:
+            return weight
+    return 1
+
+def throttle_hint(exchange, resp):
+    """判断响应是否为限频；是则返回 Retry-After 秒数（没有则为 0），否则返回 None。"""
+    limited = resp.status_code in RATE_LIMIT_STATUS
+    codes = RATE_LIMIT_CODES.get(exchange)
+    # 限频错误体都很短，只解析小响应，正常的大列表不多付一次 JSON 解析
+    if not limited and codes and len(resp.content) < 1024:
+        try:
+            body = resp.json()
+        except Exception:
+            body = None
+        if isinstance(body, dict):
+            limited = str(body.get("code")) in codes or body.get("label") in codes
+    if not limited:
+        return None
+    try:
+        return float(resp.headers.get("Retry-After") or 0)
+    except ValueError:
+        return 0.0
+
+
+# --- 请求优先级（线程局部） ---
+_local = threading.local()
+
+def current_priority():
+    return getattr(_local, "priority", PRIORITY_BACKGROUND)
+
+@contextmanager
+def priority(level):
+    prev = getattr(_local, "priority", None)
+    _local.priority = level
+    try:
+        yield
+    finally:
+        if prev is None:
+            del _local.priority
+        else:
+            _local.priority = prev
+
+def inherit(fn):
+    """把当前线程的优先级与指标标签带进子线程池任务。"""
+    level, labels = current_priority(), metrics.current_labels()
+    def run(*args, **kwargs):
+        with priority(level), metrics.tagged(**labels):
+            return fn(*args, **kwargs)
+    return run
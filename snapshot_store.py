@@ -0,0 +1,68 @@
+import json
+import os
+import threading
+import time
+
+# --- 本地快照仓库 ---
+# 轮询进程发布带版本号的快照，看板只读最新一份。
+# 写入走 "临时文件 + os.replace"，读者永远看不到写了一半的文件。
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_KEEP = int(os.getenv("SNAPSHOT_KEEP", 5))
+LATEST = "latest.json"
+
+_read_cache = {"key": None, "snapshot": None}
+_read_lock = threading.Lock()
+
+
+def _path(name, directory=None):
+    return os.path.join(directory or SNAPSHOT_DIR, name)
+
+
+def _atomic_write(path, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def publish(modes, prices, directory=None):
+    """发布一份快照并返回其版本号。
+
+    modes: {模式: {"quotes": QuoteBatch.to_dict(), "timings": [...]}}；prices: {币种: 价格}。
+    """
+    directory = directory or SNAPSHOT_DIR
+    os.makedirs(directory, exist_ok=True)
+    latest = load_latest(directory=directory)
+    version = (latest["version"] if latest else 0) + 1
+    snapshot = {"version": version, "published_at": time.time(), "modes": modes, "prices": prices}
+    _atomic_write(_path(f"snapshot-{version:08d}.json", directory), snapshot)
+    _atomic_write(_path(LATEST, directory), snapshot)
+    # 只保留最近 SNAPSHOT_KEEP 个历史版本
+    history = sorted(n for n in os.listdir(directory) if n.startswith("snapshot-") and n.endswith(".json"))
+    for name in history[:-SNAPSHOT_KEEP]:
+        try:
+            os.remove(_path(name, directory))
+        except OSError:
+            pass
+    return version
+
+
+def load_latest(max_age=None, directory=None):
+    """读取最新快照；不存在、损坏或超过 max_age 秒时返回 None。文件未变化时复用上次解析结果。"""
+    path = _path(LATEST, directory)
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    with _read_lock:
+        if _read_cache["key"] != (path, mtime):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    _read_cache["snapshot"] = json.load(f)
+            except (OSError, ValueError):
+                return None
+            _read_cache["key"] = (path, mtime)
+        snapshot = _read_cache["snapshot"]
+    if max_age is not None and time.time() - snapshot["published_at"] > max_age:
+        return None
+    return snapshot
@@ -0,0 +1,38 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# 用法: python -m pytest tests
+# 测试共用的假时钟与等待工具；用例都是纯内存的，不联网。
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """fake_clock(模块, "monotonic" 或 "time") -> FakeClock。
+
+    只替换被测模块看到的 time（模块.time 换成替身），不改全局 time，线程池与 pytest 自身计时不受影响。
+    """
+    def patch(module, name="monotonic", now=1000.0):
+        clock = FakeClock(now)
+        fake_time = SimpleNamespace(**{n: getattr(time, n) for n in dir(time) if not n.startswith("_")})
+        setattr(fake_time, name, clock)
+        monkeypatch.setattr(module, "time", fake_time)
+        return clock
+    return patch
+
+
+def until(cond, timeout=2.0):
+    """轮询到 cond() 为真；超时按真实时钟（perf_counter）计，失败而不是挂住。"""
+    deadline = time.perf_counter() + timeout
+    while not cond():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.001)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from alignment import align_strikes, STRIKE_TOLERANCE, DEFAULT_TOLERANCE
+
+# 目标价对齐：与逐组逐档的贪心参考实现对照，并检查簇宽以锚点为界、不会链式漂移。
+
+
+def greedy(coin, expiry, strike):
+    """参考实现：每个 (币种, 交割日) 组按目标价升序，超出 锚点 × (1 + 容差) 的第一档另起新簇。"""
+    out = np.empty(len(strike))
+    for key in set(zip(coin, expiry)):
+        tol = STRIKE_TOLERANCE.get(key[0], DEFAULT_TOLERANCE)
+        anchor = None
+        for i in sorted((i for i in range(len(strike)) if (coin[i], expiry[i]) == key), key=lambda i: strike[i]):
+            if anchor is None or strike[i] > anchor * (1 + tol):
+                anchor = strike[i]
+            out[i] = anchor
+    return out
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_greedy_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 300))
+    coin = rng.choice(["BTC", "SOL", "DOGE"], n)   # DOGE 不在表里，用默认容差
+    expiry = rng.integers(0, 4, n)
+    strike = np.round(rng.uniform(90, 110, n) * rng.choice([1, 1000], n), 2)
+    assert np.array_equal(align_strikes(coin, expiry, strike), greedy(coin, expiry, strike))
+
+
+def test_cluster_width_is_capped_at_the_anchor():
+    # 相邻档位只差 0.04%（小于 BTC 的 0.05% 容差），逐档比较会一路并成 100；按锚点封顶则两两成簇
+    strike = 100 * 1.0004 ** np.arange(10)
+    aligned = align_strikes("BTC", np.zeros(10), strike)
+    assert np.array_equal(aligned, np.repeat(strike[::2], 2))
+    assert np.all(strike <= aligned * (1 + STRIKE_TOLERANCE["BTC"]))
+
+
+def test_groups_do_not_merge_across_coin_or_expiry():
+    aligned = align_strikes(["BTC", "BTC", "ETH", "BTC"], [1, 2, 1, 1], [64000.5, 64000, 64000.2, 64000])
+    assert aligned.tolist() == [64000, 64000, 64000.2, 64000]
+
+
+def test_empty_input():
+    assert len(align_strikes("BTC", [], [])) == 0
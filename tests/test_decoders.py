@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+pytest.importorskip("msgspec")
+
+import decoders
+from benchmarks.bench_decode import recorded_payloads
+from benchmarks.synth import record_exchange_fixtures
+
+# msgspec 按 schema 解码与 orjson/json 通用解析必须逐行一致：录制夹具全量对照，再补上两条路径曾经分叉的边界值。
+
+DECODERS = {
+    "OKX": decoders.okx_products,
+    "Bitget": decoders.bitget_groups,
+    "Binance": lambda c: decoders.binance_columns(decoders.binance_page(c)["data"]["list"]),
+    "Gate": lambda c: decoders.gate_projects(c, lambda level: level == 0),
+}
+
+
+def both(decoder, content, monkeypatch):
+    """(msgspec 结果, 通用解析结果)。"""
+    fast = decoder(content)
+    with monkeypatch.context() as m:
+        m.setattr(decoders, "msgspec", None)
+        return fast, decoder(content)
+
+
+@pytest.fixture(scope="module")
+def recorded(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("fixtures")
+    record_exchange_fixtures(str(directory), coins=["BTC", "ETH"])
+    return recorded_payloads(str(directory))
+
+
+@pytest.mark.parametrize("exchange", list(DECODERS))
+def test_recorded_fixtures_decode_identically(recorded, exchange, monkeypatch):
+    assert recorded.get(exchange)
+    for content in recorded[exchange]:
+        fast, slow = both(DECODERS[exchange], content, monkeypatch)
+        assert fast == slow
+
+
+def okx(*products):
+    return json.dumps({"code": "0", "data": {"products": list(products)}}).encode()
+
+
+def gate(*projects):
+    return json.dumps({"code": 0, "data": list(projects)}).encode()
+
+
+@pytest.mark.parametrize("content, rows", [
+    # 数字字符串与原生数字一样转换；0 是有效值
+    (okx({"strike": "60000", "annualYieldPercentage": "12.5", "expiryTime": "1700000000000"},
+         {"strike": 61000, "annualYieldPercentage": 0, "expiryTime": 1700000000000}),
+     [(60000.0, 12.5, 1700000000000), (61000.0, 0.0, 1700000000000)]),
+    # 缺到期时间 / null 的产品跳过，而不是记成 0 或抛 KeyError
+    (okx({"strike": "60000", "annualYieldPercentage": "12.5"},
+         {"strike": None, "annualYieldPercentage": "9", "expiryTime": 1},
+         {"strike": "62000", "annualYieldPercentage": "8", "expiryTime": 1700000000000}),
+     [(62000.0, 8.0, 1700000000000)]),
+    # 空字符串不合 schema，整包退回通用解析，结果仍一致
+    (okx({"strike": "", "annualYieldPercentage": "12.5", "expiryTime": 1}), []),
+    (b'{"data": null}', []),
+], ids=["numbers", "missing-fields", "empty-string", "null-data"])
+def test_okx_paths_agree(content, rows, monkeypatch):
+    fast, slow = both(decoders.okx_products, content, monkeypatch)
+    assert fast == slow
+    assert list(zip(*fast)) == rows
+
+
+@pytest.mark.parametrize("content, rows", [
+    # 行权价为 0 时取 strike_price；两者都没有的跳过
+    (gate({"exercise_price": 0, "strike_price": "2500", "apy_display": "0.3", "delivery_timest": 1700000000},
+          {"exercise_price": "0", "apy_display": "0.3", "delivery_timest": 1700000000},
+          {"strike_price": 2600, "apy_display": 0.2, "end_timest": "1700000000"}),
+     [(2500.0, 30.0, 1700000000000), (2600.0, 20.0, 1700000000000)]),
+    # 年化不为正、缺到期时间、VIP 专享的项目跳过；min_vip_level 为 null 按 0 处理
+    (gate({"exercise_price": 2500, "apy_display": 0, "delivery_timest": 1700000000},
+          {"exercise_price": 2500, "apy_display": 0.3},
+          {"exercise_price": 2500, "apy_display": 0.3, "delivery_timest": 1700000000, "min_vip_level": 1},
+          {"exercise_price": 2700, "apy_display": 0.1, "delivery_timest": 1700000000, "min_vip_level": None}),
+     [(2700.0, 10.0, 1700000000000)]),
+    (gate({"exercise_price": "", "strike_price": 2500, "apy_display": 0.3, "delivery_timest": 1700000000}),
+     [(2500.0, 30.0, 1700000000000)]),
+    (b'{"data": null}', []),
+], ids=["zero-strike", "filters", "empty-string", "null-data"])
+def test_gate_paths_agree(content, rows, monkeypatch):
+    fast, slow = both(DECODERS["Gate"], content, monkeypatch)
+    assert fast == slow
+    assert list(zip(*fast)) == rows
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+import fetchers
+from fetchers import binance_project_list
+
+# Binance /dc/project/list 翻页：假分页接口记录请求过哪些页，覆盖缺 total、页数缓存过期与空列表。
+PAGE_SIZE = 5
+KEY = ("USDT", "BTC", "DOWN")
+
+
+class FakePages:
+    """把 products 按 pageSize 切页返回；with_total=False 时响应里不带 total。"""
+
+    def __init__(self, n, with_total=True):
+        self.products = [{"id": i, "strikePrice": str(60000 + i)} for i in range(n)]
+        self.with_total = with_total
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def __call__(self, params):
+        i, size = params["pageIndex"], params["pageSize"]
+        with self._lock:
+            self.requested.append(i)
+        data = {"list": self.products[(i - 1) * size:i * size]}
+        if self.with_total:
+            data["total"] = len(self.products)
+        return {"data": data}
+
+
+@pytest.fixture(autouse=True)
+def page_cache(monkeypatch):
+    cache = {}
+    monkeypatch.setattr(fetchers, "_binance_pages", cache)
+    return cache
+
+
+def fetch(pages, key=KEY):
+    return binance_project_list(pages, {"pageSize": PAGE_SIZE}, key=key)
+
+
+@pytest.mark.parametrize("n", [23, 20])
+def test_missing_total_walks_until_a_short_page(n, page_cache):
+    pages = FakePages(n, with_total=False)
+    assert fetch(pages) == pages.products
+    # 20 条恰好满 4 页，要多探一页空页才知道到头
+    assert sorted(pages.requested) == list(range(1, 6))
+    assert page_cache[KEY] == 5
+
+
+def test_total_fetches_remaining_pages_in_one_wave(page_cache):
+    pages = FakePages(23)
+    assert fetch(pages) == pages.products
+    assert sorted(pages.requested) == [1, 2, 3, 4, 5]
+    assert page_cache[KEY] == 5
+
+
+def test_stale_cached_page_count_too_high(page_cache):
+    page_cache[KEY] = 10
+    pages = FakePages(8)
+    assert fetch(pages) == pages.products
+    assert page_cache[KEY] == 2
+    # 多出来的页即使请求了也是空页，不会被当成产品
+    assert set(pages.requested) >= {1, 2}
+
+
+def test_stale_cached_page_count_too_low(page_cache):
+    page_cache[KEY] = 1
+    pages = FakePages(18, with_total=False)
+    assert fetch(pages) == pages.products
+    assert page_cache[KEY] == 4
+
+
+def test_products_shifting_between_pages_are_deduplicated():
+    pages = FakePages(10)
+    pages.products.insert(5, pages.products[4])   # 翻页期间新上架把第 5 个产品挤到了第 2 页
+    assert [p["id"] for p in fetch(pages)] == list(range(10))
+
+
+@pytest.mark.parametrize("data", [{"total": 0, "list": []}, {"list": []}, None])
+def test_empty_list(data, page_cache):
+    requested = []
+    def get_page(params):
+        requested.append(params["pageIndex"])
+        return {"data": data}
+    assert fetch(get_page) == []
+    assert requested == [1]
+    assert page_cache[KEY] == 1
+
+
+def test_failed_first_page_raises():
+    def get_page(params):
+        raise ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        fetch(get_page)
@@ -0,0 +1,200 @@
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+from socketserver import BaseRequestHandler, ThreadingTCPServer
+
+import pytest
+
+pytest.importorskip("websocket")
+
+import price_feed
+from price_feed import PriceFeed
+from conftest import until
+
+# 现价推送：进程内的 OKX 公共 WebSocket 替身（标准库实现的最小 RFC 6455 服务端），
+# 验证订阅、tickers 消息解析、断线重连后重新订阅，以及推送价过期后退回 REST。
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_AGE = 10
+
+
+def _recv_exact(sock, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("closed")
+        buf += chunk
+    return buf
+
+
+def _recv_frame(sock):
+    """读一帧客户端消息（客户端帧必带掩码），返回 (opcode, payload)。"""
+    b0, b1 = _recv_exact(sock, 2)
+    length = b1 & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", _recv_exact(sock, 2))
+    elif length == 127:
+        length, = struct.unpack("!Q", _recv_exact(sock, 8))
+    mask = _recv_exact(sock, 4)
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(_recv_exact(sock, length)))
+    return b0 & 0x0F, payload
+
+
+def _frame(opcode, payload):
+    n = len(payload)
+    header = bytes([0x80 | opcode]) + (bytes([n]) if n < 126 else bytes([126]) + struct.pack("!H", n))
+    return header + payload
+
+
+class OkxWsStub(ThreadingTCPServer):
+    """记录收到的订阅，push() 向所有连接广播 tickers 推送，drop() 断开所有连接。"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.subscribed = []    # 每条订阅消息里的 instId 列表
+        self.connects = 0
+        self.clients = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.server_address[1]}/ws/v5/public"
+
+    def send_all(self, text):
+        with self.lock:
+            for sock in list(self.clients):
+                try:
+                    sock.sendall(_frame(0x1, text.encode()))
+                except OSError:
+                    self.clients.remove(sock)
+
+    def push(self, coin, last):
+        self.send_all(json.dumps({"arg": {"channel": "tickers", "instId": f"{coin}-USDT"},
+                                  "data": [{"instId": f"{coin}-USDT", "last": str(last)}]}))
+
+    def drop(self):
+        with self.lock:
+            for sock in self.clients:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            self.clients.clear()
+
+
+class _Handler(BaseRequestHandler):
+    def handle(self):
+        sock, server = self.request, self.server
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        headers = dict(line.split(": ", 1) for line in request.decode().split("\r\n")[1:] if ": " in line)
+        key = {k.lower(): v for k, v in headers.items()}["sec-websocket-key"]
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        with server.lock:
+            server.clients.append(sock)
+            server.connects += 1
+        try:
+            while True:
+                opcode, payload = _recv_frame(sock)
+                if opcode == 0x8:
+                    return
+                if opcode == 0x9:
+                    sock.sendall(_frame(0xA, payload))
+                elif payload == b"ping":
+                    sock.sendall(_frame(0x1, b"pong"))
+                else:
+                    msg = json.loads(payload)
+                    if msg.get("op") == "subscribe":
+                        server.subscribed.append([a["instId"] for a in msg["args"]])
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with server.lock:
+                if sock in server.clients:
+                    server.clients.remove(sock)
+
+
+@pytest.fixture
+def ws_server():
+    server = OkxWsStub()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.drop()
+    server.server_close()
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(price_feed, "time")
+
+
+@pytest.fixture
+def feed(ws_server, monkeypatch):
+    monkeypatch.setattr(price_feed, "RECONNECT_DELAY", 0.05)
+    rest = {}
+    f = PriceFeed(url=ws_server.url, rest_fallback=lambda coin: rest.get(coin), max_age=MAX_AGE)
+    f.rest_prices = rest
+    f.subscribe(["BTC"])    # 连接前登记的币种在建连时一次性订阅
+    f.start()
+    until(lambda: f.connected and ws_server.subscribed)
+    yield f
+    f.stop()
+
+
+def test_subscribes_on_open_and_for_new_coins(feed, ws_server):
+    assert ws_server.subscribed == [["BTC-USDT"]]
+    feed.subscribe(["BTC", "ETH"])   # 已订阅的不重复发
+    until(lambda: len(ws_server.subscribed) == 2)
+    assert ws_server.subscribed[1] == ["ETH-USDT"]
+
+
+def test_parses_ticker_pushes(feed, ws_server, clock):
+    ws_server.send_all(json.dumps({"event": "subscribe", "arg": {"channel": "tickers", "instId": "BTC-USDT"}}))
+    ws_server.send_all("not json")
+    ws_server.push("BTC", 65000.5)
+    until(lambda: feed.latest("BTC") is not None)
+    assert feed.latest("BTC") == (65000.5, clock.now, "ws")
+    assert feed.get("BTC") == 65000.5
+
+
+def test_resubscribes_after_reconnect(feed, ws_server):
+    feed.subscribe(["ETH"])
+    until(lambda: len(ws_server.subscribed) == 2)
+    ws_server.drop()
+    until(lambda: ws_server.connects == 2 and len(ws_server.subscribed) == 3)
+    assert sorted(ws_server.subscribed[2]) == ["BTC-USDT", "ETH-USDT"]
+    ws_server.push("ETH", 3200)
+    until(lambda: feed.latest("ETH") is not None)
+
+
+def test_stale_push_falls_back_to_rest(feed, ws_server, clock):
+    ws_server.push("BTC", 65000)
+    until(lambda: feed.latest("BTC") is not None)
+    clock.now += MAX_AGE + 1
+    assert feed.latest("BTC") is None
+    feed.rest_prices["BTC"] = 64990.0
+    assert feed.get("BTC") == 64990.0
+    assert feed.latest("BTC") == (64990.0, clock.now, "rest")
+
+
+def test_failed_rest_fallback_is_not_retried_within_max_age(feed, clock):
+    calls = []
+    feed.rest_fallback = lambda coin: calls.append(coin)
+    assert feed.get("SOL") is None and feed.get("SOL") is None
+    assert calls == ["SOL"]
+    clock.now += MAX_AGE + 1
+    feed.rest_prices["SOL"] = 150.0
+    feed.rest_fallback = lambda coin: feed.rest_prices.get(coin)
+    assert feed.get("SOL") == 150.0
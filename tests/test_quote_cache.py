@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+import quote_cache
+from quote_cache import cached_fetch, last_good
+from conftest import until
+
+# stale-while-revalidate 缓存：假时钟控制过期，假抓取函数计数并可阻塞 / 失败。
+TTL = 30
+KEY = ("OKX", "BTC", "Buy Low", True)
+
+
+class FakeFetch:
+    """按顺序返回 results 里的值；值为异常时抛出。gate 未放行时阻塞。"""
+
+    def __init__(self, *results, gate=None):
+        self.results = list(results)
+        self.calls = 0
+        self.gate = gate
+
+    def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def clock(fake_clock):
+    quote_cache.clear()
+    yield fake_clock(quote_cache, "time")
+    quote_cache.clear()
+
+
+def settled():
+    until(lambda: not quote_cache._refreshing)
+
+
+def test_miss_then_fresh(clock):
+    fetch = FakeFetch("v1")
+    assert cached_fetch(KEY, fetch, ttl=TTL) == ("v1", "miss")
+    clock.now += TTL - 1
+    assert cached_fetch(KEY, fetch, ttl=TTL) == ("v1", "fresh")
+    assert fetch.calls == 1
+
+
+def test_stale_serves_old_value_and_refreshes_once(clock):
+    cached_fetch(KEY, FakeFetch("v1"), ttl=TTL)
+    clock.now += TTL
+    gate = threading.Event()
+    fetch = FakeFetch("v2", gate=gate)
+    # 刷新在途时的并发读取都拿旧值，只提交一次后台刷新
+    results = [cached_fetch(KEY, fetch, ttl=TTL) for _ in range(5)]
+    assert results == [("v1", "stale")] * 5
+    gate.set()
+    settled()
+    assert fetch.calls == 1
+    assert cached_fetch(KEY, fetch, ttl=TTL) == ("v2", "fresh")
+
+
+def test_force_bypasses_fresh_entry(clock):
+    cached_fetch(KEY, FakeFetch("v1"), ttl=TTL)
+    assert cached_fetch(KEY, FakeFetch("v2"), force=True, ttl=TTL) == ("v2", "miss")
+    assert last_good(KEY) == "v2"
+
+
+def test_failed_miss_is_not_stored(clock):
+    with pytest.raises(ConnectionError):
+        cached_fetch(KEY, FakeFetch(ConnectionError("down")), ttl=TTL)
+    assert last_good(KEY) is None
+    # 下一次仍是 miss，而不是把失败当成空结果缓存下来
+    assert cached_fetch(KEY, FakeFetch("v1"), ttl=TTL) == ("v1", "miss")
+
+
+def test_failed_forced_fetch_keeps_last_good(clock):
+    cached_fetch(KEY, FakeFetch("v1"), ttl=TTL)
+    clock.now += TTL - 1
+    with pytest.raises(ConnectionError):
+        cached_fetch(KEY, FakeFetch(ConnectionError("down")), force=True, ttl=TTL)
+    assert last_good(KEY) == "v1"
+    # 时间戳也没被失败的抓取刷新：按第一次成功的时间算，再过 1 秒就过期
+    clock.now += 1
+    assert cached_fetch(KEY, FakeFetch("v2"), ttl=TTL) == ("v1", "stale")
+    settled()
+
+
+def test_failed_background_refresh_keeps_stale_value_and_retries(clock):
+    cached_fetch(KEY, FakeFetch("v1"), ttl=TTL)
+    clock.now += TTL
+    failing = FakeFetch(ConnectionError("down"))
+    assert cached_fetch(KEY, failing, ttl=TTL) == ("v1", "stale")
+    settled()
+    assert failing.calls == 1 and last_good(KEY) == "v1"
+    # 失败后不再占着"刷新中"标记，下一次读取会重新提交刷新
+    retry = FakeFetch("v2")
+    assert cached_fetch(KEY, retry, ttl=TTL) == ("v1", "stale")
+    settled()
+    assert retry.calls == 1
+    assert cached_fetch(KEY, retry, ttl=TTL) == ("v2", "fresh")
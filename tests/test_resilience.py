@@ -0,0 +1,147 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+import metrics
+import resilience
+from resilience import CircuitBreaker, LatencyTracker, hedge
+
+# 熔断器状态机（假时钟）与对冲请求的胜出选择（用 Event 控制先后，不依赖真实延迟）。
+_names = itertools.count()
+
+
+@pytest.fixture
+def clock(fake_clock):
+    return fake_clock(resilience)
+
+
+@pytest.fixture
+def exchange():
+    # 每个用例一个独立的交易所名，对冲计数互不影响
+    return f"Test{next(_names)}"
+
+
+def hedge_counts(exchange):
+    """(补发次数, 补发线路胜出次数)，读自 metrics 计数器。"""
+    return (metrics.HEDGE_REQUESTS.samples().get((exchange,), 0),
+            metrics.HEDGE_WINS.samples().get((exchange,), 0))
+
+
+def test_breaker_opens_after_threshold_consecutive_failures(clock):
+    b = CircuitBreaker(threshold=3, cooldown=10)
+    for _ in range(2):
+        assert b.allow()
+        b.record(False)
+    assert b.state == "closed"
+    b.record(True)   # 成功清零，失败须连续
+    for _ in range(3):
+        b.record(False)
+    assert b.state == "open"
+    assert not b.allow()
+    clock.now += 9.9
+    assert not b.allow()
+
+
+def test_half_open_lets_one_probe_through(clock):
+    b = CircuitBreaker(threshold=1, cooldown=10)
+    b.record(False)
+    clock.now += 10
+    assert b.allow() and b.state == "half_open"
+    assert not b.allow()   # 探测请求在途时其余请求仍直接失败
+
+
+def test_failed_probe_reopens_for_a_full_cooldown(clock):
+    b = CircuitBreaker(threshold=5, cooldown=10)
+    for _ in range(5):
+        b.record(False)
+    clock.now += 10
+    assert b.allow()
+    b.record(False)   # 半开状态下一次失败就重新打开，不用再攒够阈值
+    assert b.state == "open" and b.opened_at == clock.now
+    clock.now += 5
+    assert not b.allow()
+    clock.now += 5
+    assert b.allow()
+
+
+def test_successful_probe_closes(clock):
+    b = CircuitBreaker(threshold=1, cooldown=10)
+    b.record(False)
+    clock.now += 10
+    assert b.allow()
+    b.record(True)
+    assert b.state == "closed" and b.failures == 0
+    assert all(b.allow() for _ in range(3))
+
+
+def test_breaker_state_is_exported(clock, exchange):
+    b = resilience.breaker(exchange, "proxy")
+    state = lambda: metrics.BREAKER_STATE.samples()[(exchange, "proxy")]
+    assert state() == 0
+    for _ in range(b.threshold):
+        b.record(False)
+    assert state() == 2
+    clock.now += b.cooldown
+    assert b.allow() and state() == 1
+    b.record(True)
+    assert state() == 0
+
+
+def test_hedge_delay_uses_percentile_within_bounds():
+    t = LatencyTracker()
+    assert t.hedge_delay() == resilience.HEDGE_DEFAULT_DELAY
+    for s in [0.01] * 50:
+        t.record(s)
+    assert t.hedge_delay() == resilience.HEDGE_MIN_DELAY
+    for s in [60.0] * 50:
+        t.record(s)
+    assert t.hedge_delay() == resilience.HEDGE_MAX_DELAY
+
+
+def test_fast_primary_is_not_hedged(exchange):
+    alternate = threading.Event()
+    assert hedge(exchange, lambda: "primary", alternate.set, delay=5) == "primary"
+    assert not alternate.is_set()
+    assert hedge_counts(exchange) == (0, 0)
+
+
+def test_slow_primary_loses_to_alternate(exchange):
+    release = threading.Event()
+    try:
+        result = hedge(exchange, lambda: release.wait(5) and "primary", lambda: "alternate", delay=0.01)
+    finally:
+        release.set()
+    assert result == "alternate"
+    assert hedge_counts(exchange) == (1, 1)
+
+
+def test_slow_primary_can_still_win_after_hedging(exchange):
+    release, finish = threading.Event(), threading.Event()
+    def alternate():
+        release.set()          # 补发已发出，放主请求返回
+        finish.wait(5)
+        return "alternate"
+    try:
+        assert hedge(exchange, lambda: release.wait(5) and "primary", alternate, delay=0.01) == "primary"
+    finally:
+        finish.set()
+    assert hedge_counts(exchange) == (1, 0)
+
+
+def test_failed_primary_hedges_immediately(exchange):
+    def primary():
+        raise ConnectionError("reset")
+    t0 = time.monotonic()
+    assert hedge(exchange, primary, lambda: "alternate", delay=5) == "alternate"
+    assert time.monotonic() - t0 < 1   # 主请求已失败就不再等满 delay
+
+
+def test_both_failing_raises_primary_error(exchange):
+    def primary():
+        raise ConnectionError("primary")
+    def alternate():
+        raise TimeoutError("alternate")
+    with pytest.raises(ConnectionError, match="primary"):
+        hedge(exchange, primary, alternate, delay=0.01)
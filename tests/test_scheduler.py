@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+import scheduler
+from scheduler import TokenBucket, PRIORITY_PRICE, PRIORITY_FOCUS, PRIORITY_NORMAL, PRIORITY_BACKGROUND
+from conftest import until
+
+# 令牌桶与 AIMD 的状态机测试：假时钟驱动补充令牌，退避抖动固定为 1.0。
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(scheduler.random, "uniform", lambda a, b: 1.0)
+    return fake_clock(scheduler)
+
+
+def test_waiters_are_served_by_priority_then_arrival(clock):
+    bucket = TokenBucket(rate=1, burst=1)
+    bucket.tokens = 0.0
+    order, threads = [], []
+    # 按"低优先级先到"的顺序排队，验证出队顺序只看 (优先级, 到达先后)
+    for name, level in [("background", PRIORITY_BACKGROUND), ("normal-1", PRIORITY_NORMAL),
+                        ("focus", PRIORITY_FOCUS), ("price", PRIORITY_PRICE), ("normal-2", PRIORITY_NORMAL)]:
+        t = threading.Thread(target=lambda n=name, l=level: (bucket.acquire(priority=l), order.append(n)), daemon=True)
+        t.start()
+        threads.append(t)
+        until(lambda: len(bucket._waiters) == len(threads))
+    for served in range(1, len(threads) + 1):
+        assert len(order) == served - 1   # 没有补充令牌就没人能拿到
+        clock.now += 1.0                   # 补充恰好一个令牌
+        with bucket._cond:
+            bucket._cond.notify_all()
+        until(lambda s=served: len(order) == s)
+    for t in threads:
+        t.join(1)
+    assert order == ["price", "focus", "normal-1", "normal-2", "background"]
+
+
+def test_acquire_spends_burst_without_waiting(clock):
+    bucket = TokenBucket(rate=1, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert bucket.tokens == 0
+    # 超过桶容量的权重按容量扣，不会永远等下去
+    clock.now += 3.0
+    bucket.acquire(weight=10)
+    assert bucket.tokens == 0
+
+
+def test_throttle_halves_rate_and_backs_off_exponentially(clock):
+    bucket = TokenBucket(rate=10, burst=10)
+    delays = [bucket.on_throttle() for _ in range(4)]
+    assert delays == [0.5, 1.0, 2.0, 4.0]
+    # 速率减半，但不低于基准的 MIN_RATE_FRACTION
+    assert bucket.rate == 10 * scheduler.MIN_RATE_FRACTION
+    assert bucket.tokens == 0 and bucket.paused_until == clock.now + 4.0
+    assert bucket.throttled == 4
+
+
+def test_backoff_is_capped_and_honours_retry_after(clock):
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.strikes = 20
+    assert bucket.on_throttle() == scheduler.BACKOFF_MAX
+    assert bucket.on_throttle(retry_after=7) == 7
+    # 暂停只会延长，不会被更短的退避覆盖
+    assert bucket.paused_until == clock.now + scheduler.BACKOFF_MAX
+
+
+def test_success_recovers_rate_additively(clock):
+    bucket = TokenBucket(rate=10, burst=10)
+    bucket.on_throttle()
+    assert (bucket.rate, bucket.strikes) == (5, 1)
+    bucket.on_success()
+    assert bucket.strikes == 0
+    assert bucket.rate == pytest.approx(5 + 10 * scheduler.RATE_RECOVERY)
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == bucket.base_rate
+
+
+def test_acquire_waits_out_the_pause(clock):
+    bucket = TokenBucket(rate=100, burst=100)
+    bucket.on_throttle(retry_after=2)
+    done = threading.Event()
+    t = threading.Thread(target=lambda: (bucket.acquire(), done.set()), daemon=True)
+    t.start()
+    until(lambda: bucket._waiters)
+    clock.now += 1.9   # 暂停期内即使令牌已补满也不放行
+    with bucket._cond:
+        bucket._cond.notify_all()
+    assert not done.wait(0.05)
+    clock.now += 0.2
+    with bucket._cond:
+        bucket._cond.notify_all()
+    assert done.wait(1)